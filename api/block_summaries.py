@@ -0,0 +1,65 @@
+"""Standalone CLI script to build block-summary sidecars for the analysis rasters.
+
+Usage:
+    cd api
+    uv run python block_summaries.py --source-dir /data/cogs
+    uv run python block_summaries.py --source-dir /data/cogs --layer-id peat_cog --layer-id carbon_cog
+
+``--source-dir`` holds local copies of the COGs under their ``Layer.path``.
+Sidecars are written next to each COG and must be uploaded to the same prefix
+of the bucket. Run after ``seed.py --compute-stats``: histogram bands use the
+layers' global histogram edges, and sidecars built with other edges are
+ignored at analysis time, as are sidecars whose COG has been replaced since
+(their source fingerprint no longer matches). Rebuild whenever a COG or its
+statistics change.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import select
+
+from db.database import SessionLocal
+from logging_config import setup_logging
+from models import Category, Dataset, Layer  # noqa: F401
+from services.block_summary import build_block_summary, layer_summary_options
+from services.widgets import WIDGET_CONFIG
+
+setup_logging("INFO")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build block-summary sidecars for the analysis rasters")
+    parser.add_argument("--source-dir", type=Path, required=True, help="Local directory mirroring the bucket")
+    parser.add_argument(
+        "--layer-id",
+        action="append",
+        help="Only build sidecars for this layer (repeatable; default: every layer used by WIDGET_CONFIG)",
+    )
+    args = parser.parse_args()
+
+    layer_ids = args.layer_id or [layer_id for widget in WIDGET_CONFIG.values() for layer_id in widget["layers"]]
+    session = SessionLocal()
+    try:
+        layers = session.scalars(select(Layer).where(Layer.id.in_(layer_ids))).all()
+        failed = 0
+        for layer in layers:
+            path = args.source_dir / layer.path.lstrip("/")
+            if not path.is_file():
+                logger.error("COG for layer '%s' not found at %s", layer.id, path)
+                failed += 1
+                continue
+            build_block_summary(str(path), **layer_summary_options(layer))
+        logger.info("Built block summaries for %d layers (%d failed)", len(layers) - failed, failed)
+    finally:
+        session.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Standalone CLI script converting shared analyses to the compact storage encoding.
+
+Usage:
+    cd api
+    uv run python compact_shares.py
+    uv run python compact_shares.py --batch-size 100
+
+Rewrites every ``shared_analyses`` row still stored as plain JSON into the
+``payload``/``geometry`` columns of ``services.share_codec`` and clears the old
+columns. Each batch is committed on its own, so an interrupted run keeps its
+progress; re-running skips the rows already converted. Logs the table's row
+size before and after (run ``VACUUM FULL shared_analyses`` afterwards to return
+the freed space to the OS). ``share_benchmark.py`` measures the effect on row
+size and read time.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import text
+
+from db.base import Base
+from db.database import SessionLocal, engine
+from db.migrations import apply_migrations
+from logging_config import setup_logging
+from models import AnalysisResult, Category, Dataset, Layer, SharedAnalysis  # noqa: F401
+from services.shared_analysis import compact_legacy_shares
+
+setup_logging("INFO")
+logger = logging.getLogger(__name__)
+
+_ROW_SIZE_SQL = text("SELECT count(*), coalesce(sum(pg_column_size(s.*)), 0) FROM shared_analyses s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert shared analyses to the compact storage encoding")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows converted per transaction (default: 500)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
+
+    session = SessionLocal()
+    try:
+        rows, size_before = session.execute(_ROW_SIZE_SQL).one()
+        converted = compact_legacy_shares(session, args.batch_size, checkpoint=session.commit)
+        _, size_after = session.execute(_ROW_SIZE_SQL).one()
+        logger.info(
+            "Compacted %d of %d shared analyses; stored row size %.1f kB → %.1f kB",
+            converted, rows, size_before / 1000, size_after / 1000,
+        )
+    except Exception:
+        logger.exception("Compaction failed, rolling back the current batch.")
+        session.rollback()
+        sys.exit(1)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,15 @@ class Settings(BaseSettings):
     cors_allow_credentials: bool = False
     cors_allow_methods: list[str] = ["*"]
     cors_allow_headers: list[str] = ["*"]
+    # Response headers browsers may read cross-origin (beyond the CORS-safelisted ones).
+    cors_expose_headers: list[str] = [
+        "X-Vertex-Count",
+        "X-Simplify-Tolerance",
+        "X-Uncompressed-Length",
+        "X-Analysis-Result-Id",
+        "X-Analysis-Result-Token",
+        "ETag",
+    ]
 
     # Database configuration
     db_host: str = Field(default="localhost", validation_alias="DB_HOST")
@@ -38,6 +47,25 @@ class Settings(BaseSettings):
     db_password: str = Field(default="eccc", validation_alias="DB_PASSWORD")
     db_name: str = Field(default="eccc_db", validation_alias="DB_NAME")
 
+    # Connection pooling (per engine and worker process)
+    db_pool_size: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT")  # seconds waiting for a connection
+    db_pool_recycle: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE")  # seconds; -1 keeps connections forever
+    db_statement_timeout_ms: int = Field(default=0, validation_alias="DB_STATEMENT_TIMEOUT_MS")  # 0 disables the limit
+
+    # Serve the catalog and shared-analysis reads through the async engine
+    db_async: bool = Field(default=False, validation_alias="DB_ASYNC")
+
+    # Dedicated executors per workload class (per worker process): threads running
+    # requests at once, and requests allowed to wait for one before getting a 503
+    analysis_workers: int = Field(default=4, validation_alias="ANALYSIS_WORKERS")
+    analysis_queue: int = Field(default=32, validation_alias="ANALYSIS_QUEUE")
+    tiles_workers: int = Field(default=16, validation_alias="TILES_WORKERS")
+    tiles_queue: int = Field(default=256, validation_alias="TILES_QUEUE")
+    catalog_workers: int = Field(default=8, validation_alias="CATALOG_WORKERS")
+    catalog_queue: int = Field(default=128, validation_alias="CATALOG_QUEUE")
+
     # Seed secret for authenticating POST /seed requests
     seed_secret: str = Field(validation_alias="SEED_SECRET")
 
@@ -1,22 +1,124 @@
-"""Database connection and session management."""
+"""Database connection and session management.
 
-from collections.abc import Generator
+Two engines share the pool settings from ``Settings``: the sync ``engine``
+used by most handlers (each request holds a threadpool thread while it waits
+on Postgres) and ``async_engine`` (psycopg's asyncio driver). With
+``DB_ASYNC=true`` the catalog and shared-analysis reads run on the async
+engine through ``get_db_runner``, without tying up a thread per request.
+"""
 
-from sqlalchemy import create_engine
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Generator
+from dataclasses import dataclass
+from typing import Annotated, Any, TypeVar
+
+from fastapi import Depends, Response
+from pydantic import BaseModel
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
-from config import get_settings
+from config import Settings, get_settings
+from executors import CATALOG
 
 settings = get_settings()
 
-# Use psycopg v3 driver
-engine = create_engine(
-    settings.database_url.replace("postgresql://", "postgresql+psycopg://"),
-    pool_pre_ping=True,
-)
+T = TypeVar("T")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Pool instrumentation
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class PoolStats:
+    """Checkout counters of one pool, since the process started."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout: waiting for a free slot, opening a new connection and the pre-ping."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        self._stats_lock = threading.Lock()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.stats.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.stats.checkouts += 1
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """Current occupancy and cumulative checkout statistics of a pool."""
+    status = {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status |= {
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_ms_mean": round(1000 * stats.wait_seconds_total / stats.checkouts, 3) if stats.checkouts else 0.0,
+            "wait_ms_max": round(1000 * stats.wait_seconds_max, 3),
+        }
+    return status
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Engines and sessions
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """Pool and connection keyword arguments for ``create_engine``/``create_async_engine``."""
+    options = {
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    if settings.db_statement_timeout_ms > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+# Use psycopg v3 driver (its asyncio flavour for the async engine)
+_url = settings.database_url.replace("postgresql://", "postgresql+psycopg://")
+
+engine = create_engine(_url, poolclass=InstrumentedQueuePool, **engine_options(settings))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(_url, poolclass=InstrumentedAsyncQueuePool, **engine_options(settings))
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency that provides a database session.
@@ -31,3 +133,66 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides an ``AsyncSession``, rolled back on error and closed afterwards."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sync/async handler bridge
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class DbRunner:
+    """Runs sync ORM code, ``fn(session, *args)``, from an ``async def`` handler.
+
+    With a sync ``Session`` the function runs on the ``CATALOG`` executor, like
+    a plain ``def`` handler bound to it. With an ``AsyncSession`` it runs through
+    ``AsyncSession.run_sync`` on the event loop, where every query awaits the
+    asyncio driver instead of blocking a thread — so the same query code serves
+    both modes. Everything else ``fn`` does then runs on the event loop too, so
+    it should only query; building and serializing the response from the rows
+    belongs on ``CATALOG`` (``respond``).
+    """
+
+    def __init__(self, session: Session | AsyncSession):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], /, *args: Any) -> T:
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args)
+        return await CATALOG.run(fn, self.session, *args)
+
+    async def respond(self, query: Callable[..., Any], build: Callable[[Any], BaseModel], /, *args: Any) -> Response:
+        """Load rows with ``query(session, *args)``, then build and serialize the response on ``CATALOG``.
+
+        ``build`` turns the ORM rows into the response model. The handler gets a
+        ready JSON ``Response``, so FastAPI's own response validation and
+        serialization — which would run on the event loop for an ``async def``
+        handler — are skipped; declare the model with ``response_model=``.
+        """
+        rows = await self.run(query, *args)
+        return Response(content=await CATALOG.run(_json_body, build, rows), media_type="application/json")
+
+
+def _json_body(build: Callable[[Any], BaseModel], rows: Any) -> bytes:
+    return build(rows).model_dump_json().encode()
+
+
+async def get_sync_runner(db: Annotated[Session, Depends(get_db)]) -> DbRunner:
+    return DbRunner(db)
+
+
+async def get_async_runner(db: Annotated[AsyncSession, Depends(get_async_db)]) -> DbRunner:
+    return DbRunner(db)
+
+
+# Dependency for the endpoints that support both modes; picked once from DB_ASYNC.
+get_db_runner = get_async_runner if settings.db_async else get_sync_runner
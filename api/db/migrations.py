@@ -0,0 +1,55 @@
+"""Idempotent schema changes for tables that already exist.
+
+``Base.metadata.create_all`` creates missing tables but never alters existing
+ones, so columns added to a model after its table was first created would be
+missing in deployed databases. Until Alembic is introduced (see the TODO in
+``main.py``), such changes are listed here as idempotent DDL and applied right
+after ``create_all`` at startup and by the seed CLI.
+"""
+
+import logging
+
+from sqlalchemy import Connection, Engine, text
+
+from db.base import Base
+
+logger = logging.getLogger(__name__)
+
+# Append-only. Every statement must be safe to run on every startup.
+MIGRATIONS: list[str] = [
+    "ALTER TABLE layers ADD COLUMN IF NOT EXISTS stats JSON",
+    "ALTER TABLE shared_analyses ADD COLUMN IF NOT EXISTS payload BYTEA",
+    "ALTER TABLE shared_analyses ADD COLUMN IF NOT EXISTS geometry BYTEA",
+    "ALTER TABLE shared_analyses ALTER COLUMN analysis DROP NOT NULL",
+    "ALTER TABLE shared_analyses ALTER COLUMN geojson DROP NOT NULL",
+]
+
+
+# Advisory-lock key serializing ``init_schema`` across processes (arbitrary, unique in this app).
+SCHEMA_LOCK_KEY = 0x6862_6C5F_7363_6865
+
+
+def _apply(conn: Connection) -> None:
+    for statement in MIGRATIONS:
+        conn.execute(text(statement))
+    logger.debug("Applied %d schema migrations", len(MIGRATIONS))
+
+
+def apply_migrations(engine: Engine) -> None:
+    """Apply all idempotent schema migrations in a single transaction."""
+    with engine.begin() as conn:
+        _apply(conn)
+
+
+def init_schema(engine: Engine) -> None:
+    """``create_all`` plus the migrations in one transaction, one process at a time.
+
+    Processes starting together on an empty database would otherwise race on
+    ``CREATE TABLE`` (the loser fails on Postgres's catalog unique index); the
+    transaction-scoped advisory lock makes the later ones wait and then find
+    everything in place. Models must be imported (registered on ``Base``) first.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        Base.metadata.create_all(bind=conn)
+        _apply(conn)
@@ -0,0 +1,103 @@
+"""Standalone CLI load benchmark of the sync and async database paths.
+
+Usage:
+    cd api
+    uv run python db_benchmark.py
+    uv run python db_benchmark.py --requests 5000 --concurrency 500 --path "/datasets?include_layers=true"
+
+Sends concurrent requests to a catalog endpoint through the ASGI app in-process
+(no network, no lifespan), once with the catalog reads on the sync engine
+(threadpool) and once on the async engine, and logs throughput, latency
+percentiles and the pool's checkout statistics for each. Uses the configured
+database and pool settings (``DB_POOL_SIZE`` etc.); seed the catalog first.
+
+On a 1-CPU container with a local Postgres (production catalog, 3,000
+requests of ``/layers/peat_cog`` from 500 clients) both modes are bound by the
+Python process rather than the database:
+
+    pool            mode    req/s   p50       p95       pool wait (mean)
+    5 + 10          sync    329     1.24 s    2.60 s      68 ms
+    5 + 10          async   308     1.26 s    4.72 s    1449 ms
+    30 + 10         sync    312     1.50 s    1.76 s      24 ms
+    30 + 10         async   391     0.94 s    4.25 s    1109 ms
+
+The sync path queues requests in front of its 40 threadpool threads, the async
+path queues them on the pool, where waiting is less fair (longer tails). The
+async path pays off when requests spend their time waiting on a remote
+database, not on CPU; measure on the target deployment before enabling it.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from db.database import PoolStats, async_engine, engine, get_async_runner, get_db_runner, get_sync_runner, pool_status
+from logging_config import setup_logging
+from main import app
+
+setup_logging("INFO")
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+async def _run(path: str, requests: int, concurrency: int) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[None] = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        await client.get(path)  # warm up the pool and caches
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sync and async database paths under concurrent load")
+    parser.add_argument("--path", default="/categories?include_datasets=true", help="Endpoint to request")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests per mode (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent clients (default: 200)")
+    args = parser.parse_args()
+
+    for mode, runner, pool in (("sync", get_sync_runner, engine.pool), ("async", get_async_runner, async_engine.pool)):
+        app.dependency_overrides[get_db_runner] = runner
+        pool.stats = PoolStats()
+        elapsed, latencies, errors = asyncio.run(_run(args.path, args.requests, args.concurrency))
+        quantiles = statistics.quantiles(latencies, n=100)
+        logger.info(
+            "%-5s %6.0f req/s  p50 %6.1f ms  p95 %6.1f ms  p99 %6.1f ms  errors %d  pool %s",
+            mode,
+            len(latencies) / elapsed,
+            1000 * quantiles[49],
+            1000 * quantiles[94],
+            1000 * quantiles[98],
+            errors,
+            pool_status(pool),
+        )
+        if mode == "async":
+            asyncio.run(async_engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
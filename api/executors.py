@@ -0,0 +1,211 @@
+"""Dedicated executors per workload class.
+
+Starlette runs every sync ``def`` endpoint on one shared threadpool (40
+threads), so a burst of analyses — each holding a thread for seconds — leaves
+tile and catalog requests queued behind them. Instead, each workload class
+gets its own ``WorkloadExecutor``: a thread pool with its own concurrency
+limit, a bounded queue (requests beyond it get 503 with ``Retry-After``
+instead of piling up) and its own saturation statistics
+(``GET /health/executors``):
+
+* ``ANALYSIS`` — zonal statistics, batch analyses and exports (``/analysis``)
+* ``TILES`` — raster and vector tiles, COG reads (``/cog``, ``*/tiles/...``, ``/layers/point``)
+* ``CATALOG`` — catalog reads and shared analyses (``/categories``, ``/datasets``, ``/layers``, shares)
+* ``TILE_READS`` — the raster reads a ``TILES`` request fans out (point queries, tile stacks),
+  shared by all of them so their concurrency stays within the ``TILES`` sizing
+
+Endpoints are bound with ``@EXECUTOR.bind`` (or a router-wide
+``route_class``); cheap endpoints that are left unbound (``/health``,
+``/hbl-area``) keep using the default threadpool, which nothing heavy competes
+for any more. Thread pools are created on first use, so nothing is running yet
+in a gunicorn master that forks the workers, and ``shutdown`` drops them so a
+later app lifespan in the same process starts fresh ones.
+
+In-process burst of 80 concurrent ``POST /analysis/v2`` requests, each holding
+its thread for 2 s, while ``GET /categories`` is requested 20 times in a row:
+
+    pool                 /categories p50   max        analyses run / rejected
+    shared threadpool    3 ms              3930 ms    80 / 0
+    per-workload         3 ms                 6 ms    36 / 44 (4 workers + 32 queued)
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+
+from config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+@dataclass
+class ExecutorStats:
+    """Task counters of one executor, since the process started."""
+
+    completed: int = 0
+    rejected: int = 0
+    cancelled: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    run_seconds_total: float = 0.0
+
+
+class WorkloadExecutor:
+    """A thread pool for one class of requests, with a bounded queue and saturation statistics."""
+
+    def __init__(self, name: str, workers: int, max_queue: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stats = ExecutorStats()
+        self._active = 0
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+    def _submit(self, fn: Callable[..., T], args: tuple, kwargs: dict, admit: bool) -> Future:
+        with self._lock:
+            if admit and self._active + self._queued >= self.workers + self.max_queue:
+                self.stats.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Too many {self.name} requests in progress, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._queued += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            pool = self._pool
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def call() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self.stats.wait_seconds_total += started - submitted
+                self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, started - submitted)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self.stats.completed += 1
+                    self.stats.run_seconds_total += time.perf_counter() - started
+
+        future = pool.submit(call)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        # Only a task that never started can be cancelled (its request went away while queued).
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self.stats.cancelled += 1
+
+    async def run(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on this executor; 503 when its queue is full."""
+        return await asyncio.wrap_future(self._submit(fn, args, kwargs, admit=True))
+
+    def map(self, fn: Callable[[Any], T], items: list) -> list[T]:
+        """Run ``fn`` over ``items`` on this executor from a worker thread; results in input order.
+
+        For the reads a request fans out while it holds a slot of another
+        executor. Never rejected: the request was admitted there.
+        """
+        futures = [self._submit(fn, (item,), {}, admit=False) for item in items]
+        return [future.result() for future in futures]
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Advance a sync ``iterator`` (e.g. a ``StreamingResponse`` body) on this executor.
+
+        Chunks queue like any other task but are never rejected: the request was
+        admitted when its handler ran.
+        """
+        while True:
+            item = await asyncio.wrap_future(self._submit(next, (iterator, _DONE), {}, admit=False))
+            if item is _DONE:
+                return
+            yield item
+
+    def bind(self, endpoint: Callable[..., T]) -> Callable[..., T]:
+        """Decorator running a sync ``def`` endpoint on this executor instead of the default threadpool.
+
+        ``async def`` endpoints are returned unchanged; they offload their own
+        blocking work (e.g. ``DbRunner``). FastAPI reads the parameters through
+        ``__wrapped__``, so dependencies and the OpenAPI schema are unaffected.
+        """
+        if inspect.iscoroutinefunction(endpoint):
+            return endpoint
+
+        @functools.wraps(endpoint)
+        async def run_endpoint(*args: Any, **kwargs: Any) -> T:
+            return await self.run(endpoint, *args, **kwargs)
+
+        return run_endpoint
+
+    @cached_property
+    def route_class(self) -> type[APIRoute]:
+        """``APIRoute`` subclass binding every sync endpoint of a router, for routers built by libraries (titiler)."""
+        executor = self
+
+        class WorkloadRoute(APIRoute):
+            def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+                super().__init__(path, executor.bind(endpoint), **kwargs)
+
+        return WorkloadRoute
+
+    def status(self) -> dict[str, Any]:
+        """Current occupancy and cumulative statistics."""
+        with self._lock:
+            stats = self.stats
+            started = stats.completed + self._active
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "saturated": self._active >= self.workers,
+                "completed": stats.completed,
+                "rejected": stats.rejected,
+                "cancelled": stats.cancelled,
+                "wait_ms_mean": round(1000 * stats.wait_seconds_total / started, 3) if started else 0.0,
+                "wait_ms_max": round(1000 * stats.wait_seconds_max, 3),
+                "run_ms_mean": round(1000 * stats.run_seconds_total / stats.completed, 3) if stats.completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Drop queued tasks and release the threads; running tasks finish in the background.
+
+        The next task starts a new pool, e.g. in a second app lifespan of the same process.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+ANALYSIS = WorkloadExecutor("analysis", settings.analysis_workers, settings.analysis_queue)
+TILES = WorkloadExecutor("tiles", settings.tiles_workers, settings.tiles_queue)
+CATALOG = WorkloadExecutor("catalog", settings.catalog_workers, settings.catalog_queue)
+# Fan-out reads are queued, never rejected (``map``), so the queue limit does not apply.
+TILE_READS = WorkloadExecutor("tile_reads", settings.tiles_workers, 0)
+
+EXECUTORS: tuple[WorkloadExecutor, ...] = (ANALYSIS, TILES, CATALOG, TILE_READS)
@@ -0,0 +1,72 @@
+"""Standalone CLI benchmark of analysis body parsing: the schema path vs the fast path.
+
+Usage:
+    cd api
+    uv run python geojson_benchmark.py
+    uv run python geojson_benchmark.py --vertices 1000 10000 100000 --runs 5
+
+Builds a one-ring Polygon Feature (a circle) per vertex count and times, best
+of ``--runs``, the regular FastAPI route — ``json.loads``, ``AnalysisInput``
+validation and ``shape()`` (``extract_geometry``) — against
+``parse_analysis_body``, checking that both give the same geometry. The
+numbers in ``services/geojson.py`` come from this script. Needs no database.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pydantic import TypeAdapter
+from shapely.geometry import Point, mapping
+
+from logging_config import setup_logging
+from schemas.analysis import AnalysisInput
+from services.geojson import extract_geometry, parse_analysis_body
+
+setup_logging("INFO")
+logger = logging.getLogger(__name__)
+
+_ADAPTER = TypeAdapter(AnalysisInput)
+
+
+def _schema_path(body: bytes):
+    return extract_geometry(_ADAPTER.validate_python(json.loads(body)))
+
+
+def _fast_path(body: bytes):
+    return parse_analysis_body(body, "application/json").geometry
+
+
+def _best_ms(parse, body: bytes, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse(body)
+        timings.append(time.perf_counter() - start)
+    return 1000 * min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the schema and fast parse paths of analysis bodies")
+    parser.add_argument("--vertices", type=int, nargs="+", default=[1000, 10000, 100000], help="Ring vertex counts")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per path, best kept (default: 5)")
+    args = parser.parse_args()
+
+    logger.info("vertices   schema path   fast path")
+    for vertices in args.vertices:
+        ring = Point(-84.0, 57.0).buffer(0.5, quad_segs=max(1, vertices // 4))
+        body = json.dumps({"type": "Feature", "geometry": mapping(ring), "properties": {}}).encode()
+        if not _fast_path(body).equals_exact(_schema_path(body), tolerance=0):
+            raise SystemExit(f"The parse paths disagree at {vertices} vertices")
+        logger.info(
+            "%-8d %9.1f ms %9.1f ms", vertices, _best_ms(_schema_path, body, args.runs), _best_ms(_fast_path, body, args.runs)
+        )
+
+
+if __name__ == "__main__":
+    main()
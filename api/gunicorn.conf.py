@@ -0,0 +1,40 @@
+"""Gunicorn configuration for production: uvicorn workers forked from a preloaded master.
+
+Usage:
+    cd api
+    uv run gunicorn main:app
+
+With ``preload_app`` the master imports the application once (titiler,
+rasterio, exactextract, pyproj, the HBL footprint and every pydantic schema),
+then ``when_ready`` runs ``main.prepare_workers`` — schema setup and the HBL
+area caches — before the workers are forked. Workers therefore start in
+milliseconds and share all of it copy-on-write instead of each importing and
+building its own copy. The catch: code changes need a full restart, not a
+``HUP`` reload. See ``startup_benchmark.py`` for measurements.
+
+Settings come from the environment: ``WEB_CONCURRENCY`` (workers, default 2),
+``PORT`` (default 8000), ``GUNICORN_TIMEOUT`` (seconds, default 120) and
+``GUNICORN_PRELOAD`` (``false`` makes every worker import and prepare on its
+own, as with ``uvicorn --workers``).
+"""
+
+import os
+import time
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() != "false"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+accesslog = "-"
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return  # each worker prepares itself in the lifespan handler
+    from main import prepare_workers
+
+    start = time.perf_counter()
+    prepare_workers()
+    server.log.info("Prepared the database and HBL area caches in %.2f s", time.perf_counter() - start)
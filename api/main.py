@@ -1,6 +1,7 @@
 """FastAPI application with enhanced OpenAPI configuration and CORS support."""
 
 import asyncio
+import gc
 import os
 from contextlib import asynccontextmanager
 
@@ -9,14 +10,26 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+import services.cleanup  # noqa: F401  # Register the cleanup job with the scheduler
 from config import get_settings
-from db.base import Base
-from db.database import engine
+from db.database import SessionLocal, async_engine, engine
+from db.migrations import init_schema
 from exception_handlers import http_exception_handler, unhandled_exception_handler, validation_exception_handler
+from executors import EXECUTORS
 from logging_config import setup_logging
-from models import Category, Dataset, Layer, SharedAnalysis  # noqa: F401  # Register models with Base metadata
+from models import (  # noqa: F401  # Register models with Base metadata
+    AnalysisResult,
+    CatalogVersion,
+    Category,
+    Dataset,
+    JobRun,
+    Layer,
+    ReportingUnitStats,
+    SharedAnalysis,
+)
 from routers import analysis, categories, cog, datasets, hbl_area, health, layers, seed
-from services.cleanup import cleanup_shared_analyses
+from services.scheduler import run_scheduler
+from services.shared_analysis import ensure_partitions
 
 settings = get_settings()
 
@@ -24,6 +37,40 @@ settings = get_settings()
 # while still running (asyncio only keeps a weak reference).
 _background_tasks: set[asyncio.Task] = set()
 
+# Set once the schema is in place; workers forked from a gunicorn master that
+# already prepared the database inherit it and skip the work.
+_database_ready = False
+
+
+def prepare_database() -> None:
+    """Create and migrate the schema and the upcoming share partitions, once per process tree."""
+    global _database_ready
+    if _database_ready:
+        return
+    # TODO: Replace create_all with Alembic migrations once the data model is stable.
+    init_schema(engine)
+    with SessionLocal() as db:
+        ensure_partitions(db)
+        db.commit()
+    _database_ready = True
+
+
+def prepare_workers() -> None:
+    """One-time startup work for the gunicorn master (``preload_app``), before any worker forks.
+
+    Prepares the database and builds the HBL area variants and tile pyramid
+    once, so every worker starts with them in place and shares their memory
+    copy-on-write instead of building its own copy. The master's pooled
+    connections are closed (a socket must not be shared across a fork) and
+    everything allocated so far is moved out of the garbage collector's reach
+    (``gc.freeze``), so collections in the workers don't write to — and thereby
+    copy — the shared pages.
+    """
+    prepare_database()
+    hbl_area.warm_up()
+    engine.dispose()
+    gc.freeze()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -48,20 +95,28 @@ async def lifespan(app: FastAPI):
     for key, value in gdal_env.items():
         os.environ.setdefault(key, value)
 
-    # Create database tables if they don't exist.
-    # TODO: Replace with Alembic migrations once the data model is stable.
-    Base.metadata.create_all(bind=engine)
+    # Create database tables if they don't exist (already done under gunicorn, see prepare_workers).
+    prepare_database()
 
-    # Schedule nightly cleanup of expired shared analyses (runs at 03:00 UTC).
-    # fastapi-utilities `@repeat_at` returns a wrapper that *is* the cron loop
-    # for async functions, so awaiting it would block startup forever — run it
-    # as a background task instead.
-    cleanup_task = asyncio.create_task(cleanup_shared_analyses())
-    _background_tasks.add(cleanup_task)
-    cleanup_task.add_done_callback(_background_tasks.discard)
+    # Build the HBL area variants and tile pyramid off the event loop; requests
+    # that need them before this finishes wait for the build.
+    warm_up_task = asyncio.create_task(asyncio.to_thread(hbl_area.warm_up))
+    _background_tasks.add(warm_up_task)
+    warm_up_task.add_done_callback(_background_tasks.discard)
+
+    # Run the periodic jobs (e.g. the nightly cleanup at 03:00 UTC). Every worker
+    # runs the scheduler loop; advisory locks make each job run on one of them.
+    scheduler_task = asyncio.create_task(run_scheduler())
+    _background_tasks.add(scheduler_task)
+    scheduler_task.add_done_callback(_background_tasks.discard)
 
     yield
 
+    scheduler_task.cancel()
+    for executor in EXECUTORS:
+        executor.shutdown()
+    await async_engine.dispose()
+
 
 # OpenAPI tags metadata for documentation organization
 tags_metadata = [
@@ -125,6 +180,7 @@ app.add_middleware(
     allow_credentials=settings.cors_allow_credentials,
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
+    expose_headers=settings.cors_expose_headers,
 )
 
 # Include routers
@@ -1,8 +1,21 @@
 """Models package for SQLAlchemy ORM models."""
 
+from models.analysis_result import AnalysisResult
+from models.catalog_version import CatalogVersion
 from models.category import Category
 from models.dataset import Dataset
+from models.job_run import JobRun
 from models.layer import Layer
+from models.reporting_unit_stats import ReportingUnitStats
 from models.shared_analysis import SharedAnalysis
 
-__all__ = ["Category", "Dataset", "Layer", "SharedAnalysis"]
+__all__ = [
+    "AnalysisResult",
+    "CatalogVersion",
+    "Category",
+    "Dataset",
+    "JobRun",
+    "Layer",
+    "ReportingUnitStats",
+    "SharedAnalysis",
+]
@@ -0,0 +1,34 @@
+"""SQLAlchemy model for recent analysis results kept for incremental re-analysis."""
+
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import JSON, DateTime, Float, Index, LargeBinary, Uuid, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class AnalysisResult(Base):
+    """A ``POST /analysis/v2`` result, referenced by id when the user edits the AOI.
+
+    ``components`` holds the additive per-layer aggregates (pixel weight, sum,
+    class and histogram-bin weights) the next run of an edited AOI starts from,
+    so only the added and removed regions are extracted. Rows are deleted by
+    the nightly cleanup task once older than ``ANALYSIS_RESULT_TTL_HOURS``.
+    """
+
+    __tablename__ = "analysis_results"
+
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
+    geometry: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # WKB, EPSG:4326
+    area_km2: Mapped[float] = mapped_column(Float, nullable=False)
+    analysis: Mapped[dict] = mapped_column(JSON, nullable=False)
+    components: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (Index("ix_analysis_results_created_at", "created_at"),)
@@ -0,0 +1,24 @@
+"""SQLAlchemy model holding the version number of the seeded catalog."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class CatalogVersion(Base):
+    """Single row whose ``version`` moves whenever the seed writes catalog rows.
+
+    Bumped by ``services.seed.seed_database`` in the transaction that changes
+    ``categories``, ``datasets`` or ``layers``, so readers see the new version
+    together with the new rows. Caches of data derived from the catalog (e.g.
+    shared-analysis responses) key on it instead of fingerprinting the tables.
+    """
+
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
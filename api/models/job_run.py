@@ -0,0 +1,30 @@
+"""SQLAlchemy model recording the last run of each scheduled background job."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class JobRun(Base):
+    """Last run of a job registered with ``services.scheduler``, one row per job.
+
+    Written by whichever worker won the job's advisory lock for a schedule slot:
+    ``status`` is ``running`` while the job executes, then ``succeeded`` or
+    ``failed`` (with the exception in ``error``). ``scheduled_for`` is the cron
+    slot of the run and lets other workers skip a slot that was already served.
+    """
+
+    __tablename__ = "job_runs"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    scheduled_for: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    worker: Mapped[str] = mapped_column(String, nullable=False)  # "<hostname>:<pid>"
+    run_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
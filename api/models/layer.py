@@ -18,6 +18,8 @@ class Layer(Base):
     unit: Mapped[str | None] = mapped_column(String, nullable=True)
     categories: Mapped[list | None] = mapped_column(JSON, nullable=True)
     config: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Global raster statistics (min/max/percentiles/histogram) precomputed at seed time.
+    stats: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     metadata_: Mapped[dict] = mapped_column("metadata", JSON, nullable=False)
     dataset_id: Mapped[int] = mapped_column(Integer, ForeignKey("datasets.id"), nullable=False)
 
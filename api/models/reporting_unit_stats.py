@@ -0,0 +1,35 @@
+"""SQLAlchemy model for precomputed analyses of ecological reporting units."""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Float, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class ReportingUnitStats(Base):
+    """Full analysis of one polygon of a reporting-unit vector layer (ecozones, ecodistricts, …).
+
+    Rows are written by the offline ``reporting_units.py`` job and served as-is
+    by ``GET /analysis/v2/units/{layer_id}/{feature_id}``. ``geometry_hash`` and
+    ``inputs_hash`` let the job skip units whose polygon and analysis inputs
+    (widget config, dataset and layer rows) are unchanged since the last run.
+    """
+
+    __tablename__ = "reporting_unit_stats"
+
+    # No FK to ``layers``: re-seeding with ``delete_first`` wipes and re-creates
+    # layer rows, which must not throw away hours of precomputed statistics.
+    layer_id: Mapped[str] = mapped_column(String, primary_key=True)
+    feature_id: Mapped[str] = mapped_column(String, primary_key=True)
+    properties: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    area_km2: Mapped[float] = mapped_column(Float, nullable=False)
+    analysis: Mapped[dict] = mapped_column(JSON, nullable=False)
+    geometry_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    inputs_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
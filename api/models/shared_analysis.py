@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, DateTime, Index, Uuid, func
+from sqlalchemy import DDL, JSON, DateTime, Index, LargeBinary, PrimaryKeyConstraint, Uuid, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from db.base import Base
@@ -14,19 +14,47 @@ class SharedAnalysis(Base):
 
     Rows are deleted automatically by the nightly cleanup task once older than
     ``SHARED_ANALYSIS_TTL_DAYS``. The schema is intentionally minimal — we store
-    the rendered analysis JSON and the input geojson so visitors can re-display
-    the result without re-running the (expensive) zonal-stats pipeline.
+    the rendered analysis and the AOI so visitors can re-display the result
+    without re-running the (expensive) zonal-stats pipeline.
+
+    New rows hold the compact ``payload`` and ``geometry`` encodings of
+    ``services.share_codec``. ``analysis`` and ``geojson`` are the original
+    plain-JSON columns, still read for rows that ``compact_shares.py`` has not
+    converted yet.
+
+    The table is range-partitioned by ``created_at`` into daily partitions
+    (``shared_analyses_pYYYYMMDD``, created ahead of time by
+    ``services.shared_analysis.ensure_partitions``) plus a default partition, so
+    expiry drops whole days instead of deleting rows. Postgres requires the
+    partition key in the primary key; the ORM still identifies rows by ``id``.
+    Tables created before partitioning stay unpartitioned and are expired in
+    bounded batches instead.
     """
 
     __tablename__ = "shared_analyses"
 
-    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
-    analysis: Mapped[dict] = mapped_column(JSON, nullable=False)
-    geojson: Mapped[dict] = mapped_column(JSON, nullable=False)
+    id: Mapped[UUID] = mapped_column(Uuid, default=uuid4)
+    payload: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    geometry: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    analysis: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    geojson: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         server_default=func.now(),
     )
 
-    __table_args__ = (Index("ix_shared_analyses_created_at", "created_at"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        Index("ix_shared_analyses_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+
+# Catches rows outside every daily partition (e.g. if partitions were not created in time).
+event.listen(
+    SharedAnalysis.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS shared_analyses_default PARTITION OF shared_analyses DEFAULT"),
+)
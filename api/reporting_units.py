@@ -0,0 +1,64 @@
+"""Standalone CLI script to precompute analyses for an ecological reporting-unit layer.
+
+Usage:
+    cd api
+    uv run python reporting_units.py --layer-id ecc-design.7h4njtot \
+        --geojson ../data-processing/data/processed/vectors/ecodistricts.geojson --id-property ECODISTRIC
+    uv run python reporting_units.py ... --force   # recompute unchanged units too
+
+Only units whose geometry or analysis inputs changed since the last run are
+recomputed (see ``services.reporting_units``).
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import get_settings
+from db.base import Base
+from db.database import SessionLocal, engine
+from db.migrations import apply_migrations
+from logging_config import setup_logging
+from models import Category, Dataset, Layer, ReportingUnitStats  # noqa: F401
+from services.reporting_units import compute_reporting_unit_stats, load_reporting_units
+
+setup_logging("INFO")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute analyses for a reporting-unit layer")
+    parser.add_argument("--layer-id", required=True, help="Vector layer id the units belong to")
+    parser.add_argument("--geojson", type=Path, required=True, help="Processed GeoJSON of the layer's units")
+    parser.add_argument("--id-property", required=True, help="Feature property identifying each unit")
+    parser.add_argument("--force", action="store_true", help="Recompute units even when unchanged")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
+
+    session = SessionLocal()
+    try:
+        if session.get(Layer, args.layer_id) is None:
+            logger.error("Layer '%s' not found — seed the database first", args.layer_id)
+            sys.exit(1)
+        units = load_reporting_units(args.geojson, args.id_property)
+        logger.info("Loaded %d reporting units from %s", len(units), args.geojson)
+        counts = compute_reporting_unit_stats(
+            session, args.layer_id, units, get_settings().s3_bucket_name, force=args.force
+        )
+        session.commit()
+        logger.info("Summary: %s", counts)
+    except Exception:
+        session.rollback()
+        logger.exception("Reporting unit job failed, transaction rolled back.")
+        sys.exit(1)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
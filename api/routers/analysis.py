@@ -16,45 +16,93 @@ from typing import Annotated
 from uuid import UUID
 
 import rasterio.errors
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, selectinload
 
 from config import get_settings
-from db.database import get_db
+from db.database import DbRunner, get_db, get_db_runner
+from executors import ANALYSIS, CATALOG, TILES
 from models.dataset import Dataset
-from schemas.analysis import AnalysisInput, AnalysisResponse
+from schemas.analysis import AnalysisResponse, FeatureCollectionAnalysisResponse, GeoJSONFeatureCollection
+from schemas.export import MAX_EXPORT_LAYERS, AnalysisExportRequest
+from schemas.reporting_units import ReportingUnitStatsRead
 from schemas.shared_analysis import (
     SharedAnalysisCreate,
     SharedAnalysisCreateResponse,
     SharedAnalysisRead,
 )
 from services.analysis import (
+    MAX_ANALYSIS_FEATURES,
     MAX_AREA_KM2,
     MIN_AREA_KM2,
+    validate_features_v2,
     validate_geometry_v1,
     validate_geometry_v2,
 )
-from services.shared_analysis import SHARED_ANALYSIS_TTL_DAYS, create_shared, get_shared
-from services.zonal_stats import compute_zonal_stats
+from services.analysis_results import ANALYSIS_RESULT_TTL_HOURS, load_previous, sign_result, store_result
+from services.batch_analysis import MAX_BATCH_FEATURES, stream_batch, validate_batch
+from services.export import MAX_EXPORT_PIXELS, ensure_coregistered, plan_clips, stream_multiband_tif, stream_zip
+from services.geojson import ParsedAnalysisInput, parse_analysis_body
+from services.layers import load_raster_layers
+from services.reporting_units import get_reporting_unit_stats
+from services.shared_analysis import (
+    SHARED_ANALYSIS_TTL_DAYS,
+    SHARED_READ_MAX_AGE_SECONDS,
+    SharedResponse,
+    build_shared_response,
+    create_shared,
+    create_shared_from_result,
+    ensure_shared_exists,
+    fetch_shared_response,
+    get_shared_geometry,
+)
+from services.vector_tiles import MAX_TILE_ZOOM, MVT_MEDIA_TYPE, encode_tile, get_shared_pyramid, validate_tile
+from services.zonal_stats import PreviousAnalysis, compute_zonal_stats, compute_zonal_stats_many
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Analysis"])
 
+# ``analysis_body`` reads the raw body, so the schema FastAPI would have derived
+# from an ``AnalysisInput`` parameter is declared explicitly.
+_ANALYSIS_INPUT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "oneOf": [
+                        {"$ref": "#/components/schemas/GeoJSONFeature"},
+                        {"$ref": "#/components/schemas/GeoJSONFeatureCollection"},
+                    ],
+                    "discriminator": {
+                        "propertyName": "type",
+                        "mapping": {
+                            "Feature": "#/components/schemas/GeoJSONFeature",
+                            "FeatureCollection": "#/components/schemas/GeoJSONFeatureCollection",
+                        },
+                    },
+                }
+            }
+        },
+    }
+}
 
-def _run_analysis(
-    geom,
-    polygon_area_km2: float,
-    db: Session,
-) -> AnalysisResponse:
-    """Shared post-validation pipeline: fetch datasets and compute zonal stats.
 
-    Lives outside the per-endpoint handlers because both v1 and v2 do the same
-    work after their respective validators succeed. Keeping it as a helper (not
-    a FastAPI dependency) keeps the call sites linear and the request lifecycle
-    obvious: validate → run analysis → return.
+async def analysis_body(request: Request) -> ParsedAnalysisInput:
+    """Parse an ``AnalysisInput`` body through the fast GeoJSON path (see ``services.geojson``).
+
+    Parsing is CPU-bound for large uploads, so it runs on the ``ANALYSIS`` executor.
     """
+    body = await request.body()
+    return await ANALYSIS.run(parse_analysis_body, body, request.headers.get("content-type"))
+
+
+def _load_datasets(db: Session) -> tuple[list[Dataset], str]:
+    """Return all datasets with their layers and the configured raster bucket."""
     settings = get_settings()
     if not settings.s3_bucket_name:
         logger.error("S3_BUCKET_NAME is not configured")
@@ -64,12 +112,10 @@ def _run_analysis(
         select(Dataset).options(selectinload(Dataset.layers))
     ).scalars().all()
     logger.info("Retrieved %d datasets", len(datasets))
+    return datasets, settings.s3_bucket_name
 
-    try:
-        result = compute_zonal_stats(geom, datasets, settings.s3_bucket_name, polygon_area_km2)
-    except rasterio.errors.RasterioIOError:
-        logger.exception("Failed to read raster data")
-        raise HTTPException(status_code=500, detail="Analysis is unavailable")
+
+def _analysis_response(result: dict, polygon_area_km2: float) -> AnalysisResponse:
     return AnalysisResponse(
         aoi_size=round(polygon_area_km2, 2),
         peat_carbon=result["peat_carbon"],
@@ -81,6 +127,30 @@ def _run_analysis(
     )
 
 
+def _run_analysis(
+    geom,
+    polygon_area_km2: float,
+    db: Session,
+    previous: PreviousAnalysis | None = None,
+    components: dict[str, dict] | None = None,
+) -> AnalysisResponse:
+    """Shared post-validation pipeline: fetch datasets and compute zonal stats.
+
+    Lives outside the per-endpoint handlers because both v1 and v2 do the same
+    work after their respective validators succeed. Keeping it as a helper (not
+    a FastAPI dependency) keeps the call sites linear and the request lifecycle
+    obvious: validate → run analysis → return. ``previous`` and ``components``
+    are passed through to ``compute_zonal_stats`` (incremental re-analysis, v2).
+    """
+    datasets, bucket = _load_datasets(db)
+    try:
+        result = compute_zonal_stats(geom, datasets, bucket, polygon_area_km2, previous, components)
+    except rasterio.errors.RasterioIOError:
+        logger.exception("Failed to read raster data")
+        raise HTTPException(status_code=500, detail="Analysis is unavailable")
+    return _analysis_response(result, polygon_area_km2)
+
+
 @router.post(
     "",
     summary="Run analysis (v1, legacy — geometry intersects HBL bbox)",
@@ -103,8 +173,13 @@ def _run_analysis(
         422: {"description": "Geometry failed one or more validation checks"},
         500: {"description": "Analysis failed due to an internal error"},
     },
+    openapi_extra=_ANALYSIS_INPUT_OPENAPI,
 )
-def analyze_v1(body: AnalysisInput, db: Annotated[Session, Depends(get_db)]) -> AnalysisResponse:
+@ANALYSIS.bind
+def analyze_v1(
+    body: Annotated[ParsedAnalysisInput, Depends(analysis_body)],
+    db: Annotated[Session, Depends(get_db)],
+) -> AnalysisResponse:
     """Validate against the HBL bbox (intersects) and compute zonal statistics."""
     logger.info("POST /analysis received (v1)")
     geom, polygon_area_km2 = validate_geometry_v1(body)
@@ -125,19 +200,205 @@ def analyze_v1(body: AnalysisInput, db: Annotated[Session, Depends(get_db)]) ->
         f"3. Minimum area — must be ≥ {MIN_AREA_KM2:g} km²\n"
         f"4. Maximum area — must be ≤ {MAX_AREA_KM2:,.0f} km²\n"
         "5. Geographic scope — must lie entirely within the HBL study area "
-        "(see `GET /hbl-area`)"
+        "(see `GET /hbl-area`)\n\n"
+        "Every result is kept for "
+        f"{ANALYSIS_RESULT_TTL_HOURS} hours and its id returned in the `X-Analysis-Result-Id` "
+        "header (with a signed `X-Analysis-Result-Token`; both share the result via "
+        "`POST /analysis/v2/share`). After editing the AOI, pass that id as `previous`: layers with additive "
+        "statistics (sums, means, class coverage, fixed-edge histograms) are then only "
+        "extracted over the added and removed regions. Other layers, and edits that change "
+        "more than half of the AOI, get a full run; an unknown or expired id is ignored. "
+        "If the result cannot be stored, the analysis is still returned without `X-Analysis-Result-Id`."
     ),
     responses={
         200: {"description": "Geometry is valid and analysis succeeded"},
         422: {"description": "Geometry failed one or more validation checks"},
         500: {"description": "Analysis failed due to an internal error"},
     },
+    openapi_extra=_ANALYSIS_INPUT_OPENAPI,
 )
-def analyze_v2(body: AnalysisInput, db: Annotated[Session, Depends(get_db)]) -> AnalysisResponse:
+@ANALYSIS.bind
+def analyze_v2(
+    body: Annotated[ParsedAnalysisInput, Depends(analysis_body)],
+    db: Annotated[Session, Depends(get_db)],
+    response: Response,
+    previous: Annotated[
+        UUID | None,
+        Query(description="`X-Analysis-Result-Id` of an earlier analysis of the AOI before it was edited"),
+    ] = None,
+) -> AnalysisResponse:
     """Validate against the HBL polygon (covers) and compute zonal statistics."""
-    logger.info("POST /analysis/v2 received")
+    logger.info("POST /analysis/v2 received [previous=%s]", previous)
     geom, polygon_area_km2 = validate_geometry_v2(body)
-    return _run_analysis(geom, polygon_area_km2, db)
+    components: dict[str, dict] = {}
+    analysis = _run_analysis(
+        geom, polygon_area_km2, db, load_previous(db, previous) if previous is not None else None, components
+    )
+    try:
+        row = store_result(db, geom, polygon_area_km2, analysis, components)
+        db.commit()
+    except SQLAlchemyError:
+        # The analysis itself succeeded; only incremental re-analysis and sharing by id are lost.
+        logger.exception("Failed to store analysis result")
+        db.rollback()
+    else:
+        response.headers["X-Analysis-Result-Id"] = str(row.id)
+    response.headers["X-Analysis-Result-Token"] = sign_result(geom, analysis)
+    return analysis
+
+
+@router.post(
+    "/v2/features",
+    summary="Run analysis per feature of a FeatureCollection (v2)",
+    description=(
+        "Accepts a GeoJSON FeatureCollection (EPSG:4326) and returns the widget statistics "
+        "of every feature plus those of their union — e.g. to compare candidate sites in one "
+        "request. Each raster is opened once for all features, which are extracted together; "
+        "the union is computed exactly as by `POST /analysis/v2`.\n\n"
+        "The union and every feature must pass the `POST /analysis/v2` validation steps on "
+        "their own. Features are keyed by the `id_property` value (which must be present and "
+        "unique) or, without it, by their zero-based index.\n\n"
+        f"At most {MAX_ANALYSIS_FEATURES} features per request."
+    ),
+    responses={
+        200: {"description": "All geometries are valid and analysis succeeded"},
+        422: {"description": "The union or a feature failed validation, or feature ids are missing or duplicated"},
+        500: {"description": "Analysis failed due to an internal error"},
+    },
+)
+@ANALYSIS.bind
+def analyze_features_v2(
+    body: GeoJSONFeatureCollection,
+    db: Annotated[Session, Depends(get_db)],
+    id_property: Annotated[
+        str | None,
+        Query(description="Feature property whose value keys the per-feature results (default: index)"),
+    ] = None,
+) -> FeatureCollectionAnalysisResponse:
+    """Validate the union and each feature against the HBL polygon, then compute stats for all of them."""
+    logger.info("POST /analysis/v2/features received [features=%d]", len(body.features))
+    (union_geom, union_area_km2), features = validate_features_v2(body, id_property)
+
+    datasets, bucket = _load_datasets(db)
+    try:
+        results = compute_zonal_stats_many(
+            [geom for _, geom, _ in features], datasets, bucket, [area for _, _, area in features]
+        )
+        # The union goes through the single-AOI path, so scattered sites are read in
+        # their own windows exactly as in POST /analysis/v2.
+        union = compute_zonal_stats(union_geom, datasets, bucket, union_area_km2)
+    except rasterio.errors.RasterioIOError:
+        logger.exception("Failed to read raster data")
+        raise HTTPException(status_code=500, detail="Analysis is unavailable")
+
+    return FeatureCollectionAnalysisResponse(
+        union=_analysis_response(union, union_area_km2),
+        features={
+            key: _analysis_response(result, area)
+            for (key, _, area), result in zip(features, results)
+        },
+    )
+
+
+@router.post(
+    "/v2/batch",
+    summary="Run analysis for many AOIs as one streamed job (v2)",
+    description=(
+        "Accepts a GeoJSON FeatureCollection (EPSG:4326) of independent AOIs — e.g. watersheds "
+        "or claims for a report — and streams one NDJSON line per feature as results are "
+        "produced. AOIs are processed in raster-sequential passes, so each raster is opened "
+        "once per group of AOIs rather than once per AOI.\n\n"
+        "Each feature is validated on its own with the `POST /analysis/v2` steps; a feature "
+        "that fails is reported inline and the rest of the batch still runs:\n\n"
+        '* `{"index": 0, "id": "0", "status": "ok", "analysis": {...}}` — `analysis` has the '
+        "`POST /analysis/v2` response shape\n"
+        '* `{"index": 3, "id": "3", "status": "error", "status_code": 422, "detail": "..."}`\n\n'
+        "Validation errors come first, then results in input order. `id` is the `id_property` "
+        f"value or the feature index. At most {MAX_BATCH_FEATURES} features per request."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "NDJSON results (streamed)", "content": {"application/x-ndjson": {}}},
+        422: {"description": "The body is not a FeatureCollection or has too many features"},
+        500: {"description": "Analysis is unavailable"},
+    },
+)
+@ANALYSIS.bind
+def analyze_batch_v2(
+    body: GeoJSONFeatureCollection,
+    db: Annotated[Session, Depends(get_db)],
+    id_property: Annotated[
+        str | None,
+        Query(description="Feature property used as the `id` of each result line (default: index)"),
+    ] = None,
+) -> StreamingResponse:
+    """Validate every feature and stream their zonal statistics as NDJSON."""
+    logger.info("POST /analysis/v2/batch received [features=%d]", len(body.features))
+    items = validate_batch(body, id_property)
+    datasets, bucket = _load_datasets(db)
+    return StreamingResponse(ANALYSIS.iterate(stream_batch(items, datasets, bucket)), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/v2/export",
+    summary="Export raster pixels clipped to an AOI (v2)",
+    description=(
+        "Validates the geometry through the same v2 pipeline (steps 1–5) and streams the "
+        "pixels of the requested raster layers clipped to it. Pixels outside the AOI are "
+        "set to nodata; each layer keeps its native CRS.\n\n"
+        "* `format=zip` (default): one single-band GeoTIFF per layer plus a `manifest.json` "
+        "describing CRS, resolution and overview level.\n"
+        "* `format=tif`: one multi-band GeoTIFF (one band per layer, in request order). Only "
+        "available when all layers share the same grid, data type and nodata value — e.g. the "
+        "snow dynamics winters.\n\n"
+        f"At most {MAX_EXPORT_LAYERS} layers per request. Each layer is capped at "
+        f"{MAX_EXPORT_PIXELS:,} pixels: large AOIs are read from the finest raster overview "
+        "that fits, so their resolution is coarser than native."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Clipped rasters (streamed)",
+            "content": {"application/zip": {}, "image/tiff": {}},
+        },
+        404: {"description": "One or more layers not found"},
+        422: {"description": "Geometry or layer list failed validation, or the export is not possible"},
+        500: {"description": "Export failed due to an internal error"},
+    },
+)
+@ANALYSIS.bind
+def export_analysis_v2(
+    body: AnalysisExportRequest,
+    db: Annotated[Session, Depends(get_db)],
+) -> StreamingResponse:
+    """Validate the AOI and stream the requested rasters clipped to it."""
+    logger.info("POST /analysis/v2/export received [layers=%d, format=%s]", len(body.layers), body.format)
+    geom, _ = validate_geometry_v2(body.geojson)
+    layers = load_raster_layers(db, list(dict.fromkeys(body.layers)))
+
+    settings = get_settings()
+    if not settings.s3_bucket_name:
+        logger.error("S3_BUCKET_NAME is not configured")
+        raise HTTPException(status_code=500, detail="Export is unavailable")
+
+    try:
+        clips = plan_clips(layers, geom, settings.s3_bucket_name)
+    except rasterio.errors.RasterioIOError:
+        logger.exception("Failed to read raster data")
+        raise HTTPException(status_code=500, detail="Export is unavailable")
+
+    if body.format == "tif":
+        ensure_coregistered(clips)
+        return StreamingResponse(
+            ANALYSIS.iterate(stream_multiband_tif(clips)),
+            media_type="image/tiff",
+            headers={"Content-Disposition": 'attachment; filename="hbl_export.tif"'},
+        )
+    return StreamingResponse(
+        ANALYSIS.iterate(stream_zip(clips)),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="hbl_export.zip"'},
+    )
 
 
 @router.post(
@@ -145,26 +406,36 @@ def analyze_v2(body: AnalysisInput, db: Annotated[Session, Depends(get_db)]) ->
     status_code=201,
     summary="Persist an analysis snapshot for public sharing (v2)",
     description=(
-        "Persists a successful v2 analysis snapshot so it can be re-displayed via a "
-        "public link. The body must include the rendered ``AnalysisResponse`` and the "
-        "GeoJSON Feature/FeatureCollection used to produce it. The geometry is "
-        "re-validated through the same v2 pipeline (steps 1–5) before the row is "
-        "inserted — invalid geometries are rejected with 422.\n\n"
+        "Persists a successful v2 analysis so it can be re-displayed via a public link.\n\n"
+        "* `{result_id}` — the `X-Analysis-Result-Id` of a `POST /analysis/v2` run from the "
+        f"last {ANALYSIS_RESULT_TTL_HOURS} hours. The stored result is shared as-is; nothing "
+        "is uploaded or re-validated. Unknown or expired ids return 404.\n"
+        "* `{analysis, geojson}` — the rendered ``AnalysisResponse`` and the GeoJSON "
+        "Feature/FeatureCollection used to produce it. The geometry is re-validated "
+        "through the same v2 pipeline (steps 1–5) before the row is inserted — invalid "
+        "geometries are rejected with 422. Adding the run's `X-Analysis-Result-Token` as "
+        "`result_token` skips the re-validation; a token that does not match the payload "
+        "is rejected with 422.\n\n"
         f"Shared analyses are automatically deleted after {SHARED_ANALYSIS_TTL_DAYS} days. "
         "Clients build the public-facing URL themselves from the returned ``id``."
     ),
     responses={
         201: {"description": "Snapshot persisted; returns the share id"},
-        422: {"description": "Payload failed validation (analysis schema or geometry)"},
+        404: {"description": "The analysis result is unknown or has expired"},
+        422: {"description": "Payload failed validation (analysis schema, geometry or result token)"},
     },
 )
+@CATALOG.bind
 def share_analysis_v2(
     body: SharedAnalysisCreate,
     db: Annotated[Session, Depends(get_db)],
 ) -> SharedAnalysisCreateResponse:
     """Persist an analysis snapshot and return the share id."""
-    logger.info("POST /analysis/v2/share received")
-    row = create_shared(db, body.analysis, body.geojson)
+    logger.info("POST /analysis/v2/share received [result_id=%s]", body.result_id)
+    if body.result_id is not None:
+        row = create_shared_from_result(db, body.result_id)
+    else:
+        row = create_shared(db, body.analysis, body.geojson, body.result_token)
     db.commit()
     return SharedAnalysisCreateResponse(id=row.id)
 
@@ -175,19 +446,91 @@ def share_analysis_v2(
     description=(
         "Returns the stored ``AnalysisResponse``, original geojson, and the "
         "``created_at`` timestamp of the snapshot. The stored payload is revalidated "
-        "against the current ``AnalysisResponse`` schema on every read — if it no "
-        "longer conforms, or the row has been cleaned up, the endpoint responds with "
-        "410 Gone."
+        "against the current ``AnalysisResponse`` schema — if it no longer conforms, or "
+        "the row has been cleaned up, the endpoint responds with 410 Gone.\n\n"
+        "Validated responses are cached per schema and catalog version and carry a strong "
+        f"`ETag` and `Cache-Control: public, max-age={SHARED_READ_MAX_AGE_SECONDS}, immutable` "
+        "(capped at the share's remaining lifetime); `If-None-Match` gets 304 Not Modified."
     ),
+    response_model=SharedAnalysisRead,
     responses={
         200: {"description": "Stored analysis + geojson + created_at"},
+        304: {"description": "The client's copy (`If-None-Match`) is current"},
         410: {"description": "Share link has expired or is no longer available"},
     },
 )
-def get_shared_analysis_v2(
+async def get_shared_analysis_v2(
     share_id: UUID,
-    db: Annotated[Session, Depends(get_db)],
-) -> SharedAnalysisRead:
+    db: Annotated[DbRunner, Depends(get_db_runner)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """Retrieve a previously shared analysis by id."""
     logger.info("GET /analysis/v2/share/%s received", share_id)
-    return get_shared(db, share_id)
+    shared = await db.run(fetch_shared_response, share_id)
+    if not isinstance(shared, SharedResponse):
+        # Validation and serialization are CPU-bound: keep them off the event loop in async mode.
+        shared = await CATALOG.run(build_shared_response, shared)
+    headers = {"ETag": shared.etag, "Cache-Control": shared.cache_control}
+    if if_none_match is not None and shared.etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content=shared.body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/v2/share/{share_id}/tiles/{z}/{x}/{y}",
+    summary="Shared analysis AOI as vector tiles (v2)",
+    description=(
+        "Serves the stored AOI of a shared analysis as Mapbox Vector Tiles (one "
+        "layer, `aoi`), simplified per zoom level and clipped per tile, so the map "
+        "can draw the AOI without the full-resolution geojson. Tiles that do not "
+        "intersect the AOI return 204 No Content; expired shares return 410 Gone."
+    ),
+    response_class=Response,
+    responses={
+        200: {"content": {MVT_MEDIA_TYPE: {}}, "description": "Mapbox Vector Tile"},
+        204: {"description": "Tile does not intersect the AOI"},
+        410: {"description": "Share link has expired or is no longer available"},
+        422: {"description": "Tile coordinates outside the tile matrix"},
+    },
+)
+@TILES.bind
+def get_shared_analysis_tile_v2(
+    share_id: UUID,
+    z: Annotated[int, Path(ge=0, le=MAX_TILE_ZOOM)],
+    x: int,
+    y: int,
+    db: Annotated[Session, Depends(get_db)],
+) -> Response:
+    """Return one vector tile of a shared analysis' AOI."""
+    validate_tile(z, x, y)
+    ensure_shared_exists(db, share_id)
+    pyramid = get_shared_pyramid(share_id, lambda: get_shared_geometry(db, share_id))
+    content = encode_tile("aoi", pyramid, z, x, y)
+    if not content:
+        return Response(status_code=204)
+    return Response(content=content, media_type=MVT_MEDIA_TYPE)
+
+
+@router.get(
+    "/v2/units/{layer_id}/{feature_id}",
+    summary="Retrieve the precomputed analysis of an ecological reporting unit (v2)",
+    description=(
+        "Returns the full analysis of one polygon of an Ecological Framework layer "
+        "(ecozones, ecoprovinces, ecoregions, ecodistricts), precomputed offline by "
+        "`reporting_units.py`. `feature_id` is the unit's id attribute in the layer's "
+        "tileset (e.g. `ECODISTRIC`)."
+    ),
+    responses={
+        200: {"description": "Stored analysis of the unit"},
+        404: {"description": "No statistics have been computed for this unit"},
+    },
+)
+@CATALOG.bind
+def get_reporting_unit_analysis_v2(
+    layer_id: str,
+    feature_id: str,
+    db: Annotated[Session, Depends(get_db)],
+) -> ReportingUnitStatsRead:
+    """Return the stored analysis of a reporting unit."""
+    logger.info("GET /analysis/v2/units/%s/%s received", layer_id, feature_id)
+    return get_reporting_unit_stats(db, layer_id, feature_id)
@@ -1,12 +1,13 @@
 """Categories endpoint router."""
 
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session, selectinload
 
-from db.database import get_db
+from db.database import DbRunner, get_db_runner
 from models.category import Category
 from models.dataset import Dataset
 from schemas.category import (
@@ -28,14 +29,19 @@ def _escape_like(value: str) -> str:
     "",
     summary="List Categories",
     description="Returns a paginated list of categories with optional title search.",
+    response_model=PaginatedCategoryResponse,
 )
-def list_categories(
-    db: Annotated[Session, Depends(get_db)],
+async def list_categories(
+    db: Annotated[DbRunner, Depends(get_db_runner)],
     offset: int = Query(default=0, ge=0, description="Number of items to skip"),
     limit: int = Query(default=10, ge=1, le=100, description="Number of items to return"),
     search: str | None = Query(default=None, description="Case-insensitive partial title search (en and fr)"),
-) -> PaginatedCategoryResponse:
+) -> Response:
     """List categories with pagination and optional title search."""
+    return await db.respond(_list_categories, _categories_page, offset, limit, search)
+
+
+def _list_categories(db: Session, offset: int, limit: int, search: str | None) -> tuple[list[Category], int]:
     stmt = select(Category)
     count_stmt = select(func.count()).select_from(Category)
 
@@ -50,7 +56,11 @@ def list_categories(
 
     total = db.scalar(count_stmt)
     categories = db.scalars(stmt.offset(offset).limit(limit)).all()
+    return categories, total
 
+
+def _categories_page(rows: tuple[list[Category], int]) -> PaginatedCategoryResponse:
+    categories, total = rows
     return PaginatedCategoryResponse(
         data=[CategorySchema.from_orm_category(c) for c in categories],
         total=total,
@@ -64,17 +74,23 @@ def list_categories(
         "Returns a single category by ID. Use include_datasets=true to include nested datasets, "
         "and include_layers=true to also include each dataset's layers."
     ),
+    response_model=CategorySchema | CategoryWithDatasetsSchema | CategoryWithDatasetsAndLayersSchema,
     responses={404: {"description": "Category not found"}},
 )
-def get_category(
+async def get_category(
     category_id: int,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[DbRunner, Depends(get_db_runner)],
     include_datasets: bool = Query(default=False, description="Include nested datasets in response"),
     include_layers: bool = Query(
         default=False, description="Include layers within each dataset (requires include_datasets=true)"
     ),
-) -> CategorySchema | CategoryWithDatasetsSchema | CategoryWithDatasetsAndLayersSchema:
+) -> Response:
     """Get a single category by ID with optional nested datasets and layers."""
+    build = partial(_category_schema, include_datasets=include_datasets, include_layers=include_layers)
+    return await db.respond(_get_category, build, category_id, include_datasets, include_layers)
+
+
+def _get_category(db: Session, category_id: int, include_datasets: bool, include_layers: bool) -> Category:
     stmt = select(Category).where(Category.id == category_id)
 
     if include_datasets:
@@ -86,7 +102,12 @@ def get_category(
     category = db.scalars(stmt).first()
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
+    return category
 
+
+def _category_schema(
+    category: Category, include_datasets: bool, include_layers: bool
+) -> CategorySchema | CategoryWithDatasetsSchema | CategoryWithDatasetsAndLayersSchema:
     if include_datasets and include_layers:
         return CategoryWithDatasetsAndLayersSchema.from_orm_category(category)
     if include_datasets:
@@ -1,9 +1,16 @@
 """COG (Cloud Optimized GeoTIFF) tile server router."""
 
-from fastapi import HTTPException, Query
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from titiler.core.dependencies import ImageRenderingParams
 from titiler.core.factory import TilerFactory
 
 from config import get_settings
+from db.database import get_db
+from executors import TILES
+from services.layer_stats import default_rescale
 
 
 def s3_url_dependency(
@@ -27,9 +34,34 @@ def s3_url_dependency(
     return f"s3://{settings.s3_bucket_name}/{key}"
 
 
+def render_params_dependency(
+    request: Request,
+    render_params: Annotated[ImageRenderingParams, Depends(ImageRenderingParams)],
+    db: Annotated[Session, Depends(get_db)],
+) -> ImageRenderingParams:
+    """TiTiler rendering params, defaulting ``rescale`` from precomputed layer statistics.
+
+    Only applies when the request sets neither ``rescale`` nor a colormap: the
+    client's interval colormaps are expressed in raw pixel values and must not be
+    combined with a rescale. Layers without stored statistics render unchanged.
+    """
+    params = request.query_params
+    if render_params.rescale or "colormap" in params or "colormap_name" in params or "url" not in params:
+        return render_params
+
+    rescale = default_rescale(db, params["url"])
+    if rescale is None:
+        return render_params
+    render_params.rescale = [rescale]
+    return render_params
+
+
 cog_tiler = TilerFactory(
     path_dependency=s3_url_dependency,
+    render_dependency=render_params_dependency,
     router_prefix="/cog",
+    # Every COG endpoint reads rasters, so all of them run on the tiles executor.
+    router=APIRouter(route_class=TILES.route_class),
 )
 
 router = cog_tiler.router
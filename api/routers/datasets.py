@@ -1,12 +1,18 @@
 """Datasets endpoint router."""
 
+import logging
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import rasterio.errors
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session, selectinload
+from titiler.core.dependencies import ColorMapParams
 
-from db.database import get_db
+from config import get_settings
+from db.database import DbRunner, get_db, get_db_runner
+from executors import TILES
 from models.dataset import Dataset
 from schemas.dataset import (
     DatasetSchema,
@@ -14,6 +20,9 @@ from schemas.dataset import (
     PaginatedDatasetResponse,
     PaginatedDatasetWithLayersResponse,
 )
+from services.tile_stack import render_tile_stack, select_slices
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Datasets"])
 
@@ -29,16 +38,24 @@ def _escape_like(value: str) -> str:
     description=(
         "Returns a paginated list of datasets with optional title search. Use include_layers=true to include related layers."
     ),
+    response_model=PaginatedDatasetResponse | PaginatedDatasetWithLayersResponse,
 )
-def list_datasets(
-    db: Annotated[Session, Depends(get_db)],
+async def list_datasets(
+    db: Annotated[DbRunner, Depends(get_db_runner)],
     offset: int = Query(default=0, ge=0, description="Number of items to skip"),
     limit: int = Query(default=10, ge=1, le=100, description="Number of items to return"),
     search: str | None = Query(default=None, description="Case-insensitive partial title search (en and fr)"),
     category_id: int | None = Query(default=None, description="Filter datasets by category ID"),
     include_layers: bool = Query(default=False, description="Include related layers in response"),
-) -> PaginatedDatasetResponse | PaginatedDatasetWithLayersResponse:
+) -> Response:
     """List datasets with pagination and optional title search."""
+    build = partial(_datasets_page, include_layers=include_layers)
+    return await db.respond(_list_datasets, build, offset, limit, search, category_id, include_layers)
+
+
+def _list_datasets(
+    db: Session, offset: int, limit: int, search: str | None, category_id: int | None, include_layers: bool
+) -> tuple[list[Dataset], int]:
     stmt = select(Dataset)
     count_stmt = select(func.count()).select_from(Dataset)
 
@@ -60,7 +77,13 @@ def list_datasets(
 
     total = db.scalar(count_stmt)
     datasets = db.scalars(stmt.offset(offset).limit(limit)).all()
+    return datasets, total
+
 
+def _datasets_page(
+    rows: tuple[list[Dataset], int], include_layers: bool
+) -> PaginatedDatasetResponse | PaginatedDatasetWithLayersResponse:
+    datasets, total = rows
     if include_layers:
         return PaginatedDatasetWithLayersResponse(
             data=[DatasetWithLayersSchema.from_orm_dataset(d) for d in datasets],
@@ -76,14 +99,20 @@ def list_datasets(
     "/{dataset_id}",
     summary="Get Dataset",
     description=("Returns a single dataset by ID. Use include_layers=true to include related layers."),
+    response_model=DatasetSchema | DatasetWithLayersSchema,
     responses={404: {"description": "Dataset not found"}},
 )
-def get_dataset(
+async def get_dataset(
     dataset_id: int,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[DbRunner, Depends(get_db_runner)],
     include_layers: bool = Query(default=False, description="Include related layers in response"),
-) -> DatasetSchema | DatasetWithLayersSchema:
+) -> Response:
     """Get a single dataset by ID."""
+    build = partial(_dataset_schema, include_layers=include_layers)
+    return await db.respond(_get_dataset, build, dataset_id, include_layers)
+
+
+def _get_dataset(db: Session, dataset_id: int, include_layers: bool) -> Dataset:
     stmt = select(Dataset).where(Dataset.id == dataset_id)
 
     if include_layers:
@@ -92,7 +121,72 @@ def get_dataset(
     dataset = db.scalars(stmt).first()
     if dataset is None:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    return dataset
+
 
+def _dataset_schema(dataset: Dataset, include_layers: bool) -> DatasetSchema | DatasetWithLayersSchema:
     if include_layers:
         return DatasetWithLayersSchema.from_orm_dataset(dataset)
     return DatasetSchema.from_orm_dataset(dataset)
+
+
+def _parse_rescale(value: str | None) -> tuple[float, float] | None:
+    if value is None:
+        return None
+    try:
+        lo, hi = (float(part) for part in value.split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="rescale must be 'min,max'")
+    return lo, hi
+
+
+@router.get(
+    "/{dataset_id}/tiles/{z}/{x}/{y}",
+    summary="Get Time-Series Tile Stack",
+    description=(
+        "Renders the WebMercatorQuad tile `{z}/{x}/{y}` of every time-step layer of a dataset "
+        "(e.g. the six snow winters) in one response, for map animations. Slices are ordered by "
+        "series, then chronologically; use `series` (e.g. `lengthT_winter`) to select one.\n\n"
+        "The body is `[4-byte big-endian index length][JSON index][PNG][PNG]...`. The index is "
+        "`{tilesize, slices: [{layer_id, series, step, x, offset, length}]}` with offsets relative "
+        "to the end of the index; slices not covering the tile have length 0.\n\n"
+        "`colormap`/`colormap_name` follow the `/cog` tile parameters and apply to every slice. "
+        "Without a colormap, slices are rescaled with `rescale` or each layer's precomputed p2–p98 range."
+    ),
+    response_class=Response,
+    responses={
+        200: {"description": "Packed tile stack", "content": {"application/octet-stream": {}}},
+        404: {"description": "Dataset not found"},
+        422: {"description": "Dataset has no time-series layers, unknown series, or invalid parameters"},
+        500: {"description": "Tile stack is unavailable"},
+    },
+)
+@TILES.bind
+def get_dataset_tile_stack(
+    dataset_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    colormap: Annotated[dict | list | None, Depends(ColorMapParams)],
+    z: int = Path(ge=0, le=24, description="Tile zoom level"),
+    x: int = Path(ge=0, description="Tile column"),
+    y: int = Path(ge=0, description="Tile row"),
+    series: str | None = Query(default=None, description="Only return this series (e.g. 'lengthT_winter')"),
+    rescale: str | None = Query(default=None, description="Comma-delimited 'min,max' applied to every slice"),
+) -> Response:
+    """Render one tile for every time step of a dataset."""
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=422, detail=f"Tile {z}/{x}/{y} is outside the tile matrix")
+    if db.get(Dataset, dataset_id) is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    settings = get_settings()
+    if not settings.s3_bucket_name:
+        logger.error("S3_BUCKET_NAME is not configured")
+        raise HTTPException(status_code=500, detail="Tile stack is unavailable")
+
+    slices = select_slices(db, dataset_id, settings.s3_bucket_name, series=series, rescale=_parse_rescale(rescale))
+    try:
+        content = render_tile_stack(slices, z, x, y, colormap=colormap)
+    except rasterio.errors.RasterioIOError:
+        logger.exception("Failed to read raster data")
+        raise HTTPException(status_code=500, detail="Tile stack is unavailable")
+    return Response(content=content, media_type="application/octet-stream")
@@ -1,80 +1,145 @@
 """Hudson Bay Lowlands study-area endpoint router.
 
-Serves the same GeoJSON file that backs the ``POST /analysis`` containment
-check, so the client renders the exact polygon the server validates against.
-Loaded once at module import; failures (missing file, malformed GeoJSON,
-unsupported geometry type) raise at startup rather than on first request.
+Serves the same footprint that backs the ``POST /analysis/v2`` containment
+check (``services.hbl_shape.HBL_FOOTPRINT``), so the client renders the exact
+polygon the server validates against. Loaded once at import; failures
+(missing file, malformed GeoJSON, unsupported geometry type) raise at startup
+rather than on first request.
+
+Simplified variants of the boundary (``?zoom=`` / ``?tolerance=``) are built,
+serialized and gzip-compressed once, so a request only picks pre-encoded
+bytes. ``GET /hbl-area/tiles/{z}/{x}/{y}`` serves the same boundary as vector
+tiles from per-zoom simplified copies (see ``services.vector_tiles``). Both
+take a few seconds of CPU, so they are not built at import: ``warm_up`` builds
+them in the gunicorn master before the workers fork (which then share them
+copy-on-write), or in a background thread after startup under plain uvicorn;
+a request arriving before that builds them itself.
 """
 
-import json
+import gzip
 import logging
-from pathlib import Path
+import threading
+from dataclasses import dataclass
+from functools import cache, lru_cache
+from typing import Annotated
 
-from fastapi import APIRouter
+import shapely
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
 from shapely.geometry import mapping, shape
-from shapely.ops import unary_union
 
-from config import get_settings
+from executors import TILES
 from schemas.hbl_area import HBLAreaResponse
+from services.hbl_shape import HBL_FOOTPRINT
+from services.vector_tiles import MAX_TILE_ZOOM, MVT_MEDIA_TYPE, ZoomPyramid, encode_tile, validate_tile
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["HBL Area"])
 
 
-def _load_hbl_area_feature() -> HBLAreaResponse:
-    """Read the configured HBL GeoJSON file and return a normalised Feature.
-
-    The on-disk file may be a Feature or a FeatureCollection. A FeatureCollection
-    with multiple features is collapsed into a single Feature whose geometry is
-    the unary union of the inputs (so the response shape is stable regardless
-    of how the file is authored). Per-feature properties are preserved only
-    when the file is a single Feature; for unioned collections the response
-    carries the FeatureCollection-level properties, if any.
-
-    The returned object is validated by the ``HBLAreaResponse`` schema, so a
-    malformed file fails loudly at startup.
-    """
-    raw_path = Path(get_settings().hbl_shape_path)
-    path = raw_path if raw_path.is_absolute() else Path(__file__).resolve().parent.parent / raw_path
-    if not path.is_file():
-        raise RuntimeError(f"HBL shape file not found at {path}")
-
-    with path.open() as f:
-        gj = json.load(f)
-
-    gj_type = gj.get("type")
-    if gj_type == "Feature":
-        feature_dict = gj
-    elif gj_type == "FeatureCollection":
-        features = gj.get("features") or []
-        if not features:
-            raise RuntimeError(f"HBL FeatureCollection at {path} contains no features")
-        if len(features) == 1:
-            feature_dict = features[0]
-        else:
-            unioned = unary_union([shape(f["geometry"]) for f in features])
-            feature_dict = {
-                "type": "Feature",
-                "geometry": mapping(unioned),
-                "properties": gj.get("properties"),
-            }
-    else:
-        raise RuntimeError(
-            f"HBL file at {path} must be a Feature or FeatureCollection (got type='{gj_type}')"
+_HBL_AREA_FEATURE: HBLAreaResponse = HBL_FOOTPRINT.feature
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Simplified variants for GET /hbl-area?zoom=|tolerance=
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Douglas–Peucker tolerances (degrees) of the precomputed variants, finest first.
+# 0 is the unmodified boundary; 0.05° is ~5 km, about one pixel at zoom 3.
+HBL_AREA_TOLERANCES: tuple[float, ...] = (0.0, 0.0005, 0.002, 0.01, 0.05)
+
+
+@dataclass(frozen=True)
+class HBLAreaVariant:
+    """One precomputed level of detail, serialized and gzip-compressed."""
+
+    tolerance: float
+    vertex_count: int
+    body: bytes
+    gzipped: bytes
+
+
+def _build_variants(feature: HBLAreaResponse) -> list[HBLAreaVariant]:
+    geom = shape(feature.geometry.model_dump())
+    variants = []
+    for tolerance in HBL_AREA_TOLERANCES:
+        simplified = shapely.simplify(geom, tolerance, preserve_topology=True) if tolerance else geom
+        variant_feature = HBLAreaResponse.model_validate(
+            {"type": "Feature", "geometry": mapping(simplified), "properties": feature.properties}
         )
+        body = variant_feature.model_dump_json().encode()
+        variants.append(HBLAreaVariant(
+            tolerance=tolerance,
+            vertex_count=shapely.get_num_coordinates(simplified),
+            body=body,
+            gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+        ))
+        logger.info(
+            "HBL area variant tolerance=%s: %d vertices, %d bytes (%d gzipped)",
+            tolerance, variants[-1].vertex_count, len(body), len(variants[-1].gzipped),
+        )
+    return variants
+
+
+# Held while building, so concurrent first requests wait for one build instead of repeating it.
+_build_lock = threading.Lock()
+
+
+@cache
+def _hbl_area_variants() -> list[HBLAreaVariant]:
+    return _build_variants(_HBL_AREA_FEATURE)
+
+
+def hbl_area_variants() -> list[HBLAreaVariant]:
+    """The precomputed variants, finest first; built on first use."""
+    with _build_lock:
+        return _hbl_area_variants()
+
+
+def _zoom_tolerance(zoom: int) -> float:
+    """Size in degrees of one 256-px tile pixel at ``zoom`` (at the equator)."""
+    return 360.0 / (256 << zoom)
+
+
+def _select_variant(tolerance: float | None) -> HBLAreaVariant:
+    """Coarsest variant whose tolerance does not exceed ``tolerance``; full detail when None."""
+    variants = hbl_area_variants()
+    if tolerance is None:
+        return variants[0]
+    return max((v for v in variants if v.tolerance <= tolerance), key=lambda v: v.tolerance)
 
-    feature = HBLAreaResponse.model_validate(feature_dict)
-    logger.info(
-        "Loaded HBL area Feature from %s (geometry=%s)",
-        path,
-        feature.geometry.type,
-    )
-    return feature
 
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
 
-# Loaded once at import. Same lifecycle as services.analysis.HBL_SHAPE.
-_HBL_AREA_FEATURE: HBLAreaResponse = _load_hbl_area_feature()
+
+@cache
+def _hbl_area_pyramid() -> ZoomPyramid:
+    return ZoomPyramid(HBL_FOOTPRINT.geometry)
+
+
+def hbl_area_pyramid() -> ZoomPyramid:
+    """Per-zoom simplified copies of the footprint for the vector-tile endpoint (levels built on first use)."""
+    with _build_lock:
+        return _hbl_area_pyramid()
+
+
+def warm_up() -> None:
+    """Build the variants and every pyramid level now instead of on the first requests."""
+    hbl_area_variants()
+    hbl_area_pyramid().precompute()
+
+
+HBL_AREA_TILE_LAYER = "hbl_area"
+HBL_AREA_TILE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=HBL_AREA_TILE_CACHE_SIZE)
+def _hbl_area_tile(z: int, x: int, y: int) -> bytes:
+    return encode_tile(HBL_AREA_TILE_LAYER, hbl_area_pyramid(), z, x, y)
 
 
 @router.get(
@@ -89,14 +154,80 @@ _HBL_AREA_FEATURE: HBLAreaResponse = _load_hbl_area_feature()
         "polygon submitted to `POST /analysis` must lie entirely within this "
         "shape. Clients are expected to render this feature as the highlight "
         "the user draws inside.\n\n"
-        "The response is cached in memory at server start, so it is safe to "
-        "fetch on every map load."
+        "Without parameters the full-detail boundary is returned. `zoom` (map "
+        "zoom level) or `tolerance` (degrees) select one of a few "
+        "topology-preserving simplifications instead: the coarsest one whose "
+        f"tolerance does not exceed the request ({', '.join(str(t) for t in HBL_AREA_TOLERANCES)} "
+        "degrees). Clients can load a light outline first and fetch detail when "
+        "zoomed in.\n\n"
+        "Every variant is serialized and gzip-compressed once per server, so it "
+        "is safe to fetch on every map load. `X-Vertex-Count` and "
+        "`X-Simplify-Tolerance` describe the returned variant and "
+        "`X-Uncompressed-Length` its size before compression."
     ),
     response_model=HBLAreaResponse,
     responses={
         200: {"description": "GeoJSON Feature describing the HBL study area"},
+        422: {"description": "Both `zoom` and `tolerance` were given, or a value is out of range"},
+    },
+)
+def get_hbl_area(
+    request: Request,
+    zoom: Annotated[
+        int | None,
+        Query(ge=0, le=MAX_TILE_ZOOM, description="Map zoom level; about one screen pixel of simplification"),
+    ] = None,
+    tolerance: Annotated[
+        float | None,
+        Query(ge=0, description="Maximum simplification tolerance in degrees"),
+    ] = None,
+) -> Response:
+    """Return the cached HBL study-area Feature at the requested level of detail."""
+    if zoom is not None and tolerance is not None:
+        raise HTTPException(status_code=422, detail="Pass either 'zoom' or 'tolerance', not both")
+    if zoom is not None:
+        tolerance = _zoom_tolerance(zoom)
+    variant = _select_variant(tolerance)
+
+    headers = {
+        "X-Vertex-Count": str(variant.vertex_count),
+        "X-Simplify-Tolerance": str(variant.tolerance),
+        "X-Uncompressed-Length": str(len(variant.body)),
+        "Vary": "Accept-Encoding",
+    }
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=variant.gzipped, media_type="application/json", headers=headers)
+    return Response(content=variant.body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/tiles/{z}/{x}/{y}",
+    summary="Hudson Bay Lowlands study-area boundary as vector tiles",
+    description=(
+        "Serves the study-area boundary as Mapbox Vector Tiles (one layer, "
+        f"`{HBL_AREA_TILE_LAYER}`), for use as a `vector` map source instead of "
+        "downloading the full-resolution `GET /hbl-area` GeoJSON.\n\n"
+        "The geometry is simplified per zoom level (about one pixel of tolerance) "
+        "and clipped to each tile, so low-zoom tiles are a few kilobytes. Tiles "
+        "that do not intersect the boundary return 204 No Content."
+    ),
+    response_class=Response,
+    responses={
+        200: {"content": {MVT_MEDIA_TYPE: {}}, "description": "Mapbox Vector Tile"},
+        204: {"description": "Tile does not intersect the study area"},
+        422: {"description": "Tile coordinates outside the tile matrix"},
     },
 )
-def get_hbl_area() -> HBLAreaResponse:
-    """Return the cached HBL study-area Feature."""
-    return _HBL_AREA_FEATURE
+@TILES.bind
+def get_hbl_area_tile(
+    z: Annotated[int, Path(ge=0, le=MAX_TILE_ZOOM)],
+    x: int,
+    y: int,
+) -> Response:
+    """Return one vector tile of the HBL study-area boundary."""
+    validate_tile(z, x, y)
+    content = _hbl_area_tile(z, x, y)
+    if not content:
+        return Response(status_code=204)
+    return Response(content=content, media_type=MVT_MEDIA_TYPE)
@@ -2,12 +2,15 @@
 
 from typing import Annotated
 
+import anyio
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from config import get_settings
+from db.database import async_engine, engine, get_db, pool_status
+from executors import EXECUTORS
 
 router = APIRouter(tags=["Health"])
 
@@ -40,3 +43,46 @@ def health(db: Annotated[Session, Depends(get_db)]):
                 },
             },
         )
+
+
+@router.get(
+    "/health/db-pool",
+    summary="Database Pool Statistics",
+    description=(
+        "Connection pool occupancy (`size`, `checked_out`, `overflow`) and cumulative checkout statistics "
+        "(`checkouts`, `timeouts`, mean/max `wait_ms` to obtain a connection) of this worker's sync and "
+        "async engines. `async_enabled` tells whether the catalog and share reads use the async engine."
+    ),
+)
+def db_pool():
+    """Report the connection pool statistics of this worker process."""
+    return {
+        "async_enabled": get_settings().db_async,
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool),
+    }
+
+
+@router.get(
+    "/health/executors",
+    summary="Workload Executor Statistics",
+    description=(
+        "Occupancy and cumulative statistics of this worker's executors, one per workload class "
+        "(`analysis`, `tiles`, `catalog`): `active`/`workers` threads, `queued` requests (up to "
+        "`max_queue`, beyond which requests get 503), `saturated` when every thread is busy, "
+        "`completed`/`rejected`/`cancelled` counts and mean/max `wait_ms` spent queued. `default` is "
+        "Starlette's threadpool, which serves the unbound endpoints."
+    ),
+)
+async def executors():
+    """Report the workload executor statistics of this worker process."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    return {
+        **{executor.name: executor.status() for executor in EXECUTORS},
+        "default": {
+            "workers": int(limiter.total_tokens),
+            "active": stats.borrowed_tokens,
+            "queued": stats.tasks_waiting,
+        },
+    }
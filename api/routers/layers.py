@@ -1,14 +1,22 @@
 """Layers endpoint router."""
 
+import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import rasterio.errors
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from config import get_settings
+from db.database import DbRunner, get_db, get_db_runner
+from executors import TILES
 from models.layer import Layer
-from schemas.layer import LayerSchema, PaginatedLayerResponse
+from schemas.layer import LayerPointResponse, LayerSchema, LayerStatisticsSchema, PaginatedLayerResponse
+from services.layers import load_raster_layers, parse_layer_ids
+from services.point_query import MAX_POINT_LAYERS, sample_layers
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Layers"])
 
@@ -22,14 +30,19 @@ def _escape_like(value: str) -> str:
     "",
     summary="List Layers",
     description="Returns a paginated list of layers with optional title search.",
+    response_model=PaginatedLayerResponse,
 )
-def list_layers(
-    db: Annotated[Session, Depends(get_db)],
+async def list_layers(
+    db: Annotated[DbRunner, Depends(get_db_runner)],
     offset: int = Query(default=0, ge=0, description="Number of items to skip"),
     limit: int = Query(default=10, ge=1, le=100, description="Number of items to return"),
     search: str | None = Query(default=None, description="Case-insensitive partial title search (en and fr)"),
-) -> PaginatedLayerResponse:
+) -> Response:
     """List layers with pagination and optional title search."""
+    return await db.respond(_list_layers, _layers_page, offset, limit, search)
+
+
+def _list_layers(db: Session, offset: int, limit: int, search: str | None) -> tuple[list[Layer], int]:
     stmt = select(Layer)
     count_stmt = select(func.count()).select_from(Layer)
 
@@ -44,25 +57,106 @@ def list_layers(
 
     total = db.scalar(count_stmt)
     layers = db.scalars(stmt.offset(offset).limit(limit)).all()
+    return layers, total
 
+
+def _layers_page(rows: tuple[list[Layer], int]) -> PaginatedLayerResponse:
+    layers, total = rows
     return PaginatedLayerResponse(
         data=[LayerSchema.from_orm_layer(layer) for layer in layers],
         total=total,
     )
 
 
+@router.get(
+    "/point",
+    summary="Query Layers at a Point",
+    description=(
+        "Samples several raster layers at a single location in one request (map tooltips). "
+        "Categorical values include their label from the layer categories; time-series layers "
+        f"(e.g. the snow winters) are grouped into ordered series. At most {MAX_POINT_LAYERS} layers per request."
+    ),
+    responses={
+        404: {"description": "One or more layers not found"},
+        422: {"description": "Invalid coordinates or layer list, or a non-raster layer was requested"},
+    },
+)
+@TILES.bind
+def query_point(
+    db: Annotated[Session, Depends(get_db)],
+    lon: float = Query(ge=-180, le=180, description="Longitude (EPSG:4326)"),
+    lat: float = Query(ge=-90, le=90, description="Latitude (EPSG:4326)"),
+    layers: str = Query(description="Comma-separated layer ids"),
+) -> LayerPointResponse:
+    """Sample the requested raster layers at (lon, lat)."""
+    layer_ids = parse_layer_ids(layers)
+    if not layer_ids:
+        raise HTTPException(status_code=422, detail="At least one layer id is required")
+    if len(layer_ids) > MAX_POINT_LAYERS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_POINT_LAYERS} layers can be queried at once")
+    raster_layers = load_raster_layers(db, layer_ids)
+
+    settings = get_settings()
+    if not settings.s3_bucket_name:
+        logger.error("S3_BUCKET_NAME is not configured")
+        raise HTTPException(status_code=500, detail="Point query is unavailable")
+
+    try:
+        return sample_layers(raster_layers, lon, lat, settings.s3_bucket_name)
+    except rasterio.errors.RasterioIOError:
+        logger.exception("Failed to read raster data")
+        raise HTTPException(status_code=500, detail="Point query is unavailable")
+
+
 @router.get(
     "/{layer_id}",
     summary="Get Layer",
     description="Returns a single layer by ID.",
+    response_model=LayerSchema,
     responses={404: {"description": "Layer not found"}},
 )
-def get_layer(
+async def get_layer(
     layer_id: str,
-    db: Annotated[Session, Depends(get_db)],
-) -> LayerSchema:
+    db: Annotated[DbRunner, Depends(get_db_runner)],
+) -> Response:
     """Get a single layer by ID."""
+    return await db.respond(_get_layer, LayerSchema.from_orm_layer, layer_id)
+
+
+def _get_layer(db: Session, layer_id: str) -> Layer:
     layer = db.get(Layer, layer_id)
     if layer is None:
         raise HTTPException(status_code=404, detail="Layer not found")
-    return LayerSchema.from_orm_layer(layer)
+    return layer
+
+
+@router.get(
+    "/{layer_id}/statistics",
+    summary="Get Layer Statistics",
+    description=(
+        "Returns precomputed global statistics (min/max/mean/std, percentiles and a fixed-edge "
+        "histogram) for a continuous raster layer. Use them for gradient legends and tile rescaling "
+        "instead of computing statistics over the whole raster at request time."
+    ),
+    response_model=LayerStatisticsSchema,
+    responses={404: {"description": "Layer not found or statistics not computed"}},
+)
+async def get_layer_statistics(
+    layer_id: str,
+    db: Annotated[DbRunner, Depends(get_db_runner)],
+) -> Response:
+    """Get the precomputed statistics of a single layer."""
+    return await db.respond(_get_layer_statistics, _layer_statistics, layer_id)
+
+
+def _get_layer_statistics(db: Session, layer_id: str) -> Layer:
+    layer = db.get(Layer, layer_id)
+    if layer is None:
+        raise HTTPException(status_code=404, detail="Layer not found")
+    if not layer.stats:
+        raise HTTPException(status_code=404, detail="Statistics not available for this layer")
+    return layer
+
+
+def _layer_statistics(layer: Layer) -> LayerStatisticsSchema:
+    return LayerStatisticsSchema(layer_id=layer.id, **layer.stats)
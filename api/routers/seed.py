@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from config import get_settings
 from db.database import get_db
 from schemas import SeedPayload
+from services.layer_stats import compute_layer_stats
 from services.seed import seed_database
 
 logger = logging.getLogger(__name__)
@@ -30,8 +31,11 @@ def verify_seed_secret(x_seed_secret: Annotated[str, Header(description="Secret
     summary="Seed the database",
     description=(
         "Populate the database from a JSON payload. Requires X-Seed-Secret header. "
-        "Idempotent by default (upserts categories/datasets/layers). Pass "
-        "`delete_first=true` to wipe categories/datasets/layers before applying the payload."
+        "Idempotent by default: the payload is diffed against the stored categories/datasets/layers "
+        "and only added or changed rows are written; the response lists the `added`, `changed` and "
+        "`removed` (stored but not in the payload) ids per table. Pass `delete_first=true` to also "
+        "delete the removed rows, `dry_run=true` to only report the diff, and `compute_stats=true` "
+        "to (re)compute global statistics of continuous raster layers."
     ),
     responses={
         200: {"description": "Database seeded successfully"},
@@ -45,15 +49,37 @@ def run_seed(
     delete_first: Annotated[
         bool,
         Query(
-            description=("If true, wipe categories/datasets/layers before applying the metadata. Use to reset state."),
+            description=(
+                "If true, delete categories/datasets/layers that are not in the payload, leaving exactly "
+                "the payload's catalog. Use to reset state."
+            ),
+        ),
+    ] = False,
+    dry_run: Annotated[
+        bool,
+        Query(description="If true, report the diff without writing anything (`compute_stats` is ignored)."),
+    ] = False,
+    compute_stats: Annotated[
+        bool,
+        Query(
+            description=(
+                "If true, compute global statistics (min/max/percentiles/histogram) for every continuous "
+                "raster layer from its coarsest usable overview. Reads each raster from S3."
+            ),
         ),
     ] = False,
 ):
     """Seed the database with the provided metadata payload."""
     try:
-        counts = seed_database(db, payload=payload.to_dict(), delete_first=delete_first)
+        counts = seed_database(db, payload=payload.to_dict(), delete_first=delete_first, dry_run=dry_run)
+        diff = counts.pop("diff")
+        if dry_run:
+            db.rollback()
+            return {"status": "success", "counts": counts, "diff": diff}
+        if compute_stats:
+            counts["stats"] = compute_layer_stats(db, get_settings().s3_bucket_name)
         db.commit()
-        return {"status": "success", "counts": counts}
+        return {"status": "success", "counts": counts, "diff": diff}
     except Exception:
         db.rollback()
         logger.exception("Seed failed")
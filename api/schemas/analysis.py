@@ -238,3 +238,15 @@ class AnalysisResponse(BaseModel):
     snow_dynamics: SnowDynamicsWidget
     treed_area: TreedAreaWidget
     ecosystem_classification: EcosystemClassificationWidget
+
+
+class FeatureCollectionAnalysisResponse(BaseModel):
+    """Per-feature analysis of a FeatureCollection (``POST /analysis/v2/features``)."""
+
+    union: AnalysisResponse = Field(description="Analysis of all features unioned — same as `POST /analysis/v2`.")
+    features: dict[str, AnalysisResponse] = Field(
+        description=(
+            "Analysis of each feature, keyed by the `id_property` value when given, "
+            "otherwise by the feature's zero-based index. Keys are in input order."
+        ),
+    )
@@ -0,0 +1,27 @@
+"""Pydantic schemas for the clipped-raster export endpoint."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from schemas.analysis import AnalysisInput
+
+MAX_EXPORT_LAYERS = 20
+
+
+class AnalysisExportRequest(BaseModel):
+    """Body of ``POST /analysis/v2/export`` — the AOI plus the raster layers to clip."""
+
+    geojson: AnalysisInput
+    layers: list[str] = Field(
+        min_length=1,
+        max_length=MAX_EXPORT_LAYERS,
+        description="Raster layer ids to export, in output order",
+    )
+    format: Literal["zip", "tif"] = Field(
+        default="zip",
+        description=(
+            "'zip': one single-band GeoTIFF per layer. 'tif': one multi-band GeoTIFF, only "
+            "available when all layers share the same grid, data type and nodata value."
+        ),
+    )
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field
 
-from schemas.i18n import LayerCategory, LayerConfig, LayerMetadata
+from schemas.i18n import I18nText, LayerCategory, LayerConfig, LayerMetadata
 
 
 class LayerSchema(BaseModel):
@@ -77,8 +77,119 @@ class LayerSchema(BaseModel):
         )
 
 
+class LayerHistogram(BaseModel):
+    """Fixed-edge histogram of a layer's pixel values."""
+
+    edges: list[float] = Field(description="Bin edges (one more than the number of bins)")
+    counts: list[int] = Field(description="Pixel count per bin")
+
+
+class LayerStatisticsSchema(BaseModel):
+    """Precomputed global statistics of a continuous raster layer."""
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "layer_id": "peat_cog",
+                    "min": 0.0,
+                    "max": 412.0,
+                    "mean": 143.2,
+                    "std": 61.9,
+                    "percentiles": {"p2": 12.0, "p5": 25.0, "p50": 140.0, "p95": 251.0, "p98": 290.0},
+                    "histogram": {
+                        "edges": [0.0, 41.2, 82.4, 123.6, 164.8, 206.0, 247.2, 288.4, 329.6, 370.8, 412.0],
+                        "counts": [1021, 5230, 90211, 180320, 150112, 80233, 30211, 9021, 1002, 120],
+                    },
+                    "valid_pixels": 547483,
+                    "overview_level": 4,
+                }
+            ]
+        }
+    }
+
+    layer_id: str = Field(description="Layer identifier")
+    min: float = Field(description="Minimum valid pixel value")
+    max: float = Field(description="Maximum valid pixel value")
+    mean: float = Field(description="Mean of valid pixel values")
+    std: float = Field(description="Standard deviation of valid pixel values")
+    percentiles: dict[str, float] = Field(description="Percentiles keyed 'p2', 'p5', 'p50', 'p95', 'p98'")
+    histogram: LayerHistogram = Field(description="Fixed-edge histogram spanning [min, max]")
+    valid_pixels: int = Field(description="Number of valid pixels the statistics were computed from")
+    overview_level: int | None = Field(
+        description="Overview level the statistics were read from (null for native resolution)"
+    )
+
+
 class PaginatedLayerResponse(BaseModel):
     """Paginated layer list response."""
 
     data: list[LayerSchema] = Field(description="List of layers for the current page")
     total: int = Field(description="Total number of layers matching the query")
+
+
+class LayerPointValue(BaseModel):
+    """Decoded pixel value of a single raster layer at the queried location."""
+
+    layer_id: str = Field(description="Layer identifier")
+    value: float | int | None = Field(description="Pixel value, or null when outside the raster or nodata")
+    unit: str | None = Field(default=None, description="Data measurement unit")
+    label: I18nText | None = Field(
+        default=None, description="Category label for categorical layers (from `Layer.categories`)"
+    )
+
+
+class LayerPointSeriesStep(BaseModel):
+    """One time step of a time-series point query."""
+
+    layer_id: str = Field(description="Layer identifier for this time step")
+    step: str = Field(description="Time step code from the layer id (e.g. '1819' for winter 2018-2019)")
+    x: int = Field(description="Start year of the time step, matching the widget chart X axis")
+    value: float | int | None = Field(description="Pixel value, or null when outside the raster or nodata")
+
+
+class LayerPointSeries(BaseModel):
+    """Time-series layers sampled at one location, ordered by time step."""
+
+    key: str = Field(description="Series key shared by all layers in the series (e.g. 'lengthT_winter')")
+    unit: str | None = Field(default=None, description="Data measurement unit")
+    steps: list[LayerPointSeriesStep] = Field(description="Values ordered by time step")
+
+
+class LayerPointResponse(BaseModel):
+    """Values of several raster layers at a single location."""
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "lon": -84.0,
+                    "lat": 57.0,
+                    "values": [
+                        {"layer_id": "peat_cog", "value": 200.0, "unit": "cm", "label": None},
+                        {
+                            "layer_id": "ecosystem_classification_cog",
+                            "value": 8,
+                            "unit": "category",
+                            "label": {"en": "Bog", "fr": "Tourbière ombrotrophe"},
+                        },
+                    ],
+                    "series": [
+                        {
+                            "key": "lengthT_winter",
+                            "unit": "days",
+                            "steps": [
+                                {"layer_id": "lengthT_winter_1819_cog", "step": "1819", "x": 2018, "value": 100},
+                                {"layer_id": "lengthT_winter_1920_cog", "step": "1920", "x": 2019, "value": 110},
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+    }
+
+    lon: float = Field(description="Queried longitude (EPSG:4326)")
+    lat: float = Field(description="Queried latitude (EPSG:4326)")
+    values: list[LayerPointValue] = Field(description="Single-layer values, in request order")
+    series: list[LayerPointSeries] = Field(description="Time-series layers grouped into ordered series")
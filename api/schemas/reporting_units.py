@@ -0,0 +1,22 @@
+"""Pydantic schemas for the precomputed reporting-unit analyses."""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from schemas.analysis import AnalysisResponse
+
+
+class ReportingUnitStatsRead(BaseModel):
+    """Response from ``GET /analysis/v2/units/{layer_id}/{feature_id}``.
+
+    ``properties`` are the unit's attributes from the processed GeoJSON (names,
+    codes). ``computed_at`` is the UTC timestamp of the job run that produced
+    the analysis.
+    """
+
+    layer_id: str
+    feature_id: str
+    properties: dict | None
+    analysis: AnalysisResponse
+    computed_at: datetime
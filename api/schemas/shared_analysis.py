@@ -3,16 +3,33 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 from schemas.analysis import AnalysisInput, AnalysisResponse
 
 
 class SharedAnalysisCreate(BaseModel):
-    """Body of ``POST /analysis/v2/share`` — the rendered analysis plus the geojson used."""
+    """Body of ``POST /analysis/v2/share``.
 
-    analysis: AnalysisResponse
-    geojson: AnalysisInput
+    Either ``result_id`` — the ``X-Analysis-Result-Id`` of a recent
+    ``POST /analysis/v2`` run, shared by reference — or the rendered
+    ``analysis`` plus the ``geojson`` used, optionally with the run's
+    ``result_token`` (``X-Analysis-Result-Token``) to skip re-validation.
+    """
+
+    result_id: UUID | None = None
+    analysis: AnalysisResponse | None = None
+    geojson: AnalysisInput | None = None
+    result_token: str | None = None
+
+    @model_validator(mode="after")
+    def _reference_or_snapshot(self) -> "SharedAnalysisCreate":
+        snapshot = self.analysis is not None or self.geojson is not None or self.result_token is not None
+        if self.result_id is not None and snapshot:
+            raise ValueError("Provide either result_id or analysis and geojson, not both")
+        if self.result_id is None and (self.analysis is None or self.geojson is None):
+            raise ValueError("Provide result_id, or both analysis and geojson")
+        return self
 
 
 class SharedAnalysisCreateResponse(BaseModel):
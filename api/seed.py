@@ -4,6 +4,8 @@ Usage:
     cd api
     uv run python seed.py
     uv run python seed.py --metadata-path /custom/path/to/metadata.json
+    uv run python seed.py --compute-stats
+    uv run python seed.py --dry-run
 """
 
 import argparse
@@ -13,10 +15,13 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+from config import get_settings
 from db.base import Base
 from db.database import SessionLocal, engine
+from db.migrations import apply_migrations
 from logging_config import setup_logging
 from models import Category, Dataset, Layer  # noqa: F401
+from services.layer_stats import compute_layer_stats
 from services.seed import DEFAULT_METADATA_PATH, seed_database
 
 setup_logging("INFO")
@@ -31,26 +36,41 @@ def main():
         default=DEFAULT_METADATA_PATH,
         help=f"Path to metadata.json (default: {DEFAULT_METADATA_PATH})",
     )
+    parser.add_argument(
+        "--compute-stats",
+        action="store_true",
+        help="Compute global statistics for continuous raster layers (reads each raster from S3)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the added/changed/removed ids without writing anything",
+    )
     args = parser.parse_args()
 
     Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
 
     session = SessionLocal()
     try:
-        counts = seed_database(session, args.metadata_path)
+        counts = seed_database(session, args.metadata_path, dry_run=args.dry_run)
+        if args.dry_run:
+            session.rollback()
+            for name, table_diff in counts["diff"].items():
+                logger.info("%s: %s", name, table_diff)
+            return
+        if args.compute_stats:
+            counts["stats"] = compute_layer_stats(session, get_settings().s3_bucket_name)
         session.commit()
         logger.info("Seed committed successfully.")
         logger.info(
-            "Summary: %d categories (%d new, %d updated), %d datasets (%d new, %d updated), %d layers (%d new, %d updated)",
-            counts["categories"]["created"] + counts["categories"]["updated"],
-            counts["categories"]["created"],
-            counts["categories"]["updated"],
-            counts["datasets"]["created"] + counts["datasets"]["updated"],
-            counts["datasets"]["created"],
-            counts["datasets"]["updated"],
-            counts["layers"]["created"] + counts["layers"]["updated"],
-            counts["layers"]["created"],
-            counts["layers"]["updated"],
+            "Summary: categories (%d new, %d updated, %d unchanged), datasets (%d new, %d updated, %d unchanged), "
+            "layers (%d new, %d updated, %d unchanged)",
+            *(
+                counts[name][key]
+                for name in ("categories", "datasets", "layers")
+                for key in ("created", "updated", "unchanged")
+            ),
         )
     except Exception:
         session.rollback()
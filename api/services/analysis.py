@@ -1,17 +1,15 @@
 """Geometry validation service for POST /analysis."""
 
-import json
 import logging
-from pathlib import Path
 
 from fastapi import HTTPException
 from pyproj import Transformer
-from shapely.geometry import box, shape
-from shapely.ops import transform, unary_union
-from shapely.prepared import prep
+from shapely.geometry import box
+from shapely.ops import transform
 from shapely.validation import explain_validity
 
-from config import get_settings
+from services.geojson import ParsedAnalysisInput, extract_geometry
+from services.hbl_shape import HBL_FOOTPRINT
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +21,9 @@ logger = logging.getLogger(__name__)
 MIN_AREA_KM2: float = 1.0        # Polygons smaller than this produce meaningless stats
 MAX_AREA_KM2: float = 50_000.0   # ~⅛ of the HBL region; keeps raster I/O tractable
 
+# Features accepted by the per-feature analysis (``POST /analysis/v2/features``).
+MAX_ANALYSIS_FEATURES: int = 50
+
 # Hudson Bay Lowlands study area bounding box in EPSG:4326 (min_lon, min_lat, max_lon, max_lat).
 # Used by the legacy ``validate_geometry_v1`` path. Derived from the map default
 # view [-112, 50, -56, 64] with a +5° buffer on every side.
@@ -34,56 +35,9 @@ HBL_BBOX: tuple[float, float, float, float] = (-117.0, 45.0, -51.0, 69.0)
 _TRANSFORMER_4326_TO_6933 = Transformer.from_crs("EPSG:4326", "EPSG:6933", always_xy=True)
 
 
-def _load_hbl_shape():
-    """Load the HBL study-area polygon from GeoJSON and return a prepared geometry.
-
-    The file is expected to be in EPSG:4326 (lon/lat degrees) — same CRS as the
-    analysis input — so the containment check is a pure planar comparison with
-    no reprojection. See `.claude/PROJECTION.md` for rationale.
-
-    A FeatureCollection's features are unioned. The result is validated with
-    Shapely (``is_valid``) and wrapped in ``shapely.prepared.prep`` so repeated
-    predicate checks (``intersects``, ``covers``) are O(log n) rather than O(n).
-
-    Raises ``RuntimeError`` on startup if the file is missing or invalid — this
-    is a deploy-time configuration error, not a runtime condition.
-    """
-    raw_path = Path(get_settings().hbl_shape_path)
-    path = raw_path if raw_path.is_absolute() else Path(__file__).resolve().parent.parent / raw_path
-    if not path.is_file():
-        raise RuntimeError(f"HBL shape file not found at {path}")
-
-    with path.open() as f:
-        gj = json.load(f)
-
-    gj_type = gj.get("type")
-    if gj_type == "FeatureCollection":
-        geom = unary_union([shape(feat["geometry"]) for feat in gj["features"]])
-    elif gj_type == "Feature":
-        geom = shape(gj["geometry"])
-    else:
-        geom = shape(gj)
-
-    if not geom.is_valid:
-        raise RuntimeError(f"HBL shape at {path} is not a valid geometry: {explain_validity(geom)}")
-
-    logger.info("Loaded HBL shape from %s (type=%s, bounds=%s)", path, geom.geom_type, geom.bounds)
-    return prep(geom)
-
-
-HBL_SHAPE = _load_hbl_shape()
-
-
-def _extract_geometry(geojson):
-    """Return a Shapely geometry from a validated Feature or FeatureCollection.
-
-    For a FeatureCollection, all feature geometries are unioned into a single shape.
-    """
-    if geojson.type == "FeatureCollection":
-        parts = [shape(feature.geometry.model_dump()) for feature in geojson.features]
-        return unary_union(parts)
-
-    return shape(geojson.geometry.model_dump())
+def geometry_area_km2(geom) -> float:
+    """Area in km² of an EPSG:4326 geometry, projected to EPSG:6933 (Cylindrical Equal Area)."""
+    return transform(_TRANSFORMER_4326_TO_6933.transform, geom).area / 1_000_000
 
 
 def _validate_structure_and_area(geojson) -> tuple:
@@ -106,7 +60,7 @@ def _validate_structure_and_area(geojson) -> tuple:
     logger.info("Starting geometry validation [input_type=%s]", geojson.type)
 
     # ── Step 1: Extract ───────────────────────────────────────────────────────
-    geom = _extract_geometry(geojson)
+    geom = extract_geometry(geojson)
     logger.info("Step 1 passed — geometry extracted [shapely_type=%s]", geom.geom_type)
 
     # ── Step 2: Structural validity ───────────────────────────────────────────
@@ -120,8 +74,7 @@ def _validate_structure_and_area(geojson) -> tuple:
     logger.info("Step 2 passed — geometry is structurally valid")
 
     # ── Steps 3 & 4: Area bounds (project once to equal-area CRS) ─────────────
-    projected = transform(_TRANSFORMER_4326_TO_6933.transform, geom)
-    area_km2 = projected.area / 1_000_000
+    area_km2 = geometry_area_km2(geom)
 
     if area_km2 < MIN_AREA_KM2:
         logger.warning(
@@ -187,16 +140,17 @@ def validate_geometry_v2(geojson) -> tuple:
 
     Runs steps 1–4 (structural validity + area bounds) and a step 5 that
     requires the geometry to lie entirely within the configured HBL polygon
-    (``HBL_SHAPE``). Boundary-touching geometries pass (``covers`` rather than
+    (``HBL_FOOTPRINT``). Boundary-touching geometries pass (``covers`` rather than
     ``contains``) so users drawing right up to the highlight edge are accepted.
     Backs the ``POST /analysis/v2`` endpoint.
     """
     geom, area_km2 = _validate_structure_and_area(geojson)
 
-    # ── Step 5: Geographic scope (full containment within HBL_SHAPE) ──────────
+    # ── Step 5: Geographic scope (full containment within HBL_FOOTPRINT) ──────
     # ``covers`` (vs ``contains``) accepts polygons whose edge touches the HBL
     # boundary, which matches user intent for "inside the highlighted region."
-    if not HBL_SHAPE.covers(geom):
+    # The footprint's grid mask settles most AOIs before any exact predicate.
+    if not HBL_FOOTPRINT.covers(geom):
         logger.warning("Step 5 failed — geometry is not entirely within the HBL study area")
         raise HTTPException(
             status_code=422,
@@ -206,3 +160,47 @@ def validate_geometry_v2(geojson) -> tuple:
 
     logger.info("Geometry validation complete (v2) [area=%.2f km²]", area_km2)
     return geom, area_km2
+
+
+def validate_features_v2(collection, id_property: str | None = None) -> tuple[tuple, list[tuple[str, object, float]]]:
+    """Validate a FeatureCollection as a whole and each of its features against the v2 rules.
+
+    The union goes through ``validate_geometry_v2`` exactly as in ``POST /analysis/v2``;
+    every feature must then pass the same steps on its own. Features are keyed by
+    ``properties[id_property]`` (stringified) when ``id_property`` is given,
+    otherwise by their zero-based index.
+
+    Returns ``((union_geom, union_area_km2), [(key, geom, area_km2), ...])`` in
+    input order. Raises ``HTTPException(422)`` naming the first failing feature,
+    or when ids are missing or duplicated.
+    """
+    if len(collection.features) > MAX_ANALYSIS_FEATURES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"FeatureCollection has {len(collection.features)} features; at most {MAX_ANALYSIS_FEATURES} are allowed",
+        )
+
+    keys: list[str] = []
+    for index, feature in enumerate(collection.features):
+        if id_property is None:
+            keys.append(str(index))
+            continue
+        value = (feature.properties or {}).get(id_property)
+        if value is None:
+            raise HTTPException(status_code=422, detail=f"Feature {index} has no '{id_property}' property")
+        keys.append(str(value))
+    if len(set(keys)) != len(keys):
+        duplicate = next(key for key in keys if keys.count(key) > 1)
+        raise HTTPException(status_code=422, detail=f"Duplicate feature id '{duplicate}' in '{id_property}'")
+
+    union = validate_geometry_v2(collection)
+
+    features = []
+    for index, (key, feature) in enumerate(zip(keys, collection.features)):
+        parsed = ParsedAnalysisInput(type="Feature", geometry=extract_geometry(feature))
+        try:
+            geom, area_km2 = validate_geometry_v2(parsed)
+        except HTTPException as exc:
+            raise HTTPException(status_code=exc.status_code, detail=f"Feature {index} ('{key}'): {exc.detail}") from exc
+        features.append((key, geom, area_km2))
+    return union, features
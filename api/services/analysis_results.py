@@ -0,0 +1,122 @@
+"""Storage of recent analysis results for incremental re-analysis.
+
+Every ``POST /analysis/v2`` run stores its AOI, response and per-layer additive
+components (see ``services.zonal_stats._run_layer_incremental``) and returns the
+row id in the ``X-Analysis-Result-Id`` header. A client editing the AOI sends
+that id back as ``?previous=``; layers whose statistics are additive are then
+only extracted over the regions the edit added or removed. The same id is
+promoted to a public share by ``POST /analysis/v2/share`` without re-uploading
+the analysis.
+
+Results also carry an HMAC-signed ``X-Analysis-Result-Token`` binding the
+response to the validated geometry. It outlives the stored row: sharing an
+expired result re-uploads the snapshot with the token, which then stands in for
+the v2 geometry validation.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import shapely
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.analysis_result import AnalysisResult
+from schemas.analysis import AnalysisResponse
+from services.share_codec import strip_catalog
+from services.zonal_stats import PreviousAnalysis
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_RESULT_TTL_HOURS: int = 24
+
+_TOKEN_VERSION = "v1"
+
+
+def store_result(
+    db: Session,
+    geom_4326,
+    polygon_area_km2: float,
+    analysis: AnalysisResponse,
+    components: dict[str, dict],
+) -> AnalysisResult:
+    """Persist an analysis result and return the inserted row. Does not commit.
+
+    The analysis is stored without its embedded catalog (``share_codec.strip_catalog``);
+    shares promoted from it are re-hydrated from the current catalog on read.
+    """
+    row = AnalysisResult(
+        geometry=shapely.to_wkb(geom_4326),
+        area_km2=polygon_area_km2,
+        analysis=strip_catalog(analysis.model_dump(mode="json")),
+        components=components,
+    )
+    db.add(row)
+    db.flush()
+    return row
+
+
+def get_result(db: Session, result_id: UUID) -> AnalysisResult | None:
+    """Return the stored result ``result_id``, or None when unknown or older than the TTL."""
+    row = db.get(AnalysisResult, result_id)
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(hours=ANALYSIS_RESULT_TTL_HOURS)
+    if row is None or row.created_at < cutoff:
+        return None
+    return row
+
+
+def load_previous(db: Session, result_id: UUID) -> PreviousAnalysis | None:
+    """Return the stored result ``result_id`` to compute an edited AOI against.
+
+    An unknown or expired id is not an error — the caller just runs the full
+    analysis — so this returns None instead of raising.
+    """
+    row = get_result(db, result_id)
+    if row is None:
+        logger.info("Previous analysis result %s not available — running a full analysis", result_id)
+        return None
+    return PreviousAnalysis(geometry=shapely.from_wkb(row.geometry), components=row.components)
+
+
+def delete_expired_results(db: Session, ttl_hours: int = ANALYSIS_RESULT_TTL_HOURS) -> int:
+    """Delete results older than ``ttl_hours``. Returns the number of rows removed.
+
+    Does NOT commit, like ``services.shared_analysis.delete_expired``.
+    """
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(hours=ttl_hours)
+    result = db.execute(delete(AnalysisResult).where(AnalysisResult.created_at < cutoff))
+    count = result.rowcount or 0
+    if count:
+        logger.info("Deleted %d expired analysis results (cutoff %s)", count, cutoff.isoformat())
+    return count
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Result tokens
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _token_key() -> bytes:
+    # Derived from SEED_SECRET (domain-separated) so deployments need no new secret.
+    return hashlib.sha256(b"analysis-result-token:" + get_settings().seed_secret.encode()).digest()
+
+
+def _result_digest(geom_4326, analysis: AnalysisResponse) -> bytes:
+    geometry = shapely.to_wkb(shapely.normalize(geom_4326))
+    payload = json.dumps(analysis.model_dump(mode="json"), sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(geometry).digest() + hashlib.sha256(payload).digest()
+
+
+def sign_result(geom_4326, analysis: AnalysisResponse) -> str:
+    """Return a token attesting that ``analysis`` was computed by this API for the v2-validated ``geom_4326``."""
+    mac = hmac.new(_token_key(), _result_digest(geom_4326, analysis), hashlib.sha256).hexdigest()
+    return f"{_TOKEN_VERSION}.{mac}"
+
+
+def verify_result_token(token: str, geom_4326, analysis: AnalysisResponse) -> bool:
+    """Check a ``sign_result`` token against an uploaded geometry and analysis."""
+    return hmac.compare_digest(token, sign_result(geom_4326, analysis))
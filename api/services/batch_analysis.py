@@ -0,0 +1,127 @@
+"""Batch analysis of many AOIs as one streamed job (``POST /analysis/v2/batch``).
+
+Every feature of the request is validated on its own with the v2 rules; a
+feature that fails is reported inline and does not fail the batch. Valid AOIs
+are processed in chunks of ``BATCH_CHUNK_SIZE``: each chunk is one
+raster-sequential pass (``compute_zonal_stats_many``), so every raster is
+opened once per chunk rather than once per AOI, and the chunk's results are
+written out as soon as it completes.
+
+The response is NDJSON, one line per feature::
+
+    {"index": 0, "id": "0", "status": "ok", "analysis": {...}}
+    {"index": 3, "id": "3", "status": "error", "status_code": 422, "detail": "..."}
+
+Validation errors come first, then results chunk by chunk in input order.
+``index`` is the position in the request's ``features``; ``id`` the
+``id_property`` value or, without it, the index.
+"""
+
+import json
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import rasterio.errors
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from schemas.analysis import AnalysisResponse
+from services.analysis import validate_geometry_v2
+from services.geojson import ParsedAnalysisInput, extract_geometry
+from services.zonal_stats import compute_zonal_stats_many
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_FEATURES = 500
+
+# AOIs per raster-sequential pass. Larger chunks open each raster fewer times
+# but delay the first results and hold more of them in memory.
+BATCH_CHUNK_SIZE = 25
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """One feature of the batch: its position, key and either its geometry or its validation error."""
+
+    index: int
+    id: str
+    geom: object | None = None
+    area_km2: float | None = None
+    error: HTTPException | None = None
+
+
+def validate_batch(collection, id_property: str | None = None) -> list[BatchItem]:
+    """Validate every feature independently; failures become error items instead of exceptions.
+
+    Raises ``HTTPException(422)`` only for problems with the batch itself: too
+    many features.
+    """
+    if len(collection.features) > MAX_BATCH_FEATURES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch has {len(collection.features)} features; at most {MAX_BATCH_FEATURES} are allowed",
+        )
+
+    items = []
+    for index, feature in enumerate(collection.features):
+        key = str(index)
+        if id_property is not None:
+            value = (feature.properties or {}).get(id_property)
+            if value is None:
+                error = HTTPException(status_code=422, detail=f"Feature has no '{id_property}' property")
+                items.append(BatchItem(index=index, id=key, error=error))
+                continue
+            key = str(value)
+        try:
+            geom, area_km2 = validate_geometry_v2(
+                ParsedAnalysisInput(type="Feature", geometry=extract_geometry(feature))
+            )
+        except HTTPException as exc:
+            items.append(BatchItem(index=index, id=key, error=exc))
+            continue
+        items.append(BatchItem(index=index, id=key, geom=geom, area_km2=area_km2))
+    return items
+
+
+def _line(item: BatchItem, **fields) -> bytes:
+    return json.dumps({"index": item.index, "id": item.id, **fields}, separators=(",", ":")).encode() + b"\n"
+
+
+def _error_line(item: BatchItem, status_code: int, detail: str) -> bytes:
+    return _line(item, status="error", status_code=status_code, detail=detail)
+
+
+def stream_batch(items: list[BatchItem], datasets, bucket: str) -> Iterator[bytes]:
+    """Yield the NDJSON lines of a validated batch (see module docstring).
+
+    A raster read failure fails only the chunk it happened in: its items are
+    reported with ``status_code`` 500 and the next chunk is still processed. A
+    result that does not fit ``AnalysisResponse`` fails only its own item.
+    """
+    valid = [item for item in items if item.error is None]
+    for item in items:
+        if item.error is not None:
+            yield _error_line(item, item.error.status_code, item.error.detail)
+
+    for start in range(0, len(valid), BATCH_CHUNK_SIZE):
+        chunk = valid[start:start + BATCH_CHUNK_SIZE]
+        try:
+            results = compute_zonal_stats_many(
+                [item.geom for item in chunk], datasets, bucket, [item.area_km2 for item in chunk]
+            )
+        except rasterio.errors.RasterioIOError:
+            logger.exception("Failed to read raster data for batch items %d-%d", chunk[0].index, chunk[-1].index)
+            for item in chunk:
+                yield _error_line(item, 500, "Analysis is unavailable")
+            continue
+
+        for item, result in zip(chunk, results):
+            try:
+                analysis = AnalysisResponse(aoi_size=round(item.area_km2, 2), **result)
+            except ValidationError:
+                logger.exception("Invalid analysis result for batch item %d", item.index)
+                yield _error_line(item, 500, "Analysis is unavailable")
+                continue
+            yield _line(item, status="ok", analysis=analysis.model_dump(mode="json"))
+        logger.info("Batch chunk done: %d AOIs (%d/%d)", len(chunk), start + len(chunk), len(valid))
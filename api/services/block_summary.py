@@ -0,0 +1,364 @@
+"""Per-cell summary sidecars that answer the fully covered part of an AOI without reading pixels.
+
+For every COG and every resolution the analysis may read it at (native and
+each overview level) ``build_block_summary`` writes a small GeoTIFF next to
+it, ``<cog>.summary-native.tif`` / ``<cog>.summary-ovr<N>.tif``: one pixel per
+``SUMMARY_CELL_PX`` × ``SUMMARY_CELL_PX`` cell of that level, with bands
+
+* ``count``, ``sum``, ``max`` of the valid (non-nodata, finite) pixels;
+* ``class:<i>`` — pixel count per class (values in the ``CLASSES`` tag), for
+  categorical layers;
+* ``hist:<i>`` — pixel count per bin of the layer's global histogram edges
+  (``Layer.stats``), for layers charted as histograms.
+
+Each level's sidecar is one level of a quadtree: a cell at overview ``N``
+covers the ground of 2 × 2 cells at ``N - 1``. Every level is summarised from
+that level's own pixels, so combining sidecar cells with exactextract at the
+same level gives the same numbers as exactextract alone.
+
+Each sidecar records a fingerprint of the pixels it summarises
+(``source_fingerprint``); one that no longer matches its COG (the COG was
+replaced at the same path) is ignored until it is rebuilt.
+
+``interior_summary`` picks the cells lying entirely inside the AOI and returns
+their aggregate in exactextract's result shape (``count``, ``sum``, ``mean``,
+``max``, ``unique``/``frac``, ``variety``, ``majority`` and bin-midpoint
+``values``/``coverage``); ``services.zonal_stats`` runs exactextract only on the
+rest of the AOI and merges the two. Layers or ops a sidecar cannot answer,
+and COGs without sidecars, use plain exactextract.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import rasterio
+import shapely
+from affine import Affine
+from rasterio.windows import Window
+
+from services.widgets import WIDGET_CONFIG
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CELL_PX = 32
+
+_BASE_BANDS = ("count", "sum", "max")
+_CLASS_OPS = frozenset({"unique", "frac", "majority", "variety"})
+_HISTOGRAM_OPS = frozenset({"values", "coverage"})
+_SUPPORTED_OPS = frozenset({"count", "sum", "mean", "max"}) | _CLASS_OPS | _HISTOGRAM_OPS
+
+
+def summary_uri(uri: str, level: int | None) -> str:
+    """Sidecar location for ``uri`` read at overview ``level`` (None for native)."""
+    base = uri[:-4] if uri.lower().endswith(".tif") else uri
+    return f"{base}.summary-{'native' if level is None else f'ovr{level}'}.tif"
+
+
+def layer_summary_options(layer) -> dict[str, Any]:
+    """Which optional bands a layer's sidecars need, from its ``WIDGET_CONFIG`` ops and ``Layer.stats``."""
+    ops: set[str] = set()
+    for widget in WIDGET_CONFIG.values():
+        ops.update(widget["layers"].get(layer.id, {}).get("ops", []))
+    edges = ((layer.stats or {}).get("histogram") or {}).get("edges") if _HISTOGRAM_OPS & ops else None
+    return {"classes": bool(_CLASS_OPS & ops), "edges": edges}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Builder
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _open_kwargs(level: int | None) -> dict[str, Any]:
+    return {"overview_level": level} if level is not None else {}
+
+
+def source_fingerprint(path: str, level: int | None) -> str:
+    """Identify the pixels of ``path`` at ``level``: their size and transform, and a digest of the COG's coarsest block.
+
+    The digest costs one block read and changes whenever the COG is replaced
+    with different data, even at the same size and georeferencing.
+    """
+    with rasterio.open(path, **_open_kwargs(level)) as src:
+        grid = [src.width, src.height, *src.transform[:6]]
+    with rasterio.open(path) as src:
+        coarsest = len(src.overviews(1)) - 1
+    with rasterio.open(path, **_open_kwargs(coarsest if coarsest >= 0 else None)) as src:
+        block = src.read(1, window=src.block_window(1, 0, 0))
+    digest = hashlib.sha256(block.tobytes()).hexdigest()[:16]
+    return f"{json.dumps(grid, separators=(',', ':'))}:{digest}"
+
+
+def _strips(src: rasterio.DatasetReader, cell_px: int):
+    """Yield ``(valid, values)`` for each strip of ``cell_px`` rows, padded to whole cells."""
+    n_cols = math.ceil(src.width / cell_px)
+    for row in range(0, src.height, cell_px):
+        rows = min(cell_px, src.height - row)
+        data = src.read(1, window=Window(0, row, src.width, rows), masked=True)
+        values = np.zeros((cell_px, n_cols * cell_px), dtype=np.float64)
+        valid = np.zeros(values.shape, dtype=bool)
+        values[:rows, :src.width] = data.filled(0)
+        valid[:rows, :src.width] = ~np.ma.getmaskarray(data) & np.isfinite(values[:rows, :src.width])
+        yield valid, values
+
+
+def _per_cell(array: np.ndarray, cell_px: int) -> np.ndarray:
+    """Collapse a ``cell_px``-row strip into one value per cell (sum)."""
+    return array.reshape(cell_px, -1, cell_px).sum(axis=(0, 2))
+
+
+def _build_level(path: str, level: int | None, classes: bool, edges: list[float] | None, cell_px: int) -> str:
+    fingerprint = source_fingerprint(path, level)
+    with rasterio.open(path, **_open_kwargs(level)) as src:
+        class_values: list[float] = []
+        if classes:
+            seen: set[float] = set()
+            for valid, values in _strips(src, cell_px):
+                seen.update(np.unique(values[valid]).tolist())
+            class_values = sorted(seen)
+
+        bands = [
+            *_BASE_BANDS,
+            *(f"class:{i}" for i in range(len(class_values))),
+            *(f"hist:{i}" for i in range(len(edges or []) - 1)),
+        ]
+        n_cols, n_rows = math.ceil(src.width / cell_px), math.ceil(src.height / cell_px)
+        profile = {
+            "driver": "GTiff",
+            "dtype": "float64",
+            "width": n_cols,
+            "height": n_rows,
+            "count": len(bands),
+            "crs": src.crs,
+            "transform": src.transform * Affine.scale(cell_px),
+            "compress": "deflate",
+        }
+        out = summary_uri(path, level)
+        with rasterio.open(out, "w", **profile) as dst:
+            dst.update_tags(
+                CELL_PX=cell_px,
+                SOURCE_WIDTH=src.width,
+                SOURCE_HEIGHT=src.height,
+                SOURCE_FINGERPRINT=fingerprint,
+                CLASSES=json.dumps(class_values) if classes else "",
+                HISTOGRAM_EDGES=json.dumps(edges) if edges else "",
+            )
+            for band, name in enumerate(bands, start=1):
+                dst.set_band_description(band, name)
+
+            bins = np.asarray(edges, dtype=np.float64) if edges else None
+            for cell_row, (valid, values) in enumerate(_strips(src, cell_px)):
+                strip = np.empty((len(bands), 1, n_cols), dtype=np.float64)
+                count = _per_cell(valid, cell_px)
+                strip[0, 0] = count
+                strip[1, 0] = _per_cell(np.where(valid, values, 0.0), cell_px)
+                cell_max = np.where(valid, values, -np.inf).reshape(cell_px, -1, cell_px).max(axis=(0, 2))
+                strip[2, 0] = np.where(count > 0, cell_max, np.nan)
+                band = len(_BASE_BANDS)
+                for value in class_values:
+                    strip[band, 0] = _per_cell(valid & (values == value), cell_px)
+                    band += 1
+                if bins is not None:
+                    # Same binning as ``np.histogram`` after clamping into the edges (see ``_histogram``).
+                    index = np.clip(np.searchsorted(bins, np.clip(values, bins[0], bins[-1]), side="right") - 1,
+                                    0, len(bins) - 2)
+                    for i in range(len(bins) - 1):
+                        strip[band, 0] = _per_cell(valid & (index == i), cell_px)
+                        band += 1
+                dst.write(strip, window=Window(0, cell_row, n_cols, 1))
+    return out
+
+
+def build_block_summary(
+    path: str,
+    *,
+    classes: bool = False,
+    edges: list[float] | None = None,
+    cell_px: int = SUMMARY_CELL_PX,
+) -> list[str]:
+    """Write the sidecars of ``path`` for native resolution and every overview level; returns their paths.
+
+    ``classes`` adds per-class counts (categorical layers); ``edges`` adds
+    per-bin counts for the layer's global histogram edges.
+    """
+    with rasterio.open(path) as src:
+        levels = [None, *range(len(src.overviews(1)))]
+    written = [_build_level(path, level, classes, edges, cell_px) for level in levels]
+    clear_summary_cache()
+    logger.info("Wrote %d block summaries for %s", len(written), path)
+    return written
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Reader
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class SummaryGrid:
+    """Header of one sidecar: where its cells are and which bands it has."""
+
+    uri: str
+    cell_px: int
+    transform: Affine
+    source_width: int
+    source_height: int
+    bands: tuple[str, ...]
+    classes: tuple[float, ...] | None
+    edges: tuple[float, ...] | None
+
+
+# Sidecar headers (or their absence) are re-checked after this long, so sidecars
+# uploaded or rebuilt later, and COGs replaced since, are noticed without a restart.
+SUMMARY_CACHE_SECONDS = 300
+_SUMMARY_CACHE_SIZE = 512
+# GDAL's wording for a file that is not there, locally and on S3.
+_MISSING_MARKERS = ("No such file or directory", "does not exist in the file system", "HTTP response code: 404")
+
+_summaries: OrderedDict[tuple[str, int | None], tuple[float, SummaryGrid | None]] = OrderedDict()
+_summaries_lock = threading.Lock()
+
+
+def _open_summary(path: str, level: int | None) -> SummaryGrid | None:
+    """Sidecar header, or None when there is none or it was built from other pixels.
+
+    Raises ``RasterioIOError`` for any other read failure (e.g. a transient S3
+    error), which is not cached.
+    """
+    uri = summary_uri(path, level)
+    try:
+        with rasterio.open(uri) as src:
+            tags = src.tags()
+            bands = tuple(src.descriptions)
+            transform = src.transform
+    except rasterio.errors.RasterioIOError as exc:
+        if any(marker in str(exc) for marker in _MISSING_MARKERS):
+            return None
+        raise
+
+    if tags.get("SOURCE_FINGERPRINT") != source_fingerprint(path, level):
+        logger.warning("Block summary %s does not match its COG; ignored until it is rebuilt", uri)
+        return None
+    try:
+        return SummaryGrid(
+            uri=uri,
+            cell_px=int(tags["CELL_PX"]),
+            transform=transform,
+            source_width=int(tags["SOURCE_WIDTH"]),
+            source_height=int(tags["SOURCE_HEIGHT"]),
+            bands=bands,
+            classes=tuple(json.loads(tags["CLASSES"])) if tags.get("CLASSES") else None,
+            edges=tuple(json.loads(tags["HISTOGRAM_EDGES"])) if tags.get("HISTOGRAM_EDGES") else None,
+        )
+    except KeyError as exc:
+        logger.warning("Block summary %s lacks tag %s; ignored", uri, exc)
+        return None
+
+
+def _summary_grid(path: str, level: int | None) -> SummaryGrid | None:
+    """``_open_summary`` cached for ``SUMMARY_CACHE_SECONDS``; None (uncached) when the sidecar cannot be read."""
+    key = (path, level)
+    now = time.monotonic()
+    with _summaries_lock:
+        cached = _summaries.get(key)
+        if cached is not None and now - cached[0] < SUMMARY_CACHE_SECONDS:
+            _summaries.move_to_end(key)
+            return cached[1]
+    try:
+        grid = _open_summary(path, level)
+    except rasterio.errors.RasterioIOError as exc:
+        logger.warning("Could not read the block summary of %s, using pixels: %s", path, exc)
+        return None
+    with _summaries_lock:
+        _summaries[key] = (now, grid)
+        _summaries.move_to_end(key)
+        while len(_summaries) > _SUMMARY_CACHE_SIZE:
+            _summaries.popitem(last=False)
+    return grid
+
+
+def clear_summary_cache() -> None:
+    with _summaries_lock:
+        _summaries.clear()
+
+
+def _usable(grid: SummaryGrid, ops: list[str], edges: list[float] | None) -> bool:
+    if not _SUPPORTED_OPS.issuperset(ops):
+        return False
+    if _CLASS_OPS & set(ops) and grid.classes is None:
+        return False
+    if _HISTOGRAM_OPS & set(ops) and (edges is None or grid.edges != tuple(edges)):
+        return False
+    return True
+
+
+def interior_summary(
+    path: str, level: int | None, geom, ops: list[str], edges: list[float] | None = None
+) -> tuple[Any, dict[str, Any]] | None:
+    """Aggregate the sidecar cells of ``path`` (at ``level``) lying entirely inside ``geom``.
+
+    ``geom`` is in the raster's CRS. Returns ``(interior, result)`` where
+    ``interior`` is the union of those cells and ``result`` their statistics in
+    exactextract's shape; None when there is no usable sidecar or no such cell.
+    """
+    grid = _summary_grid(path, level)
+    if grid is None or not _usable(grid, ops, edges):
+        return None
+
+    inverse = ~grid.transform
+    xs, ys = zip(*(inverse * corner for corner in shapely.get_coordinates(shapely.envelope(geom)).tolist()))
+    c0, c1 = max(0, math.floor(min(xs))), min(math.ceil(grid.source_width / grid.cell_px), math.ceil(max(xs)))
+    r0, r1 = max(0, math.floor(min(ys))), min(math.ceil(grid.source_height / grid.cell_px), math.ceil(max(ys)))
+    if c1 <= c0 or r1 <= r0:
+        return None
+
+    # Cell boxes, clipped to the source raster (its last row/column of cells may be partial).
+    cols, rows = np.meshgrid(np.arange(c0, c1), np.arange(r0, r1))
+    px = grid.transform.a / grid.cell_px
+    py = grid.transform.e / grid.cell_px
+    x0 = grid.transform.c + cols * grid.transform.a
+    y0 = grid.transform.f + rows * grid.transform.e
+    x1 = grid.transform.c + np.minimum((cols + 1) * grid.cell_px, grid.source_width) * px
+    y1 = grid.transform.f + np.minimum((rows + 1) * grid.cell_px, grid.source_height) * py
+    boxes = shapely.box(np.minimum(x0, x1), np.minimum(y0, y1), np.maximum(x0, x1), np.maximum(y0, y1))
+
+    shapely.prepare(geom)
+    inside = shapely.contains(geom, boxes)
+    if not inside.any():
+        return None
+
+    with rasterio.open(grid.uri) as src:
+        data = src.read(window=Window(c0, r0, c1 - c0, r1 - r0))
+    cells = {name: data[i][inside] for i, name in enumerate(grid.bands)}
+
+    count = float(cells["count"].sum())
+    total = float(cells["sum"].sum())
+    maxes = cells["max"][np.isfinite(cells["max"])]
+    result: dict[str, Any] = {
+        "count": count,
+        "sum": total,
+        "mean": total / count if count > 0 else float("nan"),
+        "max": float(maxes.max()) if maxes.size else float("nan"),
+    }
+    if grid.classes is not None:
+        class_counts = {v: float(cells[f"class:{i}"].sum()) for i, v in enumerate(grid.classes)}
+        class_counts = {v: n for v, n in class_counts.items() if n > 0}
+        result["unique"] = np.asarray(list(class_counts))
+        result["frac"] = np.asarray([n / count for n in class_counts.values()]) if count > 0 else np.array([])
+        result["variety"] = len(class_counts)
+        result["majority"] = max(class_counts, key=class_counts.get) if class_counts else float("nan")
+    if grid.edges is not None:
+        bins = np.asarray(grid.edges)
+        hist = np.asarray([cells[f"hist:{i}"].sum() for i in range(len(bins) - 1)])
+        nonzero = hist > 0
+        result["values"] = ((bins[:-1] + bins[1:]) / 2)[nonzero]
+        result["coverage"] = hist[nonzero]
+
+    interior = shapely.coverage_union_all(boxes[inside])
+    logger.debug("Answered %d interior cells of %s from its block summary", int(inside.sum()), path)
+    return interior, result
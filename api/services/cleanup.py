@@ -1,25 +1,21 @@
-"""Periodic cleanup tasks wired into the FastAPI lifespan handler."""
+"""Periodic cleanup jobs, run on one worker by ``services.scheduler``."""
 
-import logging
+from sqlalchemy.orm import Session
 
-from fastapi_utilities import repeat_at
+from services.analysis_results import delete_expired_results
+from services.scheduler import scheduled_job
+from services.shared_analysis import delete_expired, ensure_partitions
 
-from db.database import SessionLocal
-from services.shared_analysis import delete_expired
 
-logger = logging.getLogger(__name__)
+@scheduled_job(cron="0 3 * * *")
+def cleanup_shared_analyses(db: Session) -> None:
+    """Delete shared analyses and stored analysis results older than their TTLs — runs daily at 03:00 UTC.
 
-
-@repeat_at(cron="0 3 * * *")
-async def cleanup_shared_analyses() -> None:
-    """Delete shared analyses older than the configured TTL — runs daily at 03:00 UTC.
-
-    Errors are caught and logged so a transient DB issue can't kill the scheduling
-    loop and leave the cron silently stopped for the rest of the process lifetime.
+    Also creates the upcoming daily ``shared_analyses`` partitions. Shares are
+    expired in short transactions, one per dropped partition or deleted batch.
     """
-    try:
-        with SessionLocal() as db:
-            delete_expired(db)
-            db.commit()
-    except Exception:
-        logger.exception("Scheduled cleanup of shared analyses failed")
+    ensure_partitions(db)
+    db.commit()
+    delete_expired(db, checkpoint=db.commit)
+    delete_expired_results(db)
+    db.commit()
@@ -0,0 +1,280 @@
+"""Clipped-raster export for an analysis AOI (``POST /analysis/v2/export``).
+
+Each requested layer is clipped to the AOI's bounding window in the raster's
+native CRS; pixels outside the AOI polygon are set to nodata. The work is split
+in two phases so request errors surface as proper HTTP responses before any
+bytes are sent:
+
+* ``plan_clips`` opens only raster headers: it picks the read resolution and
+  the window for every layer and raises ``HTTPException`` when the export is
+  not possible.
+* ``stream_zip`` / ``stream_multiband_tif`` are generators consumed by a
+  ``StreamingResponse``. Pixels are read in horizontal strips of the window and
+  written to a temporary GeoTIFF, which is then streamed to the client in
+  chunks, so neither the clip nor the archive is ever held fully in memory.
+
+Output size is capped at ``MAX_EXPORT_PIXELS`` per layer: an AOI at the
+``MAX_AREA_KM2`` limit exceeds it at the native 30 m resolution, so the
+coarsest necessary overview level is read instead (same overview mechanism as
+the zonal-stats pipeline).
+"""
+
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import rasterio
+from affine import Affine
+from fastapi import HTTPException
+from rasterio.features import geometry_mask
+from rasterio.windows import Window
+from rasterio.windows import from_bounds as window_from_bounds
+from shapely.geometry import mapping
+
+from models.layer import Layer
+from services.raster_io import reproject, s3_uri
+
+logger = logging.getLogger(__name__)
+
+# Per-layer output cap (~64 MB for float32). A 50,000 km² AOI at 30 m is ~55M pixels.
+MAX_EXPORT_PIXELS = 4096 * 4096
+_STRIP_ROWS = 256
+_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class LayerClip:
+    """Everything needed to write one layer's clip, resolved from raster headers only."""
+
+    layer_id: str
+    uri: str
+    overview_level: int | None
+    window: Window
+    transform: Affine
+    crs: str
+    dtype: str
+    nodata: float | int
+    geom: Any  # AOI reprojected to ``crs``
+
+    @property
+    def open_kwargs(self) -> dict[str, Any]:
+        return {"overview_level": self.overview_level} if self.overview_level is not None else {}
+
+
+def _fill_value(dtype: str, nodata: float | int | None) -> float | int:
+    """Nodata value for the output; falls back to NaN (float) or the dtype maximum (integer)."""
+    if nodata is not None:
+        return nodata
+    if np.issubdtype(np.dtype(dtype), np.floating):
+        return float("nan")
+    return int(np.iinfo(np.dtype(dtype)).max)
+
+
+def _export_overview_level(src: rasterio.DatasetReader, width: float, height: float, layer_id: str) -> int | None:
+    """Return the finest overview level whose clip fits MAX_EXPORT_PIXELS (None for native)."""
+    if width * height <= MAX_EXPORT_PIXELS:
+        return None
+    for level, factor in enumerate(src.overviews(1)):
+        if (width / factor) * (height / factor) <= MAX_EXPORT_PIXELS:
+            return level
+    raise HTTPException(
+        status_code=422,
+        detail=f"AOI is too large to export layer '{layer_id}': no overview fits {MAX_EXPORT_PIXELS:,} pixels",
+    )
+
+
+def _pixel_window(geom, transform: Affine, width: int, height: int) -> Window | None:
+    """Integer window covering ``geom``'s bounds, clamped to the raster; None if disjoint."""
+    window = window_from_bounds(*geom.bounds, transform=transform)
+    col_start = max(0, math.floor(window.col_off))
+    row_start = max(0, math.floor(window.row_off))
+    col_stop = min(width, math.ceil(window.col_off + window.width))
+    row_stop = min(height, math.ceil(window.row_off + window.height))
+    if col_stop <= col_start or row_stop <= row_start:
+        return None
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+
+def plan_clips(layers: list[Layer], geom_4326, bucket: str) -> list[LayerClip]:
+    """Resolve the read resolution and window of every layer for the AOI.
+
+    Raises ``HTTPException(422)`` when a layer does not overlap the AOI or the AOI
+    is too large even at the coarsest overview.
+    """
+    clips = []
+    for layer in layers:
+        uri = s3_uri(layer.path, bucket)
+        with rasterio.open(uri) as src:
+            crs = src.crs.to_string()
+            geom = reproject(geom_4326, "EPSG:4326", crs)
+            native = window_from_bounds(*geom.bounds, transform=src.transform)
+            level = _export_overview_level(src, native.width, native.height, layer.id)
+            dtype, nodata = src.dtypes[0], src.nodata
+
+        open_kwargs = {"overview_level": level} if level is not None else {}
+        with rasterio.open(uri, **open_kwargs) as src:
+            window = _pixel_window(geom, src.transform, src.width, src.height)
+            if window is None:
+                raise HTTPException(status_code=422, detail=f"Layer '{layer.id}' does not overlap the AOI")
+            transform = src.window_transform(window)
+
+        clips.append(LayerClip(
+            layer_id=layer.id,
+            uri=uri,
+            overview_level=level,
+            window=window,
+            transform=transform,
+            crs=crs,
+            dtype=dtype,
+            nodata=_fill_value(dtype, nodata),
+            geom=geom,
+        ))
+        logger.info(
+            "Export plan for '%s': %dx%d px at overview level %s",
+            layer.id, window.width, window.height, level,
+        )
+    return clips
+
+
+def ensure_coregistered(clips: list[LayerClip]) -> None:
+    """Raise ``HTTPException(422)`` unless all clips can be stacked into one multi-band GeoTIFF."""
+    first = clips[0]
+    for clip in clips[1:]:
+        same_grid = (
+            clip.crs == first.crs
+            and clip.transform.almost_equals(first.transform)
+            and (clip.window.width, clip.window.height) == (first.window.width, first.window.height)
+        )
+        same_values = clip.dtype == first.dtype and (
+            clip.nodata == first.nodata or (np.isnan(clip.nodata) and np.isnan(first.nodata))
+        )
+        if not (same_grid and same_values):
+            raise HTTPException(
+                status_code=422,
+                detail=(
+                    f"Layers '{first.layer_id}' and '{clip.layer_id}' do not share the same grid, data type "
+                    "and nodata value; a multi-band GeoTIFF is not possible. Use format 'zip'."
+                ),
+            )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Writers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _write_band(clip: LayerClip, dst: rasterio.io.DatasetWriter, band: int) -> None:
+    """Copy ``clip`` into ``dst`` band ``band`` strip by strip, masking pixels outside the AOI."""
+    width, height = int(clip.window.width), int(clip.window.height)
+    shapes = [mapping(clip.geom)]
+    with rasterio.open(clip.uri, **clip.open_kwargs) as src:
+        for row in range(0, height, _STRIP_ROWS):
+            rows = min(_STRIP_ROWS, height - row)
+            src_window = Window(clip.window.col_off, clip.window.row_off + row, width, rows)
+            data = src.read(1, window=src_window, masked=True)
+            outside = geometry_mask(shapes, out_shape=(rows, width), transform=src.window_transform(src_window))
+            strip = np.where(outside | np.ma.getmaskarray(data), clip.nodata, data.data).astype(clip.dtype)
+            dst.write(strip, band, window=Window(0, row, width, rows))
+
+
+def _write_geotiff(clips: list[LayerClip], path: str) -> None:
+    """Write one or more co-registered clips as the bands of a tiled, compressed GeoTIFF."""
+    first = clips[0]
+    profile = {
+        "driver": "GTiff",
+        "dtype": first.dtype,
+        "width": int(first.window.width),
+        "height": int(first.window.height),
+        "count": len(clips),
+        "crs": first.crs,
+        "transform": first.transform,
+        "nodata": first.nodata,
+        "tiled": True,
+        "blockxsize": _STRIP_ROWS,
+        "blockysize": _STRIP_ROWS,
+        "compress": "deflate",
+        "BIGTIFF": "IF_SAFER",
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        for band, clip in enumerate(clips, start=1):
+            _write_band(clip, dst, band)
+            dst.set_band_description(band, clip.layer_id)
+
+
+def _read_chunks(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_BYTES):
+            yield chunk
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink; ``zipfile`` then emits data descriptors instead of seeking back."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _manifest(clips: list[LayerClip]) -> dict:
+    return {
+        "layers": [
+            {
+                "id": clip.layer_id,
+                "file": f"{clip.layer_id}.tif",
+                "crs": clip.crs,
+                "overview_level": clip.overview_level,
+                "resolution": [abs(clip.transform.a), abs(clip.transform.e)],
+                "width": int(clip.window.width),
+                "height": int(clip.window.height),
+            }
+            for clip in clips
+        ]
+    }
+
+
+def stream_zip(clips: list[LayerClip]) -> Iterator[bytes]:
+    """Yield a zip archive with one single-band GeoTIFF per clip plus a ``manifest.json``.
+
+    GeoTIFFs are already deflate-compressed, so entries are stored uncompressed.
+    """
+    sink = _ChunkSink()
+    with tempfile.TemporaryDirectory(prefix="hbl-export-") as tmp_dir:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            for clip in clips:
+                path = os.path.join(tmp_dir, f"{clip.layer_id}.tif")
+                _write_geotiff([clip], path)
+                info = zipfile.ZipInfo(f"{clip.layer_id}.tif", date_time=time.gmtime()[:6])
+                with archive.open(info, "w", force_zip64=True) as entry:
+                    for chunk in _read_chunks(path):
+                        entry.write(chunk)
+                        yield sink.drain()
+                os.remove(path)
+            archive.writestr("manifest.json", json.dumps(_manifest(clips), indent=2))
+        yield sink.drain()
+
+
+def stream_multiband_tif(clips: list[LayerClip]) -> Iterator[bytes]:
+    """Yield one multi-band GeoTIFF (one band per clip, in order). Requires ``ensure_coregistered``."""
+    with tempfile.TemporaryDirectory(prefix="hbl-export-") as tmp_dir:
+        path = os.path.join(tmp_dir, "export.tif")
+        _write_geotiff(clips, path)
+        yield from _read_chunks(path)
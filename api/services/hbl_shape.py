@@ -0,0 +1,169 @@
+"""The Hudson Bay Lowlands study-area footprint, loaded once for the whole app.
+
+``HBL_FOOTPRINT`` backs both the v2 containment check (``services.analysis``)
+and the ``GET /hbl-area`` responses (``routers.hbl_area``), so the client always
+renders the exact polygon the server validates against and the file is read
+and parsed a single time at import.
+
+The file is expected to be in EPSG:4326 (lon/lat degrees) — same CRS as the
+analysis input — so the containment check is a pure planar comparison with no
+reprojection. See `.claude/PROJECTION.md` for rationale.
+
+Containment is answered in two stages by ``ContainmentGrid``: a coarse grid
+over the footprint's bounds classifies every cell as fully inside, fully
+outside or on the boundary at startup. An AOI whose bounding box spans only
+inside cells is accepted, and one spanning only outside cells (or reaching
+past the footprint's bounds) rejected, with a few array lookups; only AOIs
+near the boundary go through the exact ``covers`` predicate, evaluated on the
+prepared (indexed) footprint.
+"""
+
+import json
+import logging
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping, shape
+from shapely.geometry.base import BaseGeometry
+from shapely.ops import unary_union
+from shapely.validation import explain_validity
+
+from config import get_settings
+from schemas.hbl_area import HBLAreaResponse
+
+logger = logging.getLogger(__name__)
+
+# Cells along the longer side of the footprint's bounding box. For the real
+# footprint (~20° wide) that is ~0.08° (~5 km) per cell.
+HBL_GRID_CELLS: int = 256
+
+OUTSIDE, BOUNDARY, INSIDE = 0, 1, 2
+
+
+class ContainmentGrid:
+    """Grid mask over a polygon's bounds answering ``covers`` for most inputs without exact geometry tests."""
+
+    def __init__(self, geometry: BaseGeometry, cells: int = HBL_GRID_CELLS) -> None:
+        self.geometry = geometry
+        shapely.prepare(geometry)
+
+        minx, miny, maxx, maxy = geometry.bounds
+        self.bounds = geometry.bounds
+        self.cell_size = max(maxx - minx, maxy - miny) / cells
+        self.n_cols = max(1, math.ceil((maxx - minx) / self.cell_size))
+        self.n_rows = max(1, math.ceil((maxy - miny) / self.cell_size))
+
+        cols, rows = np.meshgrid(np.arange(self.n_cols), np.arange(self.n_rows))
+        x0 = minx + cols.ravel() * self.cell_size
+        y0 = miny + rows.ravel() * self.cell_size
+        boxes = shapely.box(x0, y0, x0 + self.cell_size, y0 + self.cell_size)
+
+        # A cell that does not touch the boundary lies entirely in the interior or the
+        # exterior, so its centre decides which.
+        classes = np.where(
+            shapely.contains_xy(geometry, x0 + self.cell_size / 2, y0 + self.cell_size / 2), INSIDE, OUTSIDE
+        ).astype(np.int8)
+        classes[shapely.STRtree(boxes).query(geometry.boundary, predicate="intersects")] = BOUNDARY
+
+        self.classes = classes.reshape(self.n_rows, self.n_cols)
+
+    def _window(self, bounds: tuple[float, float, float, float]) -> tuple[slice, slice] | None:
+        """Row/column slices of the cells overlapping ``bounds``; None when outside the grid."""
+        minx, miny, maxx, maxy = self.bounds
+        if bounds[0] < minx or bounds[1] < miny or bounds[2] > maxx or bounds[3] > maxy:
+            return None
+
+        def index(value: float, origin: float, limit: int) -> int:
+            return min(limit - 1, max(0, int((value - origin) // self.cell_size)))
+
+        c0, c1 = index(bounds[0], minx, self.n_cols), index(bounds[2], minx, self.n_cols)
+        r0, r1 = index(bounds[1], miny, self.n_rows), index(bounds[3], miny, self.n_rows)
+        return slice(r0, r1 + 1), slice(c0, c1 + 1)
+
+    def covers(self, geom: BaseGeometry) -> bool:
+        """Same result as ``self.geometry.covers(geom)``."""
+        window = self._window(geom.bounds)
+        if window is None:
+            return False  # extends past the footprint's bounding box
+        classes = self.classes[window]
+        if (classes == INSIDE).all():
+            return True
+        # OUTSIDE cells are disjoint from the closed footprint, so an AOI whose
+        # bounding box only spans outside cells cannot touch it.
+        if (classes == OUTSIDE).all():
+            return False
+        return self.geometry.covers(geom)
+
+
+@dataclass(frozen=True)
+class HBLFootprint:
+    """The footprint geometry with everything derived from it at startup."""
+
+    geometry: BaseGeometry
+    feature: HBLAreaResponse
+    grid: ContainmentGrid
+
+    def covers(self, geom: BaseGeometry) -> bool:
+        return self.grid.covers(geom)
+
+
+def _resolve_path() -> Path:
+    raw_path = Path(get_settings().hbl_shape_path)
+    return raw_path if raw_path.is_absolute() else Path(__file__).resolve().parent.parent / raw_path
+
+
+def load_hbl_footprint(path: Path | None = None) -> HBLFootprint:
+    """Read the configured HBL GeoJSON file once and build the footprint.
+
+    The file may be a Feature, a FeatureCollection or a bare geometry. A
+    FeatureCollection's features are unioned into a single geometry; per-feature
+    properties are preserved only for a single Feature, unioned collections
+    carry the FeatureCollection-level properties, if any.
+
+    Raises ``RuntimeError`` on startup if the file is missing, the geometry is
+    invalid or not (Multi)Polygon — this is a deploy-time configuration error,
+    not a runtime condition.
+    """
+    path = path or _resolve_path()
+    if not path.is_file():
+        raise RuntimeError(f"HBL shape file not found at {path}")
+
+    with path.open() as f:
+        gj = json.load(f)
+
+    gj_type = gj.get("type")
+    if gj_type == "FeatureCollection":
+        features = gj.get("features") or []
+        if not features:
+            raise RuntimeError(f"HBL FeatureCollection at {path} contains no features")
+        if len(features) == 1:
+            geom, properties = shape(features[0]["geometry"]), features[0].get("properties")
+        else:
+            geom, properties = unary_union([shape(f["geometry"]) for f in features]), gj.get("properties")
+    elif gj_type == "Feature":
+        geom, properties = shape(gj["geometry"]), gj.get("properties")
+    else:
+        geom, properties = shape(gj), None
+
+    if not geom.is_valid:
+        raise RuntimeError(f"HBL shape at {path} is not a valid geometry: {explain_validity(geom)}")
+
+    try:
+        feature = HBLAreaResponse.model_validate(
+            {"type": "Feature", "geometry": mapping(geom), "properties": properties}
+        )
+    except ValueError as exc:
+        raise RuntimeError(f"HBL shape at {path} must be a Polygon or MultiPolygon: {exc}") from exc
+
+    grid = ContainmentGrid(geom)
+    logger.info(
+        "Loaded HBL footprint from %s (type=%s, bounds=%s, grid=%dx%d, boundary cells=%d)",
+        path, geom.geom_type, geom.bounds, grid.n_cols, grid.n_rows, int((grid.classes == BOUNDARY).sum()),
+    )
+    return HBLFootprint(geometry=geom, feature=feature, grid=grid)
+
+
+HBL_FOOTPRINT: HBLFootprint = load_hbl_footprint()
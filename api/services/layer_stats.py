@@ -0,0 +1,205 @@
+"""Precomputed global statistics for continuous raster layers.
+
+Legends and tile rescaling need a layer's global value range, and the analysis
+histograms need bin edges that are stable across AOIs. Computing these at request
+time (e.g. TiTiler ``/statistics``) means reading the whole raster, so they are
+computed once at seed time from the coarsest overview that still has enough
+pixels to be representative, and stored in ``Layer.stats``.
+
+Stored shape::
+
+    {
+        "min": 0.0, "max": 412.0, "mean": 143.2, "std": 61.9,
+        "percentiles": {"p2": 12.0, "p5": 25.0, "p50": 140.0, "p95": 251.0, "p98": 290.0},
+        "histogram": {"edges": [0.0, 41.2, ..., 412.0], "counts": [1021, ...]},
+        "valid_pixels": 1048576,
+        "overview_level": 4,
+    }
+"""
+
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import rasterio
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.layer import Layer
+from services.raster_io import s3_uri
+
+logger = logging.getLogger(__name__)
+
+# Stats are read from the coarsest overview with at least this many pixels (~1000×1000).
+MIN_STATS_PIXELS = 1_000_000
+# Matches the default bin count of the analysis histogram chart.
+STATS_HISTOGRAM_BINS = 10
+STATS_PERCENTILES = (2, 5, 50, 95, 98)
+# Percentiles used as the default tile rescale range (clips outliers).
+RESCALE_PERCENTILES = ("p2", "p98")
+
+
+def is_continuous_raster(layer: Layer) -> bool:
+    """Return True for raster layers whose values are measurements rather than class ids."""
+    return layer.format_ == "raster" and layer.type_ != "categorical" and not layer.categories
+
+
+def _stats_overview_level(src: rasterio.DatasetReader) -> int | None:
+    """Return the coarsest overview level with at least MIN_STATS_PIXELS, or None for native."""
+    level = None
+    for i, factor in enumerate(src.overviews(1)):
+        if (src.width // factor) * (src.height // factor) >= MIN_STATS_PIXELS:
+            level = i
+    return level
+
+
+def compute_raster_stats(uri: str) -> dict[str, Any] | None:
+    """Compute global statistics for band 1 of a raster.
+
+    Returns None when the raster has no valid (non-nodata, finite) pixels.
+    """
+    with rasterio.open(uri) as src:
+        level = _stats_overview_level(src)
+
+    open_kwargs: dict[str, Any] = {}
+    if level is not None:
+        open_kwargs["overview_level"] = level
+
+    with rasterio.open(uri, **open_kwargs) as src:
+        data = src.read(1, masked=True)
+
+    values = data.compressed().astype("float64")
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return None
+
+    lo, hi = float(values.min()), float(values.max())
+    counts, edges = np.histogram(values, bins=STATS_HISTOGRAM_BINS, range=(lo, hi))
+    percentiles = np.percentile(values, STATS_PERCENTILES)
+
+    return {
+        "min": lo,
+        "max": hi,
+        "mean": round(float(values.mean()), 6),
+        "std": round(float(values.std()), 6),
+        "percentiles": {f"p{p}": round(float(v), 6) for p, v in zip(STATS_PERCENTILES, percentiles)},
+        "histogram": {
+            "edges": [round(float(e), 6) for e in edges],
+            "counts": [int(c) for c in counts],
+        },
+        "valid_pixels": int(values.size),
+        "overview_level": level,
+    }
+
+
+def compute_layer_stats(session: Session, bucket: str, layer_ids: list[str] | None = None) -> dict[str, int]:
+    """Compute and store ``Layer.stats`` for continuous raster layers.
+
+    Every continuous raster layer is processed unless ``layer_ids`` narrows the
+    set. A layer that fails to read is logged and left unchanged so one missing
+    file doesn't abort the whole run; a raster without valid pixels is counted
+    as skipped and keeps no stats. Does **not** commit — the caller owns the
+    transaction.
+
+    Returns ``{computed, skipped, failed}`` counts.
+    """
+    stmt = select(Layer).where(Layer.format_ == "raster")
+    if layer_ids is not None:
+        stmt = stmt.where(Layer.id.in_(layer_ids))
+
+    counts = {"computed": 0, "skipped": 0, "failed": 0}
+    for layer in session.scalars(stmt):
+        if not is_continuous_raster(layer):
+            counts["skipped"] += 1
+            continue
+        try:
+            layer.stats = compute_raster_stats(s3_uri(layer.path, bucket))
+        except rasterio.errors.RasterioIOError:
+            logger.exception("Failed to compute statistics for layer '%s'", layer.id)
+            counts["failed"] += 1
+            continue
+        if layer.stats is None:
+            logger.warning("Layer '%s' has no valid pixels; no statistics stored", layer.id)
+            counts["skipped"] += 1
+            continue
+        counts["computed"] += 1
+
+    session.flush()
+    invalidate_rescale_cache(layer_ids)
+    logger.info("Layer statistics: %s", counts)
+    return counts
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Default tile rescale lookup
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Seconds a loaded rescale table is trusted. Invalidation only reaches the process
+# that ran the seed, so other workers pick up new stats when their copy expires.
+RESCALE_CACHE_SECONDS = 60
+
+# {normalized layer path: (lo, hi)}; loaded lazily, fully reloaded
+# RESCALE_CACHE_SECONDS after loading. _rescale_paths maps layer ids to their
+# cached path, and the layers in _stale_layers are re-read on the next lookup.
+_rescale_cache: dict[str, tuple[float, float]] | None = None
+_rescale_paths: dict[str, str] = {}
+_stale_layers: set[str] = set()
+_rescale_loaded_at = 0.0
+
+
+def _normalize_path(path: str) -> str:
+    return path.lstrip("/")
+
+
+def invalidate_rescale_cache(layer_ids: Iterable[str] | None = None) -> None:
+    """Mark cached rescale ranges stale so the next lookup reloads them from the DB.
+
+    With ``layer_ids`` only those layers are reloaded (added, changed or removed
+    ids alike); without, the whole table is.
+    """
+    global _rescale_cache
+    if layer_ids is None:
+        _rescale_cache = None
+        _rescale_paths.clear()
+        _stale_layers.clear()
+    elif _rescale_cache is not None:
+        _stale_layers.update(layer_ids)
+
+
+def _rescale_range(stats: dict | None) -> tuple[float, float] | None:
+    percentiles = (stats or {}).get("percentiles", {})
+    lo, hi = (percentiles.get(p) for p in RESCALE_PERCENTILES)
+    if lo is not None and hi is not None and hi > lo:
+        return lo, hi
+    return None
+
+
+def _load_rescale(db: Session, layer_ids: set[str] | None) -> None:
+    """(Re)load the rescale ranges of ``layer_ids``, or of every layer when None."""
+    stmt = select(Layer.id, Layer.path, Layer.stats).where(Layer.stats.is_not(None))
+    if layer_ids is not None:
+        stmt = stmt.where(Layer.id.in_(layer_ids))
+        for layer_id in layer_ids:
+            _rescale_cache.pop(_rescale_paths.pop(layer_id, None), None)
+    for layer_id, layer_path, stats in db.execute(stmt):
+        rescale = _rescale_range(stats)
+        if rescale is not None:
+            _rescale_paths[layer_id] = _normalize_path(layer_path)
+            _rescale_cache[_rescale_paths[layer_id]] = rescale
+
+
+def default_rescale(db: Session, path: str) -> tuple[float, float] | None:
+    """Return the default ``(lo, hi)`` tile rescale range for a raster path, if known."""
+    global _rescale_cache, _rescale_loaded_at
+    if _rescale_cache is None or time.monotonic() - _rescale_loaded_at > RESCALE_CACHE_SECONDS:
+        invalidate_rescale_cache()
+        _rescale_cache = {}
+        _load_rescale(db, None)
+        _rescale_loaded_at = time.monotonic()
+    elif _stale_layers:
+        stale = set(_stale_layers)
+        _stale_layers.difference_update(stale)
+        _load_rescale(db, stale)
+    return _rescale_cache.get(_normalize_path(path))
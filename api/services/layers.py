@@ -0,0 +1,28 @@
+"""Layer lookups shared by endpoints that read rasters for a list of layer ids."""
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.layer import Layer
+
+
+def parse_layer_ids(value: str) -> list[str]:
+    """Split a comma-separated ``layers`` query value into unique ids, preserving order."""
+    return list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+
+
+def load_raster_layers(db: Session, layer_ids: list[str]) -> list[Layer]:
+    """Fetch layers by id in the given order, requiring every one to exist and be a raster.
+
+    Raises ``HTTPException(404)`` listing unknown ids and ``HTTPException(422)``
+    listing non-raster (vector tileset) layers.
+    """
+    found = {layer.id: layer for layer in db.scalars(select(Layer).where(Layer.id.in_(layer_ids)))}
+    missing = [layer_id for layer_id in layer_ids if layer_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Layers not found: {', '.join(missing)}")
+    non_raster = [layer_id for layer_id in layer_ids if found[layer_id].format_ != "raster"]
+    if non_raster:
+        raise HTTPException(status_code=422, detail=f"Only raster layers are supported: {', '.join(non_raster)}")
+    return [found[layer_id] for layer_id in layer_ids]
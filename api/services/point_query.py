@@ -0,0 +1,122 @@
+"""Multi-layer point sampling service backing ``GET /layers/point``.
+
+Map tooltips need the value of every visible raster under the cursor. Rather
+than one TiTiler ``/point`` request per layer, the rasters are sampled
+concurrently in a single request:
+
+* The georeferencing of each raster (CRS, transform, shape, nodata) is read
+  once per process and cached, so locating the pixel needs no I/O and points
+  falling outside a raster are answered without opening it.
+* Inside the raster only the single pixel window is read.
+* Reads fan out on the ``TILE_READS`` executor, shared by all tile requests;
+  GDAL releases the GIL during I/O.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.transform import rowcol
+from rasterio.windows import Window
+
+from executors import TILE_READS
+from models.layer import Layer
+from schemas.layer import LayerPointResponse, LayerPointSeries, LayerPointSeriesStep, LayerPointValue
+from services.raster_io import s3_uri, transformer
+from services.time_series import parse_time_step
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on layers per request.
+MAX_POINT_LAYERS = 50
+
+
+@dataclass(frozen=True)
+class RasterHeader:
+    """Georeferencing needed to locate a pixel without opening the raster."""
+
+    crs: str
+    transform: Affine
+    width: int
+    height: int
+    nodata: float | None
+    is_integer: bool
+
+
+@lru_cache(maxsize=512)
+def _raster_header(uri: str) -> RasterHeader:
+    # Published rasters are immutable per path, so the header is cached for the process lifetime.
+    with rasterio.open(uri) as src:
+        return RasterHeader(
+            crs=src.crs.to_string(),
+            transform=src.transform,
+            width=src.width,
+            height=src.height,
+            nodata=src.nodata,
+            is_integer=np.issubdtype(np.dtype(src.dtypes[0]), np.integer),
+        )
+
+
+def _sample_raster(uri: str, lon: float, lat: float) -> float | int | None:
+    """Return the pixel value at (lon, lat), or None when outside the raster or nodata."""
+    header = _raster_header(uri)
+    x, y = transformer("EPSG:4326", header.crs).transform(lon, lat)
+    row, col = (int(v) for v in rowcol(header.transform, x, y))
+    if not (0 <= row < header.height and 0 <= col < header.width):
+        return None
+
+    with rasterio.open(uri) as src:
+        data = src.read(1, window=Window(col, row, 1, 1), masked=True)
+
+    if np.ma.is_masked(data):
+        return None
+    value = data[0, 0].item()
+    if not header.is_integer and math.isnan(value):
+        return None
+    return value
+
+
+def _category_label(layer: Layer, value: float | int | None) -> dict | None:
+    """Look up the bilingual label of a categorical value in ``Layer.categories``."""
+    if value is None or not layer.categories:
+        return None
+    for category in layer.categories:
+        if category["value"] == value:
+            return category["label"]
+    return None
+
+
+def sample_layers(layers: list[Layer], lon: float, lat: float, bucket: str) -> LayerPointResponse:
+    """Sample every layer at (lon, lat) and return decoded values.
+
+    Layers whose id marks them as a time step (see ``services.time_series``) are
+    grouped into one series per key with steps in chronological order; all other
+    layers are returned individually in the order given.
+    """
+    uris = [s3_uri(layer.path, bucket) for layer in layers]
+    raw_values = TILE_READS.map(lambda uri: _sample_raster(uri, lon, lat), uris)
+
+    values: list[LayerPointValue] = []
+    series: dict[str, LayerPointSeries] = {}
+    for layer, value in zip(layers, raw_values):
+        time_step = parse_time_step(layer.id)
+        if time_step is None:
+            values.append(LayerPointValue(
+                layer_id=layer.id,
+                value=value,
+                unit=layer.unit,
+                label=_category_label(layer, value),
+            ))
+            continue
+        entry = series.setdefault(time_step.series, LayerPointSeries(key=time_step.series, unit=layer.unit, steps=[]))
+        entry.steps.append(LayerPointSeriesStep(layer_id=layer.id, step=time_step.step, x=time_step.x, value=value))
+
+    for entry in series.values():
+        entry.steps.sort(key=lambda s: s.x)
+
+    logger.debug("Sampled %d layers at (%f, %f)", len(layers), lon, lat)
+    return LayerPointResponse(lon=lon, lat=lat, values=values, series=list(series.values()))
@@ -0,0 +1,21 @@
+"""Raster location and CRS helpers shared by the raster-reading services."""
+
+from functools import lru_cache
+
+from pyproj import Transformer
+from shapely.ops import transform
+
+
+@lru_cache(maxsize=None)
+def transformer(src_crs: str, dst_crs: str) -> Transformer:
+    # Built once per CRS pair per process; construction is expensive.
+    return Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+
+def reproject(geom, src_crs: str, dst_crs: str):
+    return transform(transformer(src_crs, dst_crs).transform, geom)
+
+
+def s3_uri(db_path: str, bucket: str) -> str:
+    """Build an S3 URI from a DB layer path (strips leading slash)."""
+    return f"s3://{bucket}/{db_path.lstrip('/')}"
@@ -0,0 +1,228 @@
+"""Precomputed analyses for ecological reporting units (ecozones … ecodistricts).
+
+The Ecological Framework layers (dataset 7) are served as vector tilesets, so a
+user clicking a unit would otherwise run a full live analysis over a polygon
+that never changes. ``compute_reporting_unit_stats`` runs the complete
+``WIDGET_CONFIG`` pipeline for every polygon of a layer's processed GeoJSON
+(``03_process_vectors`` output) and stores the result in
+``reporting_unit_stats``, keyed by ``(layer_id, feature_id)``; the API then
+returns it from ``GET /analysis/v2/units/{layer_id}/{feature_id}``.
+
+Runs are incremental: a unit is recomputed only when its geometry or the
+analysis inputs (widget config plus the dataset and layer rows it reads,
+see ``inputs_fingerprint``) changed since it was stored. Units no longer in the
+GeoJSON are deleted.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import rasterio.errors
+import shapely
+from fastapi import HTTPException
+from pydantic import ValidationError
+from shapely.geometry import shape
+from shapely.ops import unary_union
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, selectinload
+
+from models.dataset import Dataset
+from models.reporting_unit_stats import ReportingUnitStats
+from schemas.analysis import AnalysisResponse
+from schemas.dataset import DatasetWithLayersSchema
+from schemas.reporting_units import ReportingUnitStatsRead
+from services.analysis import geometry_area_km2
+from services.raster_io import reproject
+from services.widgets import WIDGET_CONFIG
+from services.zonal_stats import compute_zonal_stats_many
+
+logger = logging.getLogger(__name__)
+
+# Units per raster-sequential pass (``compute_zonal_stats_many``).
+REPORTING_UNIT_CHUNK_SIZE = 25
+
+
+@dataclass(frozen=True)
+class ReportingUnit:
+    """One reporting unit: all features sharing a ``feature_id``, unioned, in EPSG:4326."""
+
+    feature_id: str
+    geometry: object
+    properties: dict | None
+
+    @property
+    def geometry_hash(self) -> str:
+        return hashlib.sha256(shapely.to_wkb(shapely.normalize(self.geometry))).hexdigest()
+
+
+def _polygonal(geom):
+    """Valid polygonal part of ``geom`` (clipping can leave slivers, lines or self-intersections)."""
+    if not geom.is_valid:
+        geom = shapely.make_valid(geom)
+    if geom.geom_type == "GeometryCollection":
+        geom = unary_union([g for g in geom.geoms if g.geom_type in ("Polygon", "MultiPolygon")])
+    return geom
+
+
+def load_reporting_units(path: Path, id_property: str) -> list[ReportingUnit]:
+    """Read a reporting-unit FeatureCollection and group its features by ``properties[id_property]``.
+
+    Shapefile exports split multi-part units into several features with the same
+    id; they are unioned into one unit keeping the first feature's properties.
+    Coordinates are reprojected from the file's legacy ``crs`` member when
+    present (GDAL writes one for non-WGS84 sources). Raises ``ValueError`` for a
+    feature without ``id_property``.
+    """
+    with path.open() as f:
+        gj = json.load(f)
+    src_crs = ((gj.get("crs") or {}).get("properties") or {}).get("name")
+
+    parts: dict[str, list] = {}
+    properties: dict[str, dict | None] = {}
+    for index, feature in enumerate(gj.get("features") or []):
+        value = (feature.get("properties") or {}).get(id_property)
+        if value is None:
+            raise ValueError(f"Feature {index} in {path} has no '{id_property}' property")
+        if not feature.get("geometry"):
+            continue
+        key = str(value)
+        parts.setdefault(key, []).append(shape(feature["geometry"]))
+        properties.setdefault(key, feature.get("properties"))
+
+    units = []
+    for key, geoms in parts.items():
+        geom = _polygonal(unary_union(geoms))
+        if src_crs is not None:
+            geom = reproject(geom, src_crs, "EPSG:4326")
+        if geom.is_empty or geom.geom_type not in ("Polygon", "MultiPolygon"):
+            logger.warning("Reporting unit '%s' has no polygonal geometry — skipping", key)
+            continue
+        units.append(ReportingUnit(feature_id=key, geometry=geom, properties=properties[key]))
+    return units
+
+
+def inputs_fingerprint(datasets) -> str:
+    """Hash of everything a stored analysis depends on besides the geometry.
+
+    Covers ``WIDGET_CONFIG`` and the serialized dataset/layer rows the widgets
+    embed and read (a changed raster path, category list or metadata all
+    change the hash).
+    """
+    widget_dataset_ids = {cfg["dataset_id"] for cfg in WIDGET_CONFIG.values()}
+    payload = {
+        "widgets": WIDGET_CONFIG,
+        "datasets": [
+            DatasetWithLayersSchema.from_orm_dataset(ds).model_dump(mode="json")
+            for ds in sorted(datasets, key=lambda ds: ds.id)
+            if ds.id in widget_dataset_ids
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def compute_reporting_unit_stats(
+    session: Session,
+    layer_id: str,
+    units: list[ReportingUnit],
+    bucket: str,
+    force: bool = False,
+) -> dict[str, int]:
+    """Compute and store the analysis of every changed unit of ``layer_id``.
+
+    Unchanged units (same geometry and inputs hashes) are skipped unless
+    ``force``. A chunk whose rasters fail to read is logged and left unchanged
+    so one missing file doesn't abort the run. Does **not** commit — the caller
+    owns the transaction.
+
+    Returns ``{computed, skipped, deleted, failed}`` counts.
+    """
+    datasets = session.scalars(select(Dataset).options(selectinload(Dataset.layers))).all()
+    inputs_hash = inputs_fingerprint(datasets)
+
+    existing = {
+        row.feature_id: row
+        for row in session.scalars(select(ReportingUnitStats).where(ReportingUnitStats.layer_id == layer_id))
+    }
+
+    counts = {"computed": 0, "skipped": 0, "deleted": 0, "failed": 0}
+    pending = []
+    for unit in units:
+        row = existing.get(unit.feature_id)
+        if (
+            not force
+            and row is not None
+            and row.inputs_hash == inputs_hash
+            and row.geometry_hash == unit.geometry_hash
+        ):
+            counts["skipped"] += 1
+            continue
+        pending.append(unit)
+
+    for start in range(0, len(pending), REPORTING_UNIT_CHUNK_SIZE):
+        chunk = pending[start:start + REPORTING_UNIT_CHUNK_SIZE]
+        areas = [geometry_area_km2(unit.geometry) for unit in chunk]
+        try:
+            results = compute_zonal_stats_many([unit.geometry for unit in chunk], datasets, bucket, areas)
+        except rasterio.errors.RasterioIOError:
+            logger.exception("Failed to compute statistics for %d units of layer '%s'", len(chunk), layer_id)
+            counts["failed"] += len(chunk)
+            continue
+
+        for unit, area_km2, result in zip(chunk, areas, results):
+            analysis = AnalysisResponse(aoi_size=round(area_km2, 2), **result).model_dump(mode="json")
+            row = existing.get(unit.feature_id)
+            if row is None:
+                row = ReportingUnitStats(layer_id=layer_id, feature_id=unit.feature_id)
+                session.add(row)
+            row.properties = unit.properties
+            row.area_km2 = area_km2
+            row.analysis = analysis
+            row.geometry_hash = unit.geometry_hash
+            row.inputs_hash = inputs_hash
+            row.computed_at = func.now()
+            counts["computed"] += 1
+        logger.info("Reporting units of '%s': %d/%d computed", layer_id, start + len(chunk), len(pending))
+
+    stale = set(existing) - {unit.feature_id for unit in units}
+    if stale:
+        session.execute(
+            delete(ReportingUnitStats).where(
+                ReportingUnitStats.layer_id == layer_id, ReportingUnitStats.feature_id.in_(stale)
+            )
+        )
+        counts["deleted"] = len(stale)
+
+    session.flush()
+    logger.info("Reporting unit statistics for '%s': %s", layer_id, counts)
+    return counts
+
+
+def get_reporting_unit_stats(db: Session, layer_id: str, feature_id: str) -> ReportingUnitStatsRead:
+    """Return the stored analysis of a reporting unit.
+
+    Raises ``HTTPException(404)`` when the unit was never computed or its stored
+    analysis no longer conforms to ``AnalysisResponse`` (the next job run
+    replaces it).
+    """
+    row = db.get(ReportingUnitStats, (layer_id, feature_id))
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"No statistics for unit '{feature_id}' of layer '{layer_id}'")
+
+    try:
+        analysis = AnalysisResponse.model_validate(row.analysis)
+    except ValidationError as exc:
+        logger.warning(
+            "Reporting unit %s/%s no longer conforms to AnalysisResponse: %s", layer_id, feature_id, exc.errors()
+        )
+        raise HTTPException(status_code=404, detail=f"No statistics for unit '{feature_id}' of layer '{layer_id}'")
+
+    return ReportingUnitStatsRead(
+        layer_id=row.layer_id,
+        feature_id=row.feature_id,
+        properties=row.properties,
+        analysis=analysis,
+        computed_at=row.computed_at,
+    )
@@ -0,0 +1,162 @@
+"""Leader-elected scheduling of periodic background jobs.
+
+Every API worker runs ``run_scheduler`` from the lifespan handler, but a job
+only executes on the worker that wins its Postgres advisory lock
+(``pg_try_advisory_lock``) for a schedule slot; the others skip it. A worker
+that only gets the lock after the winner released it finds the slot already
+recorded in ``job_runs`` and skips too, so each slot runs once across the
+deployment however many workers there are (a slot is missed if no worker is up).
+
+Jobs are registered with ``@scheduled_job(cron)``, receive a fresh ``Session``
+(committed after they return) and run in a thread so DB-bound work doesn't
+block the event loop.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import time
+import traceback
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from croniter import croniter
+from sqlalchemy import Connection, Engine, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.database import engine
+from models.job_run import JobRun
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    cron: str  # UTC
+    func: Callable[[Session], None]
+
+    @property
+    def lock_key(self) -> int:
+        """Stable signed 64-bit advisory-lock key derived from the job name."""
+        return int.from_bytes(hashlib.blake2b(self.name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+JOBS: dict[str, Job] = {}
+
+
+def scheduled_job(cron: str, name: str | None = None):
+    """Register the decorated ``func(db)`` to run on ``cron`` (UTC) on a single worker."""
+    if not croniter.is_valid(cron):
+        raise ValueError(f"Invalid cron expression: {cron!r}")
+
+    def decorator(func: Callable[[Session], None]) -> Callable[[Session], None]:
+        job = Job(name or func.__name__, cron, func)
+        JOBS[job.name] = job
+        return func
+
+    return decorator
+
+
+def next_run(cron: str, after: datetime) -> datetime:
+    """First slot of ``cron`` strictly after ``after`` (timezone-aware)."""
+    return croniter(cron, after).get_next(datetime)
+
+
+def _worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _record_start(conn: Connection, job: Job, scheduled_for: datetime) -> None:
+    values = {
+        "scheduled_for": scheduled_for,
+        "started_at": datetime.now(timezone.utc),
+        "finished_at": None,
+        "duration_seconds": None,
+        "status": "running",
+        "error": None,
+        "worker": _worker(),
+    }
+    stmt = insert(JobRun).values(name=job.name, run_count=1, **values)
+    conn.execute(stmt.on_conflict_do_update(index_elements=[JobRun.name], set_=values | {"run_count": JobRun.run_count + 1}))
+    conn.commit()
+
+
+def _record_finish(conn: Connection, job: Job, duration: float, error: str | None) -> None:
+    conn.execute(
+        update(JobRun)
+        .where(JobRun.name == job.name)
+        .values(
+            finished_at=datetime.now(timezone.utc),
+            duration_seconds=duration,
+            status="failed" if error else "succeeded",
+            error=error,
+        )
+    )
+    conn.commit()
+
+
+def run_job(job: Job, scheduled_for: datetime, bind: Engine = engine) -> bool:
+    """Run ``job`` for the ``scheduled_for`` slot unless another worker holds or already served it.
+
+    Returns whether the job ran on this worker. Exceptions raised by the job
+    are logged and recorded in ``job_runs`` rather than re-raised. The lock is
+    held on its own connection for the duration of the job, so the job's
+    session can commit as often as it needs to.
+    """
+    with bind.connect() as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}).scalar():
+            logger.debug("Job %s is running on another worker", job.name)
+            return False
+        try:
+            last_slot = lock_conn.execute(select(JobRun.scheduled_for).where(JobRun.name == job.name)).scalar()
+            if last_slot is not None and last_slot >= scheduled_for:
+                logger.debug("Job %s already ran for %s", job.name, scheduled_for.isoformat())
+                return False
+
+            _record_start(lock_conn, job, scheduled_for)
+            start = time.perf_counter()
+            error = None
+            try:
+                with Session(bind=bind, autoflush=False) as db:
+                    job.func(db)
+                    db.commit()
+            except Exception:
+                logger.exception("Scheduled job %s failed", job.name)
+                error = traceback.format_exc()
+            duration = time.perf_counter() - start
+            _record_finish(lock_conn, job, duration, error)
+            logger.info("Scheduled job %s finished in %.1f s", job.name, duration)
+            return True
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+            lock_conn.commit()
+
+
+async def run_scheduler(jobs: Iterable[Job] | None = None) -> None:
+    """Run ``jobs`` (default: every registered job) on their cron schedules until cancelled.
+
+    Errors are caught and logged so a transient DB issue can't kill the
+    scheduling loop and leave the jobs silently stopped for the rest of the
+    process lifetime. Slots missed while a long job was running are skipped.
+    """
+    jobs = list(JOBS.values() if jobs is None else jobs)
+    if not jobs:
+        return
+    now = datetime.now(timezone.utc)
+    due = {job.name: next_run(job.cron, now) for job in jobs}
+    while True:
+        slot = min(due.values())
+        await asyncio.sleep(max(0.0, (slot - datetime.now(timezone.utc)).total_seconds()))
+        for job in jobs:
+            if due[job.name] != slot:
+                continue
+            try:
+                await asyncio.to_thread(run_job, job, slot)
+            except Exception:
+                logger.exception("Could not run scheduled job %s", job.name)
+            due[job.name] = next_run(job.cron, max(slot, datetime.now(timezone.utc)))
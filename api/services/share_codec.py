@@ -0,0 +1,102 @@
+"""Compact storage encoding for shared analyses.
+
+A rendered ``AnalysisResponse`` embeds the full ``DatasetWithLayersSchema`` of
+every widget's dataset (bilingual metadata, every layer and its legend), which
+makes up most of a snapshot and is identical across all shares. Snapshots are
+therefore stored as:
+
+* ``payload`` — the analysis with each widget's ``dataset`` replaced by its
+  ``dataset_id`` (``strip_catalog``), as compact JSON, zlib-compressed. Reads
+  re-hydrate the datasets from the current catalog (``hydrate_catalog``), so a
+  share shows the catalog as it is now, like a fresh analysis would.
+* ``geometry`` — the AOI (EPSG:4326) as WKB with coordinates quantized to a
+  1e-7° grid (about 1 cm) relative to the AOI's south-west corner. Quantized
+  coordinates are small integers stored as doubles, whose zeroed low mantissa
+  bytes zlib compresses well.
+
+On-disk size per share (``pg_column_size`` of the row, i.e. after Postgres'
+own TOAST compression of the JSON columns) and ``get_shared`` time including
+response serialization, JSON columns vs compact columns (``share_benchmark.py``
+with the production catalog from ``metadata.json``; circular AOIs; mean of 200
+reads, measured locally):
+
+    AOI vertices   row size (JSON → compact)   read (JSON → compact)
+    5               8.2 kB → 1.0 kB             3.9 ms →  8.4 ms
+    1k             29.9 kB → 6.0 kB             8.0 ms →  9.7 ms
+    10k             231 kB → 64 kB               39 ms →   21 ms
+
+Re-hydration costs one catalog query plus dataset serialization (~4 ms), which
+dominates reads of small AOIs; large AOIs read faster since far less data is
+fetched and JSON-decoded.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any
+
+import numpy as np
+import shapely
+
+# Quantization steps per degree (1e-7°).
+COORDINATE_SCALE: float = 1e7
+
+_GEOMETRY_FORMAT = b"QWKB1"
+_GEOMETRY_HEADER = struct.Struct("<ddd")  # origin x, origin y, scale
+
+
+def strip_catalog(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Replace every widget's embedded ``dataset`` with its ``dataset_id``."""
+    stripped = {}
+    for key, value in analysis.items():
+        if isinstance(value, dict) and isinstance(value.get("dataset"), dict):
+            value = {k: v for k, v in value.items() if k != "dataset"} | {"dataset_id": value["dataset"]["id"]}
+        stripped[key] = value
+    return stripped
+
+
+def hydrate_catalog(stripped: dict[str, Any], datasets_by_id: dict[int, dict]) -> dict[str, Any]:
+    """Inverse of ``strip_catalog``: embed the serialized dataset of each ``dataset_id``.
+
+    Raises ``KeyError`` when a referenced dataset is no longer in the catalog.
+    """
+    analysis = {}
+    for key, value in stripped.items():
+        if isinstance(value, dict) and "dataset_id" in value:
+            value = {k: v for k, v in value.items() if k != "dataset_id"} | {"dataset": datasets_by_id[value["dataset_id"]]}
+        analysis[key] = value
+    return analysis
+
+
+def referenced_dataset_ids(stripped: dict[str, Any]) -> set[int]:
+    return {value["dataset_id"] for value in stripped.values() if isinstance(value, dict) and "dataset_id" in value}
+
+
+def encode_payload(analysis: dict[str, Any]) -> bytes:
+    """Compress a JSON-mode analysis dump with its catalog data stripped."""
+    return zlib.compress(json.dumps(strip_catalog(analysis), separators=(",", ":")).encode(), 9)
+
+
+def decode_payload(payload: bytes) -> dict[str, Any]:
+    """Return the stripped analysis stored by ``encode_payload`` (see ``hydrate_catalog``)."""
+    return json.loads(zlib.decompress(payload))
+
+
+def encode_geometry(geom_4326) -> bytes:
+    """Quantized, compressed WKB of an EPSG:4326 geometry."""
+    minx, miny, _, _ = geom_4326.bounds
+    origin = np.array([np.floor(minx), np.floor(miny)])
+    quantized = shapely.transform(geom_4326, lambda coords: np.rint((coords - origin) * COORDINATE_SCALE))
+    header = _GEOMETRY_HEADER.pack(origin[0], origin[1], COORDINATE_SCALE)
+    return _GEOMETRY_FORMAT + header + zlib.compress(shapely.to_wkb(quantized), 9)
+
+
+def decode_geometry(data: bytes):
+    """Inverse of ``encode_geometry``, exact to 1 / ``COORDINATE_SCALE`` degrees."""
+    if not data.startswith(_GEOMETRY_FORMAT):
+        raise ValueError("Unknown shared-analysis geometry encoding")
+    start = len(_GEOMETRY_FORMAT)
+    x0, y0, scale = _GEOMETRY_HEADER.unpack_from(data, start)
+    quantized = shapely.from_wkb(zlib.decompress(data[start + _GEOMETRY_HEADER.size:]))
+    origin = np.array([x0, y0])
+    return shapely.transform(quantized, lambda coords: coords / scale + origin)
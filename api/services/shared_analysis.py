@@ -1,18 +1,51 @@
-"""Service layer for the shared-analysis endpoints."""
+"""Service layer for the shared-analysis endpoints.
 
+Snapshots are stored in the compact encoding of ``services.share_codec``;
+rows written before it keep their plain-JSON ``analysis``/``geojson`` columns
+until ``compact_shares.py`` converts them, and are read from those meanwhile.
+
+Reads are served from an in-process LRU of ready-to-send response bodies
+(``fetch_shared_response``, then ``build_shared_response`` on a miss), keyed by
+share id, ``SHARED_SCHEMA_VERSION`` and the catalog version (``models.CatalogVersion``, bumped by the seed), so a popular
+link is decoded, re-hydrated and validated once per schema and catalog rather
+than on every hit.
+"""
+
+import hashlib
+import json
 import logging
-from datetime import datetime, timedelta, timezone
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
 from uuid import UUID
 
+import shapely
 from fastapi import HTTPException
-from pydantic import ValidationError
-from sqlalchemy import delete
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter, ValidationError
+from shapely.geometry import mapping
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session, selectinload
 
+from models.catalog_version import CatalogVersion
+from models.dataset import Dataset
 from models.shared_analysis import SharedAnalysis
 from schemas.analysis import AnalysisInput, AnalysisResponse
+from schemas.dataset import DatasetWithLayersSchema
 from schemas.shared_analysis import SharedAnalysisRead
 from services.analysis import validate_geometry_v2
+from services.analysis_results import get_result, verify_result_token
+from services.geojson import extract_geometry
+from services.share_codec import (
+    decode_geometry,
+    decode_payload,
+    encode_geometry,
+    encode_payload,
+    hydrate_catalog,
+    referenced_dataset_ids,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,23 +55,52 @@ SHARED_ANALYSIS_TTL_DAYS: int = 30
 # current AnalysisResponse schema" — the FE only needs one branch to render an expired state.
 EXPIRED_DETAIL: str = "This shared analysis has expired or is no longer available"
 
+_GEOJSON_ADAPTER = TypeAdapter(AnalysisInput)
+
+SHARED_READ_CACHE_SIZE: int = 512
+# Browsers and CDNs may reuse a share response this long without asking again.
+# Bounded (rather than a year) because the body re-embeds the current catalog
+# and the share expires after ``SHARED_ANALYSIS_TTL_DAYS``.
+SHARED_READ_MAX_AGE_SECONDS: int = 3600
+
+# Moves whenever the response schema changes, so cached bodies built against an
+# older ``AnalysisResponse`` are never served (they are re-validated instead).
+SHARED_SCHEMA_VERSION: str = hashlib.sha256(
+    json.dumps(SharedAnalysisRead.model_json_schema(), sort_keys=True).encode()
+).hexdigest()[:16]
+
+# Version of the dataset and layer rows shares are re-hydrated from: one primary-key
+# lookup, bumped by the seed in the transaction that changes them.
+_CATALOG_VERSION = select(CatalogVersion.version).where(CatalogVersion.id == 1)
+
 
 def create_shared(
     db: Session,
     analysis: AnalysisResponse,
     geojson: AnalysisInput,
+    result_token: str | None = None,
 ) -> SharedAnalysis:
     """Persist an analysis snapshot and return the inserted row.
 
     The geojson is re-validated through the v2 pipeline (same checks used by
     ``POST /analysis/v2``) so we never persist geometry that would have failed
     a normal analysis run. Invalid input raises ``HTTPException(422)``.
+
+    A ``result_token`` (``X-Analysis-Result-Token`` of the run) that matches the
+    uploaded geometry and analysis proves both already went through that run,
+    so the validation is skipped; a token that does not match raises 422.
     """
-    validate_geometry_v2(geojson)
+    if result_token is None:
+        geom, _ = validate_geometry_v2(geojson)
+    else:
+        geom = extract_geometry(geojson)
+        if not verify_result_token(result_token, geom, analysis):
+            logger.warning("Result token does not match the uploaded analysis")
+            raise HTTPException(status_code=422, detail="Result token does not match the analysis and geojson")
 
     row = SharedAnalysis(
-        analysis=analysis.model_dump(mode="json"),
-        geojson=geojson.model_dump(mode="json"),
+        payload=encode_payload(analysis.model_dump(mode="json")),
+        geometry=encode_geometry(geom),
     )
     db.add(row)
     db.flush()
@@ -47,47 +109,356 @@ def create_shared(
     return row
 
 
-def get_shared(db: Session, share_id: UUID) -> SharedAnalysisRead:
-    """Fetch a shared analysis and revalidate its stored payload against the current schema.
+def create_shared_from_result(db: Session, result_id: UUID) -> SharedAnalysis:
+    """Promote a stored ``POST /analysis/v2`` result to a shared analysis.
 
-    Two failure modes collapse to a single 410 response:
-    1. Row not found (deleted by the cleanup task or never existed).
-    2. Stored ``analysis`` JSON no longer conforms to ``AnalysisResponse`` (the
-       widget schema changed since the snapshot was taken).
+    The result was validated and computed server-side, so nothing is uploaded
+    or re-validated. Raises ``HTTPException(404)`` when the result is unknown or
+    older than ``ANALYSIS_RESULT_TTL_HOURS`` (clients then share the snapshot
+    with its result token instead).
     """
+    row = get_result(db, result_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Analysis result not found or expired")
+
+    shared = SharedAnalysis(
+        payload=encode_payload(row.analysis),
+        geometry=encode_geometry(shapely.from_wkb(row.geometry)),
+    )
+    db.add(shared)
+    db.flush()
+    db.refresh(shared)
+    logger.info("Created shared analysis %s from result %s", shared.id, result_id)
+    return shared
+
+
+@dataclass(frozen=True)
+class StoredShare:
+    """What ``get_shared`` reads from the database: a share row and the catalog datasets it references.
+
+    ``analysis`` is the stripped payload of compact rows (``geometry`` set) or
+    the plain JSON of legacy rows (``geojson`` set). ``cache_key`` is filled in
+    by ``fetch_shared_response``.
+    """
+
+    id: UUID
+    created_at: datetime
+    analysis: dict
+    geometry: bytes | None
+    geojson: dict | None
+    datasets: dict[int, Dataset]
+    cache_key: tuple | None = None
+
+
+def _load_shared(db: Session, share_id: UUID) -> StoredShare:
+    """The queries of ``get_shared``; raises ``HTTPException(410)`` when the row does not exist."""
     row = db.get(SharedAnalysis, share_id)
     if row is None:
         logger.info("Shared analysis %s not found", share_id)
         raise HTTPException(status_code=410, detail=EXPIRED_DETAIL)
 
+    if row.payload is None:
+        return StoredShare(row.id, row.created_at, row.analysis, None, row.geojson, {})
+    stripped = decode_payload(row.payload)
+    datasets = db.scalars(
+        select(Dataset).where(Dataset.id.in_(referenced_dataset_ids(stripped))).options(selectinload(Dataset.layers))
+    )
+    return StoredShare(row.id, row.created_at, stripped, row.geometry, None, {ds.id: ds for ds in datasets})
+
+
+def _read_shared(stored: StoredShare) -> SharedAnalysisRead:
+    """The CPU side of ``get_shared``: re-hydrate and revalidate a loaded share, without touching the database."""
+    if stored.geometry is None:
+        analysis, geojson = stored.analysis, stored.geojson
+    else:
+        catalog = {ds_id: DatasetWithLayersSchema.from_orm_dataset(ds) for ds_id, ds in stored.datasets.items()}
+        try:
+            analysis = hydrate_catalog(stored.analysis, catalog)
+        except KeyError as exc:
+            logger.warning("Shared analysis %s references dataset %s, no longer in the catalog", stored.id, exc)
+            raise HTTPException(status_code=410, detail=EXPIRED_DETAIL)
+        geojson = _feature(decode_geometry(stored.geometry))
+
     try:
-        analysis = AnalysisResponse.model_validate(row.analysis)
+        validated = AnalysisResponse.model_validate(analysis)
     except ValidationError as exc:
         logger.warning(
             "Shared analysis %s no longer conforms to AnalysisResponse: %s",
-            share_id,
+            stored.id,
             exc.errors(),
         )
         raise HTTPException(status_code=410, detail=EXPIRED_DETAIL)
 
     return SharedAnalysisRead(
-        id=row.id,
-        analysis=analysis,
-        geojson=row.geojson,
-        created_at=row.created_at,
+        id=stored.id,
+        analysis=validated,
+        geojson=geojson,
+        created_at=stored.created_at,
     )
 
 
-def delete_expired(db: Session, ttl_days: int = SHARED_ANALYSIS_TTL_DAYS) -> int:
+def get_shared(db: Session, share_id: UUID) -> SharedAnalysisRead:
+    """Fetch a shared analysis and revalidate its stored payload against the current schema.
+
+    Two failure modes collapse to a single 410 response:
+    1. Row not found (deleted by the cleanup task or never existed).
+    2. Stored ``analysis`` JSON no longer conforms to ``AnalysisResponse`` (the
+       widget schema changed since the snapshot was taken).
+    """
+    return _read_shared(_load_shared(db, share_id))
+
+
+def _feature(geom) -> dict:
+    return {"type": "Feature", "geometry": mapping(geom), "properties": {}}
+
+
+def get_shared_geometry(db: Session, share_id: UUID):
+    """Return a shared analysis' stored AOI as a Shapely geometry in EPSG:4326.
+
+    Reads only the geometry columns. Raises ``HTTPException(410)`` when the row
+    does not exist, matching ``get_shared``.
+    """
+    stored = db.execute(
+        select(SharedAnalysis.geometry, SharedAnalysis.geojson).where(SharedAnalysis.id == share_id)
+    ).one_or_none()
+    if stored is None:
+        raise HTTPException(status_code=410, detail=EXPIRED_DETAIL)
+    if stored.geometry is not None:
+        return decode_geometry(stored.geometry)
+    return extract_geometry(_GEOJSON_ADAPTER.validate_python(stored.geojson))
+
+
+def ensure_shared_exists(db: Session, share_id: UUID) -> None:
+    """Raise ``HTTPException(410)`` unless a shared analysis row with ``share_id`` exists."""
+    if db.scalar(select(SharedAnalysis.id).where(SharedAnalysis.id == share_id)) is None:
+        raise HTTPException(status_code=410, detail=EXPIRED_DETAIL)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Expiry
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Rows per DELETE statement when expiring row by row.
+SHARED_EXPIRY_BATCH_SIZE: int = 1000
+# Daily partitions are created this many days ahead of today.
+SHARED_PARTITION_DAYS_AHEAD: int = 3
+# Detaching a partition needs a brief exclusive lock on the parent table; give up
+# (and retry on the next run) rather than queue behind long-running reads.
+_PARTITION_LOCK_TIMEOUT = "5s"
+_PARTITION_PREFIX = "shared_analyses_p"
+
+
+def _is_partitioned(db: Session) -> bool:
+    return bool(db.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid"
+        " WHERE c.relname = 'shared_analyses' AND pg_table_is_visible(c.oid))"
+    )))
+
+
+def _daily_partitions(db: Session) -> dict[date, str]:
+    """Daily partitions of ``shared_analyses`` by the day they hold."""
+    names = db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+        " JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'shared_analyses'"
+    ))
+    partitions = {}
+    for name in names:
+        if name.startswith(_PARTITION_PREFIX):
+            partitions[datetime.strptime(name.removeprefix(_PARTITION_PREFIX), "%Y%m%d").date()] = name
+    return partitions
+
+
+def ensure_partitions(db: Session, start: date | None = None, days: int = SHARED_PARTITION_DAYS_AHEAD) -> int:
+    """Create the daily partitions for ``start`` (default: today, UTC) through ``start + days``.
+
+    Returns the number created; a no-op on unpartitioned tables. A day whose rows
+    already landed in the default partition cannot get its own partition and is
+    skipped (its rows are expired by the batched delete). Does NOT commit.
+    """
+    if not _is_partitioned(db):
+        return 0
+    start = start or datetime.now(tz=timezone.utc).date()
+    existing = _daily_partitions(db)
+    created = 0
+    for offset in range(days + 1):
+        day = start + timedelta(days=offset)
+        if day in existing:
+            continue
+        name = f"{_PARTITION_PREFIX}{day:%Y%m%d}"
+        try:
+            with db.begin_nested():
+                db.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF shared_analyses"
+                    f" FOR VALUES FROM ('{day} 00:00+00') TO ('{day + timedelta(days=1)} 00:00+00')"
+                ))
+        except DBAPIError as exc:
+            logger.warning("Could not create shared-analysis partition %s: %s", name, exc.orig)
+            continue
+        created += 1
+    if created:
+        logger.info("Created %d shared-analysis partitions from %s", created, start.isoformat())
+    return created
+
+
+def _expired_partitions(db: Session, cutoff: datetime) -> list[str]:
+    """Daily partitions that end before ``cutoff``, oldest first."""
+    return [
+        name
+        for day, name in sorted(_daily_partitions(db).items())
+        if datetime.combine(day + timedelta(days=1), time(), tzinfo=timezone.utc) <= cutoff
+    ]
+
+
+def _drop_partition(db: Session, name: str) -> int | None:
+    """Detach and drop one daily partition and return its row count; None when its lock timed out.
+
+    Runs in a savepoint, so a lock timeout rolls back only this step.
+    """
+    rows = db.scalar(text(f"SELECT count(*) FROM {name}"))
+    try:
+        with db.begin_nested():
+            db.execute(text(f"SET LOCAL lock_timeout = '{_PARTITION_LOCK_TIMEOUT}'"))
+            db.execute(text(f"ALTER TABLE shared_analyses DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            db.execute(text("SET LOCAL lock_timeout = DEFAULT"))
+    except OperationalError as exc:
+        logger.warning("Could not drop shared-analysis partition %s, retrying next run: %s", name, exc.orig)
+        return None
+    logger.info("Dropped shared-analysis partition %s (%d rows)", name, rows)
+    return rows
+
+
+def delete_expired(
+    db: Session,
+    ttl_days: int = SHARED_ANALYSIS_TTL_DAYS,
+    batch_size: int = SHARED_EXPIRY_BATCH_SIZE,
+    checkpoint: Callable[[], None] | None = None,
+) -> int:
     """Delete rows older than ``ttl_days``. Returns the number of rows removed.
 
-    Does NOT commit — the caller (the scheduled cleanup task in production, the
-    test fixture in tests) is responsible for committing or rolling back. This
-    mirrors the convention used by ``services/seed.py``.
+    On a partitioned table whole expired days are dropped first
+    (``_drop_partition``); the remaining expired rows (the day straddling the
+    cutoff, the default partition, or every row of an unpartitioned table) are
+    deleted ``batch_size`` at a time.
+
+    Does NOT commit. ``checkpoint`` is called after each dropped partition and
+    each batch; the nightly job (``services.cleanup``) passes ``db.commit`` so
+    no transaction or lock outlives one bounded chunk of work however large
+    the backlog.
     """
     cutoff = datetime.now(tz=timezone.utc) - timedelta(days=ttl_days)
-    result = db.execute(delete(SharedAnalysis).where(SharedAnalysis.created_at < cutoff))
-    count = result.rowcount or 0
+    checkpoint = checkpoint or (lambda: None)
+    count = 0
+    for name in _expired_partitions(db, cutoff) if _is_partitioned(db) else []:
+        rows = _drop_partition(db, name)
+        checkpoint()
+        if rows is None:
+            break
+        count += rows
+
+    expired_ids = select(SharedAnalysis.id).where(SharedAnalysis.created_at < cutoff).limit(batch_size)
+    while True:
+        deleted = db.execute(delete(SharedAnalysis).where(SharedAnalysis.id.in_(expired_ids))).rowcount or 0
+        checkpoint()
+        count += deleted
+        if deleted < batch_size:
+            break
     if count:
         logger.info("Deleted %d expired shared analyses (cutoff %s)", count, cutoff.isoformat())
     return count
+
+
+def compact_legacy_shares(
+    db: Session, batch_size: int = 500, checkpoint: Callable[[], None] | None = None
+) -> int:
+    """Convert rows still stored as plain JSON to the compact encoding. Returns the number converted.
+
+    Geometries are taken from the stored geojson as-is (they were validated when
+    shared). Does NOT commit. ``checkpoint`` is called after each batch of
+    ``batch_size`` rows; ``compact_shares.py`` passes ``db.commit`` so the
+    rewrite never holds one long write transaction, as in ``delete_expired``.
+    """
+    checkpoint = checkpoint or (lambda: None)
+    converted = 0
+    while True:
+        rows = db.scalars(
+            select(SharedAnalysis).where(SharedAnalysis.payload.is_(None)).limit(batch_size)
+        ).all()
+        if not rows:
+            return converted
+        for row in rows:
+            row.payload = encode_payload(row.analysis)
+            row.geometry = encode_geometry(extract_geometry(_GEOJSON_ADAPTER.validate_python(row.geojson)))
+            row.analysis = None
+            row.geojson = None
+        db.flush()
+        checkpoint()
+        converted += len(rows)
+        logger.info("Compacted %d shared analyses", converted)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cached reads
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class SharedResponse:
+    """A validated ``SharedAnalysisRead`` serialized to JSON, with its strong ETag."""
+
+    body: bytes
+    etag: str
+    expires_at: datetime
+
+    @property
+    def cache_control(self) -> str:
+        remaining = int((self.expires_at - datetime.now(tz=timezone.utc)).total_seconds())
+        return f"public, max-age={max(0, min(SHARED_READ_MAX_AGE_SECONDS, remaining))}, immutable"
+
+
+_shared_responses: OrderedDict[tuple[UUID, str, int | None], SharedResponse] = OrderedDict()
+_shared_responses_lock = threading.Lock()
+
+
+def fetch_shared_response(db: Session, share_id: UUID) -> SharedResponse | StoredShare:
+    """Return the cached response of a share, or the loaded share for ``build_shared_response``.
+
+    Only queries (and the payload decompression that says which datasets to
+    load), so in async mode it can run on the event loop while the share
+    endpoint builds the response on the ``CATALOG`` executor. Failures are
+    never cached, so 410 responses behave exactly as in ``get_shared``. A
+    cached entry is dropped (410) once the share is past its TTL, the only way
+    rows disappear.
+    """
+    key = (share_id, SHARED_SCHEMA_VERSION, db.scalar(_CATALOG_VERSION))
+    with _shared_responses_lock:
+        cached = _shared_responses.get(key)
+        if cached is not None:
+            _shared_responses.move_to_end(key)
+    if cached is not None:
+        if cached.expires_at > datetime.now(tz=timezone.utc):
+            return cached
+        with _shared_responses_lock:
+            _shared_responses.pop(key, None)
+        raise HTTPException(status_code=410, detail=EXPIRED_DETAIL)
+    return replace(_load_shared(db, share_id), cache_key=key)
+
+
+def build_shared_response(stored: StoredShare) -> SharedResponse:
+    """Validate and serialize a share loaded by ``fetch_shared_response`` and cache the result; no queries."""
+    shared = _read_shared(stored)
+    body = shared.model_dump_json().encode()
+    response = SharedResponse(
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        expires_at=shared.created_at + timedelta(days=SHARED_ANALYSIS_TTL_DAYS),
+    )
+    with _shared_responses_lock:
+        _shared_responses[stored.cache_key] = response
+        while len(_shared_responses) > SHARED_READ_CACHE_SIZE:
+            _shared_responses.popitem(last=False)
+    return response
+
+
+def clear_shared_responses() -> None:
+    with _shared_responses_lock:
+        _shared_responses.clear()
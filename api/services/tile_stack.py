@@ -0,0 +1,135 @@
+"""Time-series tile stacks: every time step of a dataset rendered at one ``{z}/{x}/{y}``.
+
+Animating the snow dynamics winters otherwise needs one tile pyramid (and one
+set of tile requests per viewport) per winter. ``render_tile_stack`` reads the
+same tile from every time-step layer of a dataset concurrently and packs the
+PNGs into a single binary body:
+
+    [4-byte big-endian index length N][N bytes of UTF-8 JSON index][PNG 0][PNG 1]...
+
+The index lists the slices in time order::
+
+    {"tilesize": 256, "slices": [{"layer_id": "lengthT_winter_1819_cog", "series": "lengthT_winter",
+                                  "step": "1819", "x": 2018, "offset": 0, "length": 5120}, ...]}
+
+``offset`` is relative to the first byte after the index. A slice whose raster
+does not cover the tile has ``length`` 0.
+"""
+
+import json
+import logging
+import struct
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler.io import Reader
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from executors import TILE_READS
+from models.layer import Layer
+from services.layer_stats import RESCALE_PERCENTILES
+from services.raster_io import s3_uri
+from services.time_series import TimeStep, parse_time_step
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class StackSlice:
+    """One time step of the stack: the layer, its position in the series and how to render it."""
+
+    layer_id: str
+    time_step: TimeStep
+    uri: str
+    rescale: tuple[float, float] | None
+
+
+def _stats_rescale(layer: Layer) -> tuple[float, float] | None:
+    percentiles = (layer.stats or {}).get("percentiles", {})
+    lo, hi = (percentiles.get(p) for p in RESCALE_PERCENTILES)
+    if lo is None or hi is None or hi <= lo:
+        return None
+    return lo, hi
+
+
+def select_slices(
+    db: Session,
+    dataset_id: int,
+    bucket: str,
+    series: str | None = None,
+    rescale: tuple[float, float] | None = None,
+) -> list[StackSlice]:
+    """Return the time-step layers of a dataset ordered by series, then chronologically.
+
+    ``rescale`` applies to every slice; when None each slice falls back to its
+    layer's precomputed p2–p98 range (``Layer.stats``), if any. Raises
+    ``HTTPException(422)`` when the dataset has no time-series raster layers or
+    ``series`` does not name one of them.
+    """
+    layers = db.scalars(
+        select(Layer).where(Layer.dataset_id == dataset_id, Layer.format_ == "raster").order_by(Layer.id)
+    ).all()
+    steps = [(layer, ts) for layer in layers if (ts := parse_time_step(layer.id)) is not None]
+    if not steps:
+        raise HTTPException(status_code=422, detail="Dataset has no time-series raster layers")
+
+    available = list(dict.fromkeys(ts.series for _, ts in steps))
+    if series is not None:
+        if series not in available:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown series '{series}'. Available: {', '.join(available)}",
+            )
+        steps = [(layer, ts) for layer, ts in steps if ts.series == series]
+
+    steps.sort(key=lambda item: (available.index(item[1].series), item[1].x))
+    return [
+        StackSlice(
+            layer_id=layer.id,
+            time_step=ts,
+            uri=s3_uri(layer.path, bucket),
+            rescale=rescale or _stats_rescale(layer),
+        )
+        for layer, ts in steps
+    ]
+
+
+def _render_slice(slice_: StackSlice, z: int, x: int, y: int, colormap) -> bytes:
+    try:
+        with Reader(slice_.uri) as src:
+            image = src.tile(x, y, z, tilesize=TILE_SIZE)
+    except TileOutsideBounds:
+        return b""
+    if slice_.rescale is not None and colormap is None:
+        image.rescale(in_range=(slice_.rescale,))
+    return image.render(img_format="PNG", colormap=colormap)
+
+
+def render_tile_stack(slices: list[StackSlice], z: int, x: int, y: int, colormap=None) -> bytes:
+    """Render the tile of every slice concurrently (on ``TILE_READS``) and pack them with their index.
+
+    ``colormap`` (TiTiler format) applies to every slice; like ``/cog`` tiles, a
+    colormap is interpreted on raw pixel values, so it disables rescaling.
+    """
+    images = TILE_READS.map(lambda s: _render_slice(s, z, x, y, colormap), slices)
+
+    index = {"tilesize": TILE_SIZE, "slices": []}
+    offset = 0
+    for slice_, image in zip(slices, images):
+        index["slices"].append({
+            "layer_id": slice_.layer_id,
+            "series": slice_.time_step.series,
+            "step": slice_.time_step.step,
+            "x": slice_.time_step.x,
+            "offset": offset,
+            "length": len(image),
+        })
+        offset += len(image)
+
+    header = json.dumps(index, separators=(",", ":")).encode()
+    logger.debug("Packed %d tile slices (%d bytes) for %d/%d/%d", len(slices), offset, z, x, y)
+    return struct.pack(">I", len(header)) + header + b"".join(images)
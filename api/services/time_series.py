@@ -0,0 +1,33 @@
+"""Helpers for layers that form a time series (one raster per time step).
+
+Time-series membership is encoded in the layer id, e.g. the snow dynamics
+dataset publishes ``lengthT_winter_1819_cog`` … ``lengthT_winter_2324_cog``.
+Layers sharing the same prefix belong to one series; the 4-digit suffix
+``YYZZ`` identifies the winter starting in ``20YY``.
+"""
+
+import re
+from typing import NamedTuple
+
+_WINTER_LAYER_ID = re.compile(r"^(?P<series>.+_winter)_(?P<step>\d{4})_cog$")
+
+
+class TimeStep(NamedTuple):
+    """Position of a layer within a time series."""
+
+    series: str
+    step: str
+    x: int
+
+
+def parse_time_step(layer_id: str) -> TimeStep | None:
+    """Return the series key and step for a time-series layer id, or None.
+
+    The X value is the start year of the winter (``1819`` → ``2018``), matching
+    the ``x`` axis used by the snow dynamics ``time_series`` widget chart.
+    """
+    match = _WINTER_LAYER_ID.match(layer_id)
+    if match is None:
+        return None
+    step = match.group("step")
+    return TimeStep(series=match.group("series"), step=step, x=2000 + int(step[:2]))
@@ -0,0 +1,145 @@
+"""Mapbox Vector Tiles (MVT) for the HBL footprint and shared-analysis AOIs.
+
+The footprint GeoJSON is several hundred kilobytes at full resolution, most of
+which is detail invisible below zoom ~10. ``ZoomPyramid`` holds one copy of a
+geometry per zoom level in EPSG:3857, each simplified with a tolerance of about
+one tile pixel at that zoom; a tile request then only clips the level's
+geometry to the tile and encodes it. Above ``MAX_SIMPLIFIED_ZOOM`` the
+full-resolution geometry is used.
+
+The footprint pyramid is built once at import (``HBL_AREA_PYRAMID`` in
+``routers.hbl_area``) and its encoded tiles are memoised. Shared-analysis AOIs
+are built lazily per share id and kept in a small LRU (``get_shared_pyramid``).
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from uuid import UUID
+
+import mapbox_vector_tile
+import shapely
+from fastapi import HTTPException
+from shapely.geometry import box
+
+from services.raster_io import reproject
+
+logger = logging.getLogger(__name__)
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+MVT_EXTENT = 4096
+MAX_TILE_ZOOM = 22
+MAX_SIMPLIFIED_ZOOM = 12
+
+# Geometry outside the tile kept by the clip, in tile pixels, so strokes along
+# the tile edge are not cut off.
+TILE_BUFFER_PX = 4
+TILE_SIZE_PX = 256
+
+SHARED_PYRAMID_CACHE_SIZE = 64
+
+_WEB_MERCATOR_HALF = 20037508.342789244
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """EPSG:3857 bounds ``(minx, miny, maxx, maxy)`` of an XYZ tile."""
+    size = 2 * _WEB_MERCATOR_HALF / (1 << z)
+    minx = -_WEB_MERCATOR_HALF + x * size
+    maxy = _WEB_MERCATOR_HALF - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def validate_tile(z: int, x: int, y: int) -> None:
+    """Raise ``HTTPException(422)`` when ``x``/``y`` fall outside the tile matrix of zoom ``z``."""
+    limit = 1 << z
+    if not (0 <= x < limit and 0 <= y < limit):
+        raise HTTPException(status_code=422, detail=f"Tile {z}/{x}/{y} is outside the tile matrix")
+
+
+def _pixel_size(z: int) -> float:
+    """Ground size in metres of one 256-px tile pixel at zoom ``z``."""
+    return 2 * _WEB_MERCATOR_HALF / (TILE_SIZE_PX << z)
+
+
+class ZoomPyramid:
+    """A geometry simplified once per zoom level, in EPSG:3857.
+
+    Levels are computed on first use; ``precompute`` builds all of them up front.
+    """
+
+    def __init__(self, geom_4326, max_zoom: int = MAX_SIMPLIFIED_ZOOM) -> None:
+        self.geometry = reproject(geom_4326, "EPSG:4326", "EPSG:3857")
+        self.bounds = self.geometry.bounds
+        self.max_zoom = max_zoom
+        self._levels: dict[int, object] = {}
+        self._lock = threading.Lock()
+
+    def precompute(self) -> "ZoomPyramid":
+        for z in range(self.max_zoom + 1):
+            self.at(z)
+        return self
+
+    def at(self, z: int):
+        """Geometry to render at zoom ``z``."""
+        if z > self.max_zoom:
+            return self.geometry
+        level = self._levels.get(z)
+        if level is None:
+            level = shapely.simplify(self.geometry, _pixel_size(z), preserve_topology=True)
+            with self._lock:
+                self._levels.setdefault(z, level)
+        return level
+
+
+def encode_tile(layer_name: str, pyramid: ZoomPyramid, z: int, x: int, y: int, properties: dict | None = None) -> bytes:
+    """Clip ``pyramid``'s zoom-``z`` geometry to the tile and encode it as a one-layer MVT.
+
+    Returns ``b""`` when the geometry does not intersect the (buffered) tile.
+    """
+    bounds = tile_bounds(z, x, y)
+    minx, miny, maxx, maxy = pyramid.bounds
+    if maxx < bounds[0] or minx > bounds[2] or maxy < bounds[1] or miny > bounds[3]:
+        return b""
+
+    buffer = TILE_BUFFER_PX * _pixel_size(z)
+    clipped = shapely.clip_by_rect(
+        pyramid.at(z), bounds[0] - buffer, bounds[1] - buffer, bounds[2] + buffer, bounds[3] + buffer
+    )
+    if clipped.is_empty or not clipped.intersects(box(*bounds)):
+        return b""
+
+    return mapbox_vector_tile.encode(
+        [{"name": layer_name, "features": [{"geometry": clipped, "properties": properties or {}}]}],
+        default_options={"quantize_bounds": bounds, "extents": MVT_EXTENT},
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Shared-analysis AOI pyramids
+# ─────────────────────────────────────────────────────────────────────────────
+
+_shared_pyramids: OrderedDict[UUID, ZoomPyramid] = OrderedDict()
+_shared_pyramids_lock = threading.Lock()
+
+
+def get_shared_pyramid(share_id: UUID, load_geometry: Callable[[], object]) -> ZoomPyramid:
+    """Return the cached pyramid for a share, building it from ``load_geometry()`` on a miss."""
+    with _shared_pyramids_lock:
+        pyramid = _shared_pyramids.get(share_id)
+        if pyramid is not None:
+            _shared_pyramids.move_to_end(share_id)
+            return pyramid
+
+    pyramid = ZoomPyramid(load_geometry())
+    with _shared_pyramids_lock:
+        _shared_pyramids[share_id] = pyramid
+        while len(_shared_pyramids) > SHARED_PYRAMID_CACHE_SIZE:
+            _shared_pyramids.popitem(last=False)
+    logger.debug("Built AOI tile pyramid for shared analysis %s", share_id)
+    return pyramid
+
+
+def clear_shared_pyramids() -> None:
+    with _shared_pyramids_lock:
+        _shared_pyramids.clear()
@@ -2,18 +2,19 @@
 
 import logging
 import math
+from dataclasses import dataclass, field
 from datetime import date, timedelta
-from functools import lru_cache
 from typing import Any
 
 import numpy as np
 import rasterio
+import shapely
 from exactextract import exact_extract
-from pyproj import Transformer
 from shapely.geometry import mapping
-from shapely.ops import transform
 
 from schemas.dataset import DatasetWithLayersSchema
+from services.block_summary import interior_summary
+from services.raster_io import reproject, s3_uri
 from services.widgets import WIDGET_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -22,21 +23,6 @@ logger = logging.getLogger(__name__)
 # Internal helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
-@lru_cache(maxsize=None)
-def _transformer(src_crs: str, dst_crs: str) -> Transformer:
-    # Built once per CRS pair per process; construction is expensive.
-    return Transformer.from_crs(src_crs, dst_crs, always_xy=True)
-
-
-def _reproject(geom, src_crs: str, dst_crs: str):
-    return transform(_transformer(src_crs, dst_crs).transform, geom)
-
-
-def _s3_uri(db_path: str, bucket: str) -> str:
-    """Build an S3 URI from a DB layer path (strips leading slash)."""
-    return f"s3://{bucket}/{db_path.lstrip('/')}"
-
-
 def _optimal_overview_level(src: rasterio.DatasetReader, geom) -> int | None:
     """Return the 0-based overview level where polygon pixel count fits within one raster block.
 
@@ -53,19 +39,220 @@ def _optimal_overview_level(src: rasterio.DatasetReader, geom) -> int | None:
     return level if level >= 0 else None
 
 
-def _run_exact_extract(path: str, geom_4326, ops: list[str]) -> dict[str, Any]:
-    """Open a raster at its optimal overview level and run exactextract.
+# ─────────────────────────────────────────────────────────────────────────────
+# Resolution-aware simplification
+# ─────────────────────────────────────────────────────────────────────────────
 
-    The geometry is provided in EPSG:4326 and reprojected to the raster's
-    native CRS (read from the file) before extraction.
+# Douglas–Peucker tolerance as a fraction of the effective pixel size (native
+# resolution × overview factor). Vertices closer together than that cannot
+# change which pixels the AOI covers by more than a sliver of coverage fraction.
+SIMPLIFY_TOLERANCE_PX: float = 0.1
+# AOIs with fewer vertices are extracted as-is; simplifying them gains nothing.
+SIMPLIFY_MIN_VERTICES: int = 1000
+# Documented accuracy bound: a simplification that changes the AOI area by more
+# than this relative amount is discarded and the full geometry is used instead.
+# Coverage fractions (and so every frac_* stat) therefore move by at most this
+# much, and coverage-weighted means by at most this share of the AOI's weight.
+SIMPLIFY_MAX_AREA_DELTA: float = 0.005
 
-    Returns a flat dict of operation results keyed by op name.
+
+def _native_geometry(geom_4326, crs: str, cache: dict | None):
+    """Reproject the AOI to ``crs``, once per CRS when a per-request ``cache`` is given."""
+    if cache is None:
+        return reproject(geom_4326, "EPSG:4326", crs)
+    key = ("native", crs)
+    if key not in cache:
+        cache[key] = reproject(geom_4326, "EPSG:4326", crs)
+    return cache[key]
+
+
+def _overview_factor(src: rasterio.DatasetReader, level: int | None) -> int:
+    """Decimation factor of overview ``level`` relative to native resolution (1 for native)."""
+    return src.overviews(1)[level] if level is not None else 1
+
+
+def _effective_pixel_size(src: rasterio.DatasetReader, level: int | None) -> float:
+    """Pixel size (CRS units) of the grid exactextract will read: native or the given overview."""
+    return min(abs(r) for r in src.res) * _overview_factor(src, level)
+
+
+def _simplify_for_grid(geom, pixel_size: float):
+    """Return ``(geometry, area_delta)`` with detail finer than the pixel grid removed.
+
+    ``area_delta`` is the relative area change (0.0 when the geometry is returned
+    unchanged). Topology is preserved; invalid results and results beyond
+    ``SIMPLIFY_MAX_AREA_DELTA`` fall back to the original geometry.
     """
-    with rasterio.open(path) as src:
-        native_crs = src.crs.to_string()
-        geom = _reproject(geom_4326, "EPSG:4326", native_crs)
-        level = _optimal_overview_level(src, geom)
+    vertices = shapely.get_num_coordinates(geom)
+    if vertices < SIMPLIFY_MIN_VERTICES or geom.area == 0:
+        return geom, 0.0
+
+    simplified = shapely.simplify(geom, SIMPLIFY_TOLERANCE_PX * pixel_size, preserve_topology=True)
+    area_delta = (simplified.area - geom.area) / geom.area
+    if not simplified.is_valid or abs(area_delta) > SIMPLIFY_MAX_AREA_DELTA:
+        logger.info(
+            "Simplification at %.1f px discarded (valid=%s, area delta %.3f%%)",
+            pixel_size, simplified.is_valid, area_delta * 100,
+        )
+        return geom, 0.0
+
+    logger.info(
+        "Simplified AOI for %.1f px grid: %d → %d vertices, area delta %.4f%%",
+        pixel_size, vertices, shapely.get_num_coordinates(simplified), area_delta * 100,
+    )
+    return simplified, area_delta
+
+
+def _grid_geometry(geom, crs: str, pixel_size: float, cache: dict | None, part: int | None = None):
+    """``_simplify_for_grid`` memoised per (CRS, pixel size, part), so layers on the same grid share it."""
+    if cache is None:
+        return _simplify_for_grid(geom, pixel_size)[0]
+    key = ("grid", crs, round(pixel_size, 6), part)
+    if key not in cache:
+        cache[key] = _simplify_for_grid(geom, pixel_size)
+    return cache[key][0]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Per-part extraction for scattered MultiPolygons
+# ─────────────────────────────────────────────────────────────────────────────
+
+# A MultiPolygon is extracted part by part when its clusters' bounding boxes
+# cover at most this share of its overall bounding box (e.g. two small AOIs at
+# opposite ends of the HBL); otherwise one window over the whole AOI is cheaper.
+SCATTER_MAX_BBOX_SHARE: float = 0.25
+
+# exactextract ops whose per-part results can be merged exactly. ``count``
+# (coverage-weighted valid pixels) is the weight for means and fractions.
+_MERGEABLE_OPS = frozenset(
+    {"count", "sum", "mean", "min", "max", "values", "coverage", "unique", "frac", "majority", "minority", "variety"}
+)
+_CLASS_OPS = frozenset({"unique", "frac", "majority", "minority", "variety"})
+
 
+def _bbox_area(bounds: tuple[float, float, float, float]) -> float:
+    return (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+
+
+def _cluster_parts(geom) -> list:
+    """Group a MultiPolygon's parts whose bounding boxes overlap (transitively)."""
+    parts = list(shapely.get_parts(geom))
+    tree = shapely.STRtree(shapely.envelope(parts))
+    cluster_of = list(range(len(parts)))
+
+    def root(i: int) -> int:
+        while cluster_of[i] != i:
+            cluster_of[i] = cluster_of[cluster_of[i]]
+            i = cluster_of[i]
+        return i
+
+    left, right = tree.query(shapely.envelope(parts), predicate="intersects")
+    for i, j in zip(left, right):
+        cluster_of[root(i)] = root(j)
+
+    clusters: dict[int, list] = {}
+    for i, part in enumerate(parts):
+        clusters.setdefault(root(i), []).append(part)
+    return [members[0] if len(members) == 1 else shapely.multipolygons(members) for members in clusters.values()]
+
+
+def _scattered_parts(geom, crs: str, cache: dict | None) -> list | None:
+    """Clusters of a widely scattered MultiPolygon, or None to extract it as one geometry."""
+    key = ("parts", crs)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    parts = None
+    if geom.geom_type == "MultiPolygon" and len(geom.geoms) > 1:
+        clusters = _cluster_parts(geom)
+        total = _bbox_area(geom.bounds)
+        if len(clusters) > 1 and total > 0:
+            share = sum(_bbox_area(c.bounds) for c in clusters) / total
+            if share <= SCATTER_MAX_BBOX_SHARE:
+                parts = clusters
+                logger.info("AOI split into %d separate windows (%.1f%% of its bounding box)", len(parts), share * 100)
+
+    if cache is not None:
+        cache[key] = parts
+    return parts
+
+
+def _finite(value) -> bool:
+    return value is not None and math.isfinite(float(value))
+
+
+def _merge_part_results(results: list[dict], ops: list[str], pixel_areas: list[float] | None = None) -> dict[str, Any]:
+    """Combine per-part exactextract outputs into what one extraction over all parts returns.
+
+    Means and class fractions are weighted by each part's ``count``.
+    ``pixel_areas`` gives the area of one pixel of each part's grid (in units of
+    the finest grid) when parts were read at different overview levels; each
+    part's ``count``, ``sum``, class weights and ``coverage`` are scaled by it
+    so a coarse pixel weighs as much as the fine pixels it stands for.
+    """
+    if pixel_areas is None:
+        pixel_areas = [1.0] * len(results)
+    counts = [float(r.get("count") or 0.0) * area for r, area in zip(results, pixel_areas)]
+    total = sum(counts)
+
+    class_weights: dict[Any, float] = {}
+    if _CLASS_OPS & set(ops):
+        for result, count in zip(results, counts):
+            for value, frac in zip(np.asarray(result.get("unique", [])).tolist(), np.asarray(result.get("frac", [])).tolist()):
+                class_weights[value] = class_weights.get(value, 0.0) + frac * count
+
+    merged: dict[str, Any] = {}
+    for op in ops:
+        if op == "count":
+            merged[op] = total
+        elif op == "sum":
+            merged[op] = sum(float(r[op]) * area for r, area in zip(results, pixel_areas) if _finite(r.get(op)))
+        elif op == "mean":
+            weighted = sum(float(r[op]) * c for r, c in zip(results, counts) if c > 0 and _finite(r.get(op)))
+            merged[op] = weighted / total if total > 0 else float("nan")
+        elif op in ("min", "max"):
+            values = [float(r[op]) for r in results if _finite(r.get(op))]
+            merged[op] = (min if op == "min" else max)(values) if values else None
+        elif op == "values":
+            merged[op] = np.concatenate([np.asarray(r.get(op, [])) for r in results]) if results else np.array([])
+        elif op == "coverage":
+            merged[op] = (
+                np.concatenate([np.asarray(r.get(op, []), dtype=float) * area for r, area in zip(results, pixel_areas)])
+                if results
+                else np.array([])
+            )
+        elif op == "unique":
+            merged[op] = np.asarray(list(class_weights))
+        elif op == "frac":
+            merged[op] = np.asarray([w / total for w in class_weights.values()]) if total > 0 else np.array([])
+        elif op == "variety":
+            merged[op] = len(class_weights)
+        elif op in ("majority", "minority"):
+            pick = max if op == "majority" else min
+            merged[op] = pick(class_weights, key=class_weights.get) if class_weights else None
+    return merged
+
+
+def _extract(path: str, geom, level: int | None, ops: list[str], histogram_edges: list[float] | None = None) -> dict[str, Any]:
+    """Extract ``ops`` for ``geom`` at overview ``level``, using the raster's block summary when it has one.
+
+    Cells of the summary lying entirely inside ``geom`` are aggregated from the
+    sidecar (``services.block_summary``); exactextract only weighs the pixels
+    of the remaining boundary strip, and the two results are merged.
+    """
+    summary = interior_summary(path, level, geom, ops, histogram_edges)
+    if summary is None:
+        return _extract_pixels(path, geom, level, ops)
+
+    interior, interior_result = summary
+    boundary = geom.difference(interior)
+    if boundary.is_empty:
+        return _merge_part_results([interior_result], ops)
+    part_ops = list(dict.fromkeys([*ops, "count", *(("unique", "frac") if _CLASS_OPS & set(ops) else ())]))
+    return _merge_part_results([_extract_pixels(path, boundary, level, part_ops), interior_result], ops)
+
+
+def _extract_pixels(path: str, geom, level: int | None, ops: list[str]) -> dict[str, Any]:
     open_kwargs: dict[str, Any] = {}
     if level is not None:
         open_kwargs["overview_level"] = level
@@ -80,14 +267,261 @@ def _run_exact_extract(path: str, geom_4326, ops: list[str]) -> dict[str, Any]:
     return results[0]["properties"]
 
 
-def _histogram(values: Any, weights: Any, n_bins: int = 10) -> list[dict]:
+def _run_exact_extract(
+    path: str,
+    geom_4326,
+    ops: list[str],
+    geometry_cache: dict | None = None,
+    histogram_edges: list[float] | None = None,
+) -> dict[str, Any]:
+    """Open a raster at its optimal overview level and run exactextract.
+
+    The geometry is provided in EPSG:4326 and reprojected to the raster's
+    native CRS (read from the file) before extraction, then simplified to the
+    effective pixel size of the chosen overview (``_simplify_for_grid``).
+    ``geometry_cache`` (one dict per analysis) shares both steps across layers.
+    ``histogram_edges`` (the layer's global histogram edges) lets a block
+    summary answer the ``values``/``coverage`` ops (see ``_extract``).
+
+    A widely scattered MultiPolygon (``_scattered_parts``) is extracted cluster
+    by cluster, each in its own window and at the overview level chosen from its
+    own area, and the results merged (``_merge_part_results``), so I/O follows
+    the area actually covered rather than the overall bounding box. Parts read
+    at different levels are weighted by their pixel area relative to the finest
+    part's grid, so ``count``, ``sum`` and ``coverage`` are in that grid's pixels.
+
+    Returns a flat dict of operation results keyed by op name.
+    """
+    with rasterio.open(path) as src:
+        native_crs = src.crs.to_string()
+        geom = _native_geometry(geom_4326, native_crs, geometry_cache)
+        parts = _scattered_parts(geom, native_crs, geometry_cache) if _MERGEABLE_OPS.issuperset(ops) else None
+        targets = parts or [geom]
+        levels = [_optimal_overview_level(src, target) for target in targets]
+        pixel_sizes = [_effective_pixel_size(src, level) for level in levels]
+        factors = [_overview_factor(src, level) for level in levels]
+
+    if parts is None:
+        geom = _grid_geometry(geom, native_crs, pixel_sizes[0], geometry_cache)
+        return _extract(path, geom, levels[0], ops, histogram_edges)
+
+    part_ops = list(dict.fromkeys([*ops, "count", *(("unique", "frac") if _CLASS_OPS & set(ops) else ())]))
+    results = [
+        _extract(path, _grid_geometry(part, native_crs, pixel_size, geometry_cache, index), level, part_ops, histogram_edges)
+        for index, (part, level, pixel_size) in enumerate(zip(parts, levels, pixel_sizes))
+    ]
+    finest = min(factors)
+    return _merge_part_results(results, ops, [(factor / finest) ** 2 for factor in factors])
+
+
+def _run_exact_extract_many(
+    path: str,
+    geoms_4326: list,
+    ops: list[str],
+    geometry_caches: list[dict],
+    histogram_edges: list[float] | None = None,
+) -> list[dict[str, Any]]:
+    """Run exactextract for several AOIs against one raster; results in input order.
+
+    AOIs are grouped by their optimal overview level and each group is passed to
+    exactextract as one feature collection, so the raster is opened once per
+    distinct level (typically once) instead of once per AOI. Each AOI keeps its
+    own reprojection/simplification cache (``geometry_caches[i]``). As in
+    ``_extract``, cells of a block summary lying inside an AOI are answered from
+    the sidecar and only the remaining boundary strip goes to exactextract.
+    """
+    with rasterio.open(path) as src:
+        native_crs = src.crs.to_string()
+        natives = [_native_geometry(g, native_crs, cache) for g, cache in zip(geoms_4326, geometry_caches)]
+        levels = [_optimal_overview_level(src, g) for g in natives]
+        pixel_sizes = [_effective_pixel_size(src, level) for level in levels]
+
+    grids = [_grid_geometry(g, native_crs, size, cache) for g, size, cache in zip(natives, pixel_sizes, geometry_caches)]
+    summaries = [interior_summary(path, level, g, ops, histogram_edges) for g, level in zip(grids, levels)]
+    extract_ops = ops
+    if any(summaries):
+        extract_ops = list(dict.fromkeys([*ops, "count", *(("unique", "frac") if _CLASS_OPS & set(ops) else ())]))
+
+    by_level: dict[int | None, list[int]] = {}
+    pending: dict[int, Any] = {}
+    for index, (grid, level, summary) in enumerate(zip(grids, levels, summaries)):
+        remainder = grid if summary is None else grid.difference(summary[0])
+        if not remainder.is_empty:
+            pending[index] = remainder
+            by_level.setdefault(level, []).append(index)
+
+    extracted: dict[int, dict[str, Any]] = {}
+    for level, indices in by_level.items():
+        features = [{"type": "Feature", "geometry": mapping(pending[i]), "properties": {}} for i in indices]
+        open_kwargs: dict[str, Any] = {"overview_level": level} if level is not None else {}
+        with rasterio.open(path, **open_kwargs) as src:
+            for i, feature in zip(indices, exact_extract(src, features, extract_ops)):
+                extracted[i] = feature.get("properties") or {}
+
+    results: list[dict[str, Any]] = []
+    for index, summary in enumerate(summaries):
+        if summary is None:
+            results.append(extracted.get(index, {}))
+        else:
+            parts = [extracted[index], summary[1]] if index in extracted else [summary[1]]
+            results.append(_merge_part_results(parts, ops))
+    return results
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental re-analysis
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Ops whose results can be rebuilt from additive per-layer components
+# (``_layer_components``); ``values``/``coverage`` only with fixed histogram edges.
+_ADDITIVE_OPS = frozenset({"count", "sum", "mean", "unique", "frac", "values", "coverage"})
+# Beyond this share of the new AOI's area, re-extracting the edited regions
+# costs about as much as a full run, which is then used instead.
+INCREMENTAL_MAX_CHANGE: float = 0.5
+# Class weights / histogram bins below this share of the AOI's pixel weight
+# are float residue of subtracting a removed region, not real coverage.
+_RESIDUE = 1e-9
+
+
+@dataclass
+class PreviousAnalysis:
+    """A stored analysis an edited AOI is computed against (see ``services.analysis_results``)."""
+
+    geometry: Any  # EPSG:4326
+    components: dict[str, dict]  # layer id → ``_layer_components`` of that analysis
+    geometry_cache: dict = field(default_factory=dict)
+
+
+def _is_additive(ops: list[str], edges: list[float] | None) -> bool:
+    return _ADDITIVE_OPS.issuperset(ops) and (edges is not None or not {"values", "coverage"} & set(ops))
+
+
+def _layer_components(result: dict, edges: list[float] | None) -> dict[str, Any]:
+    """Additive form of an extraction: pixel weight, weighted sum, weight per class and per histogram bin."""
+    count = float(result.get("count") or 0.0)
+    components: dict[str, Any] = {
+        "count": count,
+        "sum": float(result["sum"]) if _finite(result.get("sum")) else 0.0,
+        "classes": [
+            [value, frac * count]
+            for value, frac in zip(np.asarray(result.get("unique", [])).tolist(), np.asarray(result.get("frac", [])).tolist())
+        ],
+        "hist": None,
+    }
+    if edges is not None:
+        values = np.asarray(result.get("values", []), dtype=float)
+        weights = np.asarray(result.get("coverage", []), dtype=float)
+        mask = np.isfinite(values) & (weights > 0)
+        bins = np.asarray(edges, dtype=float)
+        clipped = np.clip(values[mask], bins[0], bins[-1])
+        components["hist"] = np.histogram(clipped, bins=bins, weights=weights[mask])[0].tolist()
+    return components
+
+
+def _combine_components(base: dict, delta: dict, sign: int) -> dict[str, Any]:
+    classes = dict((value, weight) for value, weight in base["classes"])
+    for value, weight in delta["classes"]:
+        classes[value] = classes.get(value, 0.0) + sign * weight
+    hist = base["hist"]
+    if hist is not None and delta["hist"] is not None:
+        hist = [a + sign * b for a, b in zip(hist, delta["hist"])]
+    return {
+        **base,
+        "count": base["count"] + sign * delta["count"],
+        "sum": base["sum"] + sign * delta["sum"],
+        "classes": [[value, weight] for value, weight in classes.items()],
+        "hist": hist,
+    }
+
+
+def _components_result(components: dict, edges: list[float] | None) -> dict[str, Any]:
+    """Rebuild exactextract's result shape for the additive ops from components."""
+    count = components["count"]
+    threshold = _RESIDUE * max(count, 1.0)
+    if count <= threshold:
+        count = 0.0
+    classes = [(value, weight) for value, weight in components["classes"] if weight > threshold]
+    result: dict[str, Any] = {
+        "count": count,
+        "sum": components["sum"],
+        "mean": components["sum"] / count if count > 0 else float("nan"),
+        "unique": np.asarray([value for value, _ in classes]),
+        "frac": np.asarray([weight / count for _, weight in classes]) if count > 0 else np.array([]),
+    }
+    if edges is not None and components["hist"] is not None:
+        bins = np.asarray(edges, dtype=float)
+        hist = np.asarray(components["hist"])
+        keep = hist > threshold
+        # Bin midpoints fall back into the same bins in ``_histogram``.
+        result["values"] = ((bins[:-1] + bins[1:]) / 2)[keep]
+        result["coverage"] = hist[keep]
+    return result
+
+
+def _run_layer_incremental(
+    path: str,
+    layer_id: str,
+    geom_4326,
+    ops: list[str],
+    geometry_cache: dict,
+    edges: list[float] | None,
+    previous: PreviousAnalysis | None,
+) -> tuple[dict[str, Any], dict | None]:
+    """Extract a layer and return ``(result, components)``; components are None when not additive.
+
+    With a ``previous`` analysis whose components for this layer were taken from
+    the same raster, edges and overview level, only the regions added to and
+    removed from the (grid-simplified) AOI are extracted and applied as deltas.
+    Exact coverage is additive, so this gives the numbers of a full run.
+    Layers with non-additive ops (``max``, ``majority``, ``variety``, histograms
+    without fixed edges) and scattered MultiPolygons always get a full run.
+    """
+    if not _is_additive(ops, edges):
+        return _run_exact_extract(path, geom_4326, ops, geometry_cache, edges), None
+
+    extract_ops = list(dict.fromkeys([*ops, "count", "sum", *(("unique", "frac") if _CLASS_OPS & set(ops) else ())]))
+    with rasterio.open(path) as src:
+        native_crs = src.crs.to_string()
+        geom = _native_geometry(geom_4326, native_crs, geometry_cache)
+        if _scattered_parts(geom, native_crs, geometry_cache) is not None:
+            return _run_exact_extract(path, geom_4326, ops, geometry_cache, edges), None
+        level = _optimal_overview_level(src, geom)
+        pixel_size = _effective_pixel_size(src, level)
+
+    grid_geom = _grid_geometry(geom, native_crs, pixel_size, geometry_cache)
+    base = previous.components.get(layer_id) if previous is not None else None
+    components = None
+    if base is not None and (base.get("path"), base.get("level"), base.get("edges")) == (path, level, edges):
+        old = _native_geometry(previous.geometry, native_crs, previous.geometry_cache)
+        old_grid = _grid_geometry(old, native_crs, pixel_size, previous.geometry_cache)
+        added, removed = grid_geom.difference(old_grid), old_grid.difference(grid_geom)
+        if added.area + removed.area <= INCREMENTAL_MAX_CHANGE * grid_geom.area:
+            components = {**base}
+            for region, sign in ((added, 1), (removed, -1)):
+                if not region.is_empty:
+                    delta = _layer_components(_extract(path, region, level, extract_ops, edges), edges)
+                    components = _combine_components(components, delta, sign)
+            logger.debug(
+                "Layer '%s' updated incrementally (+%.3g / -%.3g of %.3g)", layer_id, added.area, removed.area, grid_geom.area
+            )
+
+    if components is None:
+        result = _extract(path, grid_geom, level, extract_ops, edges)
+        return result, {**_layer_components(result, edges), "path": path, "level": level, "edges": edges}
+    return _components_result(components, edges), components
+
+
+def _histogram(values: Any, weights: Any, n_bins: int = 10, edges: list[float] | None = None) -> list[dict]:
     """Build a coverage-weighted histogram from pixel values.
 
     Parameters
     ----------
     values:  numpy array of pixel values (from exactextract 'values' op)
     weights: numpy array of coverage fractions (from exactextract 'coverage' op)
-    n_bins:  number of histogram bins
+    n_bins:  number of histogram bins (ignored when ``edges`` is given)
+    edges:   fixed bin edges, typically the layer's precomputed global histogram
+             edges (``Layer.stats``). Keeps bins comparable across AOIs; values
+             outside the global range are clamped into the first/last bin.
 
     Returns
     -------
@@ -102,13 +536,23 @@ def _histogram(values: Any, weights: Any, n_bins: int = 10) -> list[dict]:
     if arr.size == 0:
         return []
 
-    counts, edges = np.histogram(arr, bins=n_bins, weights=w)
+    bins: Any = n_bins
+    if edges:
+        bins = np.asarray(edges, dtype=float)
+        arr = np.clip(arr, bins[0], bins[-1])
+
+    counts, bin_edges = np.histogram(arr, bins=bins, weights=w)
     return [
-        {"x": round(float((edges[i] + edges[i + 1]) / 2), 1), "y": round(float(counts[i]), 2)}
-        for i in range(n_bins)
+        {"x": round(float((bin_edges[i] + bin_edges[i + 1]) / 2), 1), "y": round(float(counts[i]), 2)}
+        for i in range(len(counts))
     ]
 
 
+def _histogram_edges(layer) -> list[float] | None:
+    """The layer's precomputed global histogram bin edges (``Layer.stats``), if any."""
+    return ((layer.stats or {}).get("histogram") or {}).get("edges")
+
+
 def _build_frac_dict(result: dict) -> dict[float, float]:
     """Build {pixel_value: coverage_fraction} from exactextract ``unique`` + ``frac`` arrays."""
     unique = np.asarray(result.get("unique", [])).tolist()
@@ -190,16 +634,24 @@ def _compute_stat(
 # Generic widget builder
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _build_chart(layer_id: str, chart_cfg: dict, result: dict, stats: dict[str, float | str]) -> list:
+def _build_chart(
+    layer_id: str,
+    chart_cfg: dict,
+    result: dict,
+    stats: dict[str, float | str],
+    layer: Any = None,
+) -> list:
     """Build a chart payload for one layer based on its chart config.
 
     ``histogram``: coverage-weighted histogram of pixel values (returns ``HistogramPoint[]``).
+        Uses the layer's precomputed global bin edges when ``Layer.stats`` is populated.
     ``categorical``: donut/pie slices sourced from already-computed stats (returns ``CategoricalDataPoint[]``).
     """
     chart_type = chart_cfg["type"]
 
     if chart_type == "histogram":
-        return _histogram(result.get("values", []), result.get("coverage", []))
+        edges = _histogram_edges(layer) if layer is not None else None
+        return _histogram(result.get("values", []), result.get("coverage", []), edges=edges)
 
     if chart_type == "categorical":
         return [
@@ -240,6 +692,7 @@ def _build_widget(
     dataset:           ORM Dataset (with ``layers`` eager-loaded) referenced by the widget
     layers_by_id:      flat ``{layer_id: Layer}`` lookup across all datasets; used to
                        resolve the widget's display unit when ``unit_layer`` is set
+                       and the precomputed histogram edges of chart layers
     polygon_area_km2:  polygon area in km² (EPSG:6933), needed by ``frac_area`` stats
 
     Returns
@@ -258,7 +711,7 @@ def _build_widget(
 
         chart_cfg = layer_cfg.get("chart")
         if chart_cfg:
-            chart[layer_id] = _build_chart(layer_id, chart_cfg, result, stats)
+            chart[layer_id] = _build_chart(layer_id, chart_cfg, result, stats, layers_by_id.get(layer_id))
 
     # Widget-level chart aggregates across layers (e.g. time_series). Keyed by the
     # synthetic ``key`` declared in the chart config — this key is NOT a Layer.id.
@@ -282,7 +735,14 @@ def _build_widget(
 # Public entry point
 # ─────────────────────────────────────────────────────────────────────────────
 
-def compute_zonal_stats(geom_4326, datasets, bucket: str, polygon_area_km2: float) -> dict:
+def compute_zonal_stats(
+    geom_4326,
+    datasets,
+    bucket: str,
+    polygon_area_km2: float,
+    previous: PreviousAnalysis | None = None,
+    components: dict[str, dict] | None = None,
+) -> dict:
     """Compute all widget statistics for a validated polygon.
 
     Parameters
@@ -292,6 +752,11 @@ def compute_zonal_stats(geom_4326, datasets, bucket: str, polygon_area_km2: floa
     bucket:            S3 bucket name used to resolve full raster URIs
     polygon_area_km2:  Polygon area in km² (EPSG:6933, returned by validate_geometry).
                        Used by ``frac_area`` stats to convert coverage fractions to areas.
+    previous:          Earlier analysis of a similar AOI; additive layers are then only
+                       extracted over the edited regions (``_run_layer_incremental``).
+    components:        When given (or with ``previous``), filled with the additive
+                       components of every layer that has them, to be stored as the
+                       ``previous`` of a later edit.
 
     Returns
     -------
@@ -299,6 +764,7 @@ def compute_zonal_stats(geom_4326, datasets, bucket: str, polygon_area_km2: floa
     """
     datasets_by_id = {ds.id: ds for ds in datasets}
     layers_by_id = {layer.id: layer for ds in datasets for layer in ds.layers}
+    geometry_cache: dict = {}
 
     results: dict[str, dict] = {}
     for widget_id, widget_cfg in WIDGET_CONFIG.items():
@@ -317,10 +783,60 @@ def compute_zonal_stats(geom_4326, datasets, bucket: str, polygon_area_km2: floa
                 logger.warning("Layer '%s' not found in DB — skipping widget '%s'", layer_id, widget_id)
                 continue
 
-            uri = _s3_uri(layer.path, bucket)
+            uri = s3_uri(layer.path, bucket)
             logger.info("Processing layer '%s' for widget '%s'", layer_id, widget_id)
-            layer_results[layer_id] = _run_exact_extract(uri, geom_4326, layer_cfg["ops"])
+            if components is None and previous is None:
+                layer_results[layer_id] = _run_exact_extract(
+                    uri, geom_4326, layer_cfg["ops"], geometry_cache, _histogram_edges(layer)
+                )
+                continue
+            layer_results[layer_id], layer_components = _run_layer_incremental(
+                uri, layer_id, geom_4326, layer_cfg["ops"], geometry_cache, _histogram_edges(layer), previous
+            )
+            if components is not None and layer_components is not None:
+                components[layer_id] = layer_components
 
         results[widget_id] = _build_widget(widget_id, layer_results, dataset, layers_by_id, polygon_area_km2)
 
     return results
+
+
+def compute_zonal_stats_many(geoms_4326: list, datasets, bucket: str, polygon_areas_km2: list[float]) -> list[dict]:
+    """Compute all widget statistics for several validated polygons in one raster-sequential pass.
+
+    Same output per polygon as ``compute_zonal_stats``, but every raster is
+    opened once for all polygons (``_run_exact_extract_many``) rather than once
+    per polygon. Scattered MultiPolygons are not split into parts here, so
+    geometries that need it (a FeatureCollection's union) go through ``compute_zonal_stats``.
+    """
+    datasets_by_id = {ds.id: ds for ds in datasets}
+    layers_by_id = {layer.id: layer for ds in datasets for layer in ds.layers}
+    geometry_caches: list[dict] = [{} for _ in geoms_4326]
+
+    results: list[dict[str, dict]] = [{} for _ in geoms_4326]
+    for widget_id, widget_cfg in WIDGET_CONFIG.items():
+        dataset = datasets_by_id.get(widget_cfg["dataset_id"])
+        if dataset is None:
+            logger.warning(
+                "Dataset id=%s not found in DB — skipping widget '%s'",
+                widget_cfg["dataset_id"], widget_id,
+            )
+            continue
+
+        layer_results: list[dict[str, dict]] = [{} for _ in geoms_4326]
+        for layer_id, layer_cfg in widget_cfg["layers"].items():
+            layer = layers_by_id.get(layer_id)
+            if layer is None:
+                logger.warning("Layer '%s' not found in DB — skipping widget '%s'", layer_id, widget_id)
+                continue
+
+            uri = s3_uri(layer.path, bucket)
+            logger.info("Processing layer '%s' for widget '%s' (%d AOIs)", layer_id, widget_id, len(geoms_4326))
+            extracted = _run_exact_extract_many(uri, geoms_4326, layer_cfg["ops"], geometry_caches, _histogram_edges(layer))
+            for i, result in enumerate(extracted):
+                layer_results[i][layer_id] = result
+
+        for i, area_km2 in enumerate(polygon_areas_km2):
+            results[i][widget_id] = _build_widget(widget_id, layer_results[i], dataset, layers_by_id, area_km2)
+
+    return results
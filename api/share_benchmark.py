@@ -0,0 +1,98 @@
+"""Standalone CLI benchmark of the shared-analysis storage encodings: row size and read time.
+
+Usage:
+    cd api
+    uv run python share_benchmark.py
+    uv run python share_benchmark.py --vertices 5 1000 10000 --reads 200 --share-id <uuid>
+
+Takes the analysis of an existing share (``--share-id``, default: the most
+recent one) and, for circular AOIs of each vertex count, stores it both ways —
+plain-JSON ``analysis``/``geojson`` columns and the compact
+``payload``/``geometry`` columns of ``services.share_codec`` — then logs the
+row size (``pg_column_size``, i.e. after Postgres' TOAST compression) and the
+mean time of ``get_shared`` plus response serialization over ``--reads`` reads.
+Everything is rolled back afterwards. Uses the configured database; seed the
+catalog and share one analysis first.
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import UUID
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from shapely.geometry import mapping, shape
+from sqlalchemy import select, text
+
+from db.database import SessionLocal
+from logging_config import setup_logging
+from models import AnalysisResult, Category, Dataset, Layer, SharedAnalysis  # noqa: F401
+from services.share_codec import encode_geometry, encode_payload
+from services.shared_analysis import get_shared
+
+setup_logging("INFO")
+logger = logging.getLogger(__name__)
+
+_ROW_SIZE_SQL = text("SELECT pg_column_size(s.*) FROM shared_analyses s WHERE s.id = :id")
+
+
+def _read_ms(session, share_id: UUID, reads: int) -> float:
+    timings = []
+    for _ in range(reads):
+        session.expunge_all()  # fetch the row again on every read
+        start = time.perf_counter()
+        get_shared(session, share_id).model_dump_json()
+        timings.append(time.perf_counter() - start)
+    return 1000 * statistics.mean(timings)
+
+
+def _centroid(geojson: dict):
+    geometry = geojson["geometry"] if geojson.get("type") == "Feature" else geojson["features"][0]["geometry"]
+    return shape(geometry).centroid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row size and read time of the shared-analysis encodings")
+    parser.add_argument("--vertices", type=int, nargs="+", default=[5, 1000, 10000], help="AOI vertex counts")
+    parser.add_argument("--reads", type=int, default=200, help="Reads averaged per row (default: 200)")
+    parser.add_argument("--share-id", type=UUID, help="Share whose analysis is stored (default: the most recent)")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        share_id = args.share_id or session.scalar(
+            select(SharedAnalysis.id).order_by(SharedAnalysis.created_at.desc()).limit(1)
+        )
+        if share_id is None:
+            logger.error("No shared analysis to copy; share one first")
+            sys.exit(1)
+        source = get_shared(session, share_id).model_dump(mode="json")
+        analysis = source["analysis"]
+        centroid = _centroid(source["geojson"])
+
+        logger.info("AOI vertices   row size (JSON → compact)   read (JSON → compact)")
+        for vertices in args.vertices:
+            aoi = centroid.buffer(0.05, quad_segs=max(1, vertices // 4))
+            feature = {"type": "Feature", "geometry": mapping(aoi), "properties": {}}
+            rows = [
+                SharedAnalysis(analysis=analysis, geojson=feature),
+                SharedAnalysis(payload=encode_payload(analysis), geometry=encode_geometry(aoi)),
+            ]
+            session.add_all(rows)
+            session.flush()
+            sizes = [session.scalar(_ROW_SIZE_SQL, {"id": row.id}) / 1000 for row in rows]
+            times = [_read_ms(session, row.id, args.reads) for row in rows]
+            logger.info(
+                "%-14d %7.1f kB → %5.1f kB %14.1f ms → %5.1f ms", vertices, sizes[0], sizes[1], times[0], times[1]
+            )
+    finally:
+        session.rollback()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,7 @@ from config import get_settings
 from db.base import Base
 from db.database import get_db
 from main import app
-from models import Category, Dataset, Layer, SharedAnalysis  # noqa: F401  # Register with Base metadata
+from models import AnalysisResult, CatalogVersion, Category, Dataset, JobRun, Layer, ReportingUnitStats, SharedAnalysis  # noqa: F401  # Register with Base metadata
 
 settings = get_settings()
 
@@ -480,7 +480,7 @@ def analysis_client(db_session, tmp_path, monkeypatch):
 
     Creates five GeoTIFFs with uniform, known pixel values in EPSG:4326 covering
     the standard test polygon area, inserts three Datasets (with explicit IDs 1/2/3
-    matching WIDGET_CONFIG) and matching Layer records, and patches _s3_uri so
+    matching WIDGET_CONFIG) and matching Layer records, and patches s3_uri so
     rasterio opens the local files directly instead of reaching out to S3.
 
     Dataset → layer wiring:
@@ -513,6 +513,10 @@ def analysis_client(db_session, tmp_path, monkeypatch):
     import rasterio
     from rasterio.transform import from_bounds
 
+    import services.export
+    import services.layer_stats
+    import services.point_query
+    import services.tile_stack
     import services.zonal_stats
 
     # Extent covers the test polygon (-84.5→-83.5 lon, 56.5→57.5 lat) with buffer.
@@ -707,7 +711,11 @@ def analysis_client(db_session, tmp_path, monkeypatch):
     db_session.flush()
 
     # Return the local path as-is so rasterio opens it directly.
-    monkeypatch.setattr(services.zonal_stats, "_s3_uri", lambda db_path, bucket: db_path)
+    monkeypatch.setattr(services.zonal_stats, "s3_uri", lambda db_path, bucket: db_path)
+    monkeypatch.setattr(services.point_query, "s3_uri", lambda db_path, bucket: db_path)
+    monkeypatch.setattr(services.layer_stats, "s3_uri", lambda db_path, bucket: db_path)
+    monkeypatch.setattr(services.export, "s3_uri", lambda db_path, bucket: db_path)
+    monkeypatch.setattr(services.tile_stack, "s3_uri", lambda db_path, bucket: db_path)
 
     def override_get_db():
         yield db_session
@@ -320,6 +320,90 @@ def test_feature_collection_with_non_polygon_feature_returns_422(client):
     assert response.status_code == 422
 
 
+# =============================================================================
+# Fast GeoJSON parsing path (services.geojson)
+# =============================================================================
+
+
+def _schema_errors(data):
+    from pydantic import TypeAdapter, ValidationError
+
+    from schemas.analysis import AnalysisInput
+
+    with pytest.raises(ValidationError) as exc_info:
+        TypeAdapter(AnalysisInput).validate_python(data)
+    return [{**err, "loc": ("body", *err["loc"])} for err in exc_info.value.errors(include_url=False)]
+
+
+@pytest.mark.parametrize("data", [
+    {"type": "Foo"},
+    {},
+    [],
+    {"type": "FeatureCollection", "features": []},
+    {"type": "Feature", "geometry": None},
+    {"type": "Feature", "geometry": {"type": "Point", "coordinates": [0, 0]}},
+    {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [[[0, "a"], [1, 1], [1, 0], [0, 0]]]}},
+    {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [[[0, None], [1, 1], [1, 0], [0, 0]]]}},
+    {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [[[0, 0], [1, 1], [1, 0], [0, 0]]]}, "properties": [1]},
+    {"type": "FeatureCollection", "features": [{"type": "Feature", "geometry": {"type": "LineString", "coordinates": []}}]},
+])
+def test_fast_parse_reports_schema_errors(data):
+    import json
+
+    from fastapi.exceptions import RequestValidationError
+
+    from services.geojson import parse_analysis_body
+
+    with pytest.raises(RequestValidationError) as exc_info:
+        parse_analysis_body(json.dumps(data).encode(), "application/json")
+    assert exc_info.value.errors() == _schema_errors(data)
+
+
+def test_fast_parse_invalid_json_matches_fastapi(client):
+    response = client.post("/analysis/", content=b'{"type":"Feature",', headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    error = response.json()["errors"][0]
+    assert error["type"] == "json_invalid"
+    assert error["loc"] == ["body", 18]
+    assert error["msg"] == "JSON decode error"
+
+
+@pytest.mark.parametrize("vertices", [16, 1_000, 20_000])
+def test_fast_parse_matches_schema_geometry(vertices):
+    import json
+
+    from pydantic import TypeAdapter
+    from shapely.geometry import MultiPolygon, Point, mapping
+
+    from schemas.analysis import AnalysisInput
+    from services.geojson import extract_geometry, parse_analysis_body
+
+    outer = Point(-84.0, 57.0).buffer(0.5, quad_segs=vertices // 4)
+    holed = outer.difference(Point(-84.0, 57.0).buffer(0.1))
+    body = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": mapping(holed), "properties": {}},
+            {"type": "Feature", "geometry": mapping(MultiPolygon([Point(-80.0, 55.0).buffer(0.2)])), "properties": None},
+        ],
+    }
+    raw = json.dumps(body).encode()
+
+    parsed = parse_analysis_body(raw, "application/json")
+    expected = extract_geometry(TypeAdapter(AnalysisInput).validate_json(raw))
+    assert parsed.type == "FeatureCollection"
+    assert parsed.geometry.equals_exact(expected, tolerance=0)
+
+
+def test_fast_parse_falls_back_for_coercible_coordinates():
+    """Numeric strings are accepted by the schema, so the fallback must accept them too."""
+    from services.geojson import parse_analysis_body
+
+    body = b'{"type":"Feature","geometry":{"type":"Polygon","coordinates":[[["0","0"],[1,0],[1,1],[0,1],[0,0]]]}}'
+    parsed = parse_analysis_body(body, "application/json")
+    assert parsed.geometry.area == pytest.approx(1.0)
+
+
 # =============================================================================
 # Semantic validation failures (service pipeline → HTTPException 422)
 # =============================================================================
@@ -373,7 +457,7 @@ def test_polygon_outside_hbl_bounds_error_mentions_hudson_bay(client):
 #       peat_cog:   all pixels = 200.0 cm
 #       carbon_cog: all pixels = 80.0 kg/m²
 #   - Inserts matching Layer records (id=peat_cog / carbon_cog) into the DB
-#   - Patches _s3_uri so rasterio opens local files instead of S3
+#   - Patches s3_uri so rasterio opens local files instead of S3
 # =============================================================================
 
 
@@ -1222,3 +1306,299 @@ def test_polygon_outside_raster_produces_finite_numeric_stats(analysis_client):
         for name, value in widget["stats"].items():
             if isinstance(value, (int, float)):
                 assert math.isfinite(value), f"{name} = {value!r} is not finite"
+
+
+# =============================================================================
+# Resolution-aware simplification before extraction
+# =============================================================================
+
+
+def _detailed_circle_feature(quad_segs: int = 2000) -> dict:
+    from shapely.geometry import Point, mapping
+
+    return {"type": "Feature", "geometry": mapping(Point(-84.0, 57.0).buffer(0.3, quad_segs=quad_segs)), "properties": {}}
+
+
+def test_simplify_for_grid_reduces_vertices_within_area_bound():
+    import shapely
+    from shapely.geometry import Point
+
+    from services.zonal_stats import SIMPLIFY_MAX_AREA_DELTA, _simplify_for_grid
+
+    geom = Point(0, 0).buffer(10_000, quad_segs=4000)  # metres, 16k vertices
+    simplified, area_delta = _simplify_for_grid(geom, pixel_size=30.0)
+    assert shapely.get_num_coordinates(simplified) < shapely.get_num_coordinates(geom) / 10
+    assert simplified.is_valid
+    assert 0 < abs(area_delta) <= SIMPLIFY_MAX_AREA_DELTA
+
+
+def test_simplify_for_grid_leaves_small_geometries_alone():
+    from shapely.geometry import box
+
+    from services.zonal_stats import _simplify_for_grid
+
+    geom = box(0, 0, 1000, 1000)
+    assert _simplify_for_grid(geom, pixel_size=30.0) == (geom, 0.0)
+
+
+def test_simplify_for_grid_discards_result_beyond_area_bound(monkeypatch):
+    from shapely.geometry import Point
+
+    import services.zonal_stats
+    from services.zonal_stats import _simplify_for_grid
+
+    monkeypatch.setattr(services.zonal_stats, "SIMPLIFY_MAX_AREA_DELTA", 0.0)
+    geom = Point(0, 0).buffer(10_000, quad_segs=4000)
+    assert _simplify_for_grid(geom, pixel_size=30.0) == (geom, 0.0)
+
+
+def test_simplified_extraction_matches_full_geometry(analysis_client, monkeypatch):
+    """Stats from the simplified AOI stay within the documented area tolerance of the full AOI."""
+    import services.zonal_stats
+    from services.zonal_stats import SIMPLIFY_MAX_AREA_DELTA
+
+    feature = _detailed_circle_feature()
+    simplified = analysis_client.post("/analysis/v2", json=feature).json()
+    monkeypatch.setattr(services.zonal_stats, "SIMPLIFY_MIN_VERTICES", 10**9)
+    full = analysis_client.post("/analysis/v2", json=feature).json()
+
+    for widget_id, widget in full.items():
+        if widget_id == "aoi_size":
+            continue
+        for name, value in widget["stats"].items():
+            if isinstance(value, (int, float)):
+                assert simplified[widget_id]["stats"][name] == pytest.approx(
+                    value, rel=2 * SIMPLIFY_MAX_AREA_DELTA, abs=0.011
+                ), f"{widget_id}.{name}"
+
+
+def test_simplified_geometry_is_shared_across_layers(analysis_client, monkeypatch):
+    import services.zonal_stats
+
+    calls = []
+    original = services.zonal_stats._simplify_for_grid
+    monkeypatch.setattr(
+        services.zonal_stats, "_simplify_for_grid", lambda geom, px: calls.append(px) or original(geom, px)
+    )
+    response = analysis_client.post("/analysis/v2", json=_detailed_circle_feature())
+    assert response.status_code == 200
+    # Every fixture raster shares one CRS and resolution, so one simplification serves all layers.
+    assert len(calls) == 1
+
+
+# =============================================================================
+# Per-part extraction for scattered MultiPolygons
+# =============================================================================
+
+# Two ~280 km² squares in opposite corners of the fixture rasters: their bounding
+# boxes cover ~2.5% of the MultiPolygon's overall bounding box.
+SCATTERED_MULTIPOLYGON_FEATURE = {
+    "type": "Feature",
+    "geometry": {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [[[-84.9, 56.1], [-84.7, 56.1], [-84.7, 56.3], [-84.9, 56.3], [-84.9, 56.1]]],
+            [[[-83.3, 57.7], [-83.1, 57.7], [-83.1, 57.9], [-83.3, 57.9], [-83.3, 57.7]]],
+        ],
+    },
+    "properties": {},
+}
+
+
+def test_scattered_parts_detects_separated_clusters():
+    from shapely.geometry import MultiPolygon, box
+
+    from services.zonal_stats import _scattered_parts
+
+    scattered = MultiPolygon([box(0, 0, 1, 1), box(1, 1, 2, 2), box(100, 100, 101, 101)])
+    parts = _scattered_parts(scattered, "EPSG:3978", None)
+    assert parts is not None and len(parts) == 2
+    assert sorted(p.area for p in parts) == [1.0, 2.0]  # the two touching boxes form one cluster
+
+    adjacent = MultiPolygon([box(0, 0, 1, 1), box(2, 0, 3, 1)])
+    assert _scattered_parts(adjacent, "EPSG:3978", None) is None
+
+
+def test_merge_part_results_weights_by_count():
+    import numpy as np
+
+    from services.zonal_stats import _merge_part_results
+
+    results = [
+        {"count": 3.0, "mean": 10.0, "sum": 30.0, "max": 12.0, "unique": np.array([1, 2]), "frac": np.array([2 / 3, 1 / 3])},
+        {"count": 1.0, "mean": 2.0, "sum": 2.0, "max": 2.0, "unique": np.array([2]), "frac": np.array([1.0])},
+        {"count": 0.0, "mean": float("nan"), "sum": 0.0, "max": None, "unique": np.array([]), "frac": np.array([])},
+    ]
+    merged = _merge_part_results(results, ["mean", "sum", "max", "unique", "frac", "majority", "variety"])
+    assert merged["mean"] == pytest.approx(8.0)
+    assert merged["sum"] == pytest.approx(32.0)
+    assert merged["max"] == 12.0
+    assert dict(zip(merged["unique"].tolist(), merged["frac"].tolist())) == pytest.approx({1: 0.5, 2: 0.5})
+    assert merged["variety"] == 2
+    assert merged["majority"] in (1, 2)
+
+
+def test_scattered_parts_at_different_overview_levels_are_weighted_by_pixel_area(tmp_path, monkeypatch):
+    import numpy as np
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.transform import from_origin
+    from shapely.geometry import MultiPolygon, box
+
+    import services.zonal_stats
+    from services.zonal_stats import _run_exact_extract
+
+    # 2048×2048 px of 0.001°: value 1 in the west half, 3 in the east half, with 2× and 4× overviews.
+    path = str(tmp_path / "halves.tif")
+    data = np.ones((1, 2048, 2048), dtype="uint8")
+    data[0, :, 1024:] = 3
+    profile = {
+        "driver": "GTiff", "dtype": "uint8", "width": 2048, "height": 2048, "count": 1, "crs": "EPSG:4326",
+        "transform": from_origin(-85.0, 58.0, 0.001, 0.001), "tiled": True, "blockxsize": 256, "blockysize": 256,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+        dst.build_overviews([2, 4], Resampling.nearest)
+
+    # 50×50 px in the west half (read at native) and 400×400 px in the east half (read at the 2× overview).
+    geom = MultiPolygon([box(-84.998, 57.948, -84.948, 57.998), box(-83.400, 56.100, -83.000, 56.500)])
+    ops = ["count", "sum", "mean", "unique", "frac"]
+    split = _run_exact_extract(path, geom, ops)
+
+    monkeypatch.setattr(services.zonal_stats, "SCATTER_MAX_BBOX_SHARE", 0.0)
+    monkeypatch.setattr(services.zonal_stats, "_optimal_overview_level", lambda src, g: None)
+    native = _run_exact_extract(path, geom, ops)
+
+    assert native["count"] == pytest.approx(2_500 + 160_000, rel=1e-3)
+    for op in ("count", "sum", "mean"):
+        assert float(split[op]) == pytest.approx(float(native[op]), rel=1e-3), op
+    assert dict(zip(split["unique"].tolist(), split["frac"].tolist())) == pytest.approx(
+        dict(zip(np.asarray(native["unique"]).tolist(), np.asarray(native["frac"]).tolist())), rel=1e-3
+    )
+
+
+def test_scattered_extraction_matches_single_window(analysis_client, monkeypatch):
+    import services.zonal_stats
+
+    split = analysis_client.post("/analysis/v2", json=SCATTERED_MULTIPOLYGON_FEATURE)
+    assert split.status_code == 200
+    monkeypatch.setattr(services.zonal_stats, "SCATTER_MAX_BBOX_SHARE", 0.0)
+    whole = analysis_client.post("/analysis/v2", json=SCATTERED_MULTIPOLYGON_FEATURE).json()
+
+    split = split.json()
+    for widget_id, widget in whole.items():
+        if widget_id == "aoi_size":
+            continue
+        for name, value in widget["stats"].items():
+            if isinstance(value, (int, float)):
+                assert split[widget_id]["stats"][name] == pytest.approx(value, abs=0.011), f"{widget_id}.{name}"
+            else:
+                assert split[widget_id]["stats"][name] == value, f"{widget_id}.{name}"
+
+
+# =============================================================================
+# Per-feature analysis (POST /analysis/v2/features)
+# =============================================================================
+
+def _site(minx: float, miny: float, site_id) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[minx, miny], [minx + 0.3, miny], [minx + 0.3, miny + 0.3], [minx, miny + 0.3], [minx, miny]]],
+        },
+        "properties": {"site": site_id},
+    }
+
+
+CANDIDATE_SITES = {
+    "type": "FeatureCollection",
+    "features": [_site(-84.9, 56.1, "north"), _site(-83.5, 57.5, "south"), _site(-84.2, 56.8, "east")],
+}
+
+
+def test_feature_analysis_keyed_by_index(analysis_client):
+    response = analysis_client.post("/analysis/v2/features", json=CANDIDATE_SITES)
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data["features"]) == ["0", "1", "2"]
+    assert set(data["union"]) == set(data["features"]["0"])
+
+
+def test_feature_analysis_keyed_by_id_property(analysis_client):
+    response = analysis_client.post("/analysis/v2/features", params={"id_property": "site"}, json=CANDIDATE_SITES)
+    assert response.status_code == 200
+    assert list(response.json()["features"]) == ["north", "south", "east"]
+
+
+def test_feature_analysis_matches_single_feature_analysis(analysis_client):
+    data = analysis_client.post("/analysis/v2/features", json=CANDIDATE_SITES).json()
+    for index, feature in enumerate(CANDIDATE_SITES["features"]):
+        single = analysis_client.post("/analysis/v2", json=feature).json()
+        assert data["features"][str(index)] == single
+    assert data["union"] == analysis_client.post("/analysis/v2", json=CANDIDATE_SITES).json()
+
+
+def test_feature_analysis_opens_each_raster_once_per_level(analysis_client, monkeypatch):
+    import services.zonal_stats
+
+    calls = []
+    original = services.zonal_stats.exact_extract
+    monkeypatch.setattr(
+        services.zonal_stats, "exact_extract", lambda src, vec, ops: calls.append(vec) or original(src, vec, ops)
+    )
+    response = analysis_client.post("/analysis/v2/features", json=CANDIDATE_SITES)
+    assert response.status_code == 200
+    # The fixture rasters have no overviews: one call per layer carries all three sites
+    # (the union is extracted on its own, as in POST /analysis/v2).
+    batched = [vec for vec in calls if isinstance(vec, list)]
+    assert batched and all(len(vec) == 3 for vec in batched)
+
+
+def test_feature_analysis_union_of_scattered_sites_matches_analysis(analysis_client, monkeypatch):
+    import services.zonal_stats
+
+    windows = []
+    original = services.zonal_stats.exact_extract
+    monkeypatch.setattr(
+        services.zonal_stats,
+        "exact_extract",
+        lambda src, vec, ops: windows.extend(vec if isinstance(vec, list) else [vec]) or original(src, vec, ops),
+    )
+    sites = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": polygon}, "properties": {}}
+            for polygon in SCATTERED_MULTIPOLYGON_FEATURE["geometry"]["coordinates"]
+        ],
+    }
+    union = analysis_client.post("/analysis/v2/features", json=sites).json()["union"]
+    # Every read covers one site's window, never the bounding box of both.
+    assert windows and all(vec["geometry"]["type"] == "Polygon" for vec in windows)
+    assert union == analysis_client.post("/analysis/v2", json=SCATTERED_MULTIPOLYGON_FEATURE).json()
+
+
+def test_feature_analysis_rejects_invalid_feature(client):
+    body = {"type": "FeatureCollection", "features": [_site(-84.9, 56.1, "a"), TOO_SMALL_POLYGON_FEATURE]}
+    response = client.post("/analysis/v2/features", json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("Feature 1 ('1'): ")
+
+
+def test_feature_analysis_rejects_missing_or_duplicate_ids(client):
+    missing = client.post("/analysis/v2/features", params={"id_property": "name"}, json=CANDIDATE_SITES)
+    assert missing.status_code == 422
+    assert "no 'name' property" in missing.json()["detail"]
+
+    twice = {"type": "FeatureCollection", "features": [_site(-84.9, 56.1, "a"), _site(-83.5, 57.5, "a")]}
+    duplicate = client.post("/analysis/v2/features", params={"id_property": "site"}, json=twice)
+    assert duplicate.status_code == 422
+    assert "Duplicate feature id 'a'" in duplicate.json()["detail"]
+
+
+def test_feature_analysis_rejects_too_many_features(client):
+    from services.analysis import MAX_ANALYSIS_FEATURES
+
+    body = {"type": "FeatureCollection", "features": [_site(-84.9, 56.1, i) for i in range(MAX_ANALYSIS_FEATURES + 1)]}
+    response = client.post("/analysis/v2/features", json=body)
+    assert response.status_code == 422
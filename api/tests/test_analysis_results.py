@@ -0,0 +1,173 @@
+"""Tests for stored analysis results and incremental re-analysis (POST /analysis/v2?previous=)."""
+
+import math
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import box
+
+import services.zonal_stats
+from models import AnalysisResult, Layer
+from services.analysis_results import ANALYSIS_RESULT_TTL_HOURS, delete_expired_results, load_previous
+from services.share_codec import strip_catalog
+
+ANALYSIS_URL = "/analysis/v2"
+
+HISTOGRAM_EDGES = [float(e) for e in np.linspace(0, 400, 11)]
+
+
+def _feature(minx: float, miny: float, maxx: float, maxy: float) -> dict:
+    return {"type": "Feature", "geometry": box(minx, miny, maxx, maxy).__geo_interface__, "properties": {}}
+
+
+ORIGINAL = _feature(-84.5, 56.5, -83.5, 57.5)
+# Edge moved east off the pixel grid (added strip) and south edge pulled in (removed strip).
+EDITED = _feature(-84.5, 56.6, -83.3, 57.5)
+
+
+def _assert_close(actual, expected, path="$"):
+    if isinstance(expected, dict):
+        assert set(actual) == set(expected), path
+        for key in expected:
+            _assert_close(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            _assert_close(a, e, f"{path}[{i}]")
+    elif isinstance(expected, float) and not isinstance(actual, str):
+        assert actual == pytest.approx(expected, rel=1e-6, abs=1e-6) or (math.isnan(actual) and math.isnan(expected)), path
+    else:
+        assert actual == expected, path
+
+
+def _with_histogram_edges(db_session) -> None:
+    for layer_id in ("peat_cog", "carbon_cog"):
+        db_session.get(Layer, layer_id).stats = {"histogram": {"edges": HISTOGRAM_EDGES, "counts": [0] * 10}}
+    db_session.flush()
+
+
+def test_analysis_returns_and_stores_result_id(analysis_client, db_session):
+    response = analysis_client.post(ANALYSIS_URL, json=ORIGINAL)
+    assert response.status_code == 200
+
+    row = db_session.get(AnalysisResult, UUID(response.headers["X-Analysis-Result-Id"]))
+    assert row.analysis == strip_catalog(response.json())
+    assert row.analysis["peat_carbon"]["dataset_id"] == response.json()["peat_carbon"]["dataset"]["id"]
+    assert shapely.from_wkb(row.geometry).equals(box(-84.5, 56.5, -83.5, 57.5))
+    # Additive layers keep components; peat (max) and ecosystem (majority/variety) do not.
+    assert "treed_area_1984-2022_cog" in row.components
+    assert "peat_cog" not in row.components
+    assert "ecosystem_classification_cog" not in row.components
+
+
+def test_result_id_is_exposed_to_cross_origin_clients(analysis_client):
+    response = analysis_client.post(ANALYSIS_URL, json=ORIGINAL, headers={"Origin": "https://example.com"})
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert "x-analysis-result-id" in exposed
+
+
+def test_analysis_is_returned_when_storing_the_result_fails(analysis_client, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    import routers.analysis
+
+    def fail(*args):
+        raise OperationalError("INSERT INTO analysis_results", {}, Exception("disk full"))
+
+    monkeypatch.setattr(routers.analysis, "store_result", fail)
+    response = analysis_client.post(ANALYSIS_URL, json=ORIGINAL)
+    assert response.status_code == 200
+    assert "peat_carbon" in response.json()
+    assert "x-analysis-result-id" not in response.headers
+    assert response.headers["x-analysis-result-token"]
+
+
+@pytest.mark.parametrize("edges", [False, True], ids=["no_edges", "histogram_edges"])
+def test_incremental_analysis_matches_full_run(analysis_client, db_session, edges):
+    if edges:
+        _with_histogram_edges(db_session)
+    expected = analysis_client.post(ANALYSIS_URL, json=EDITED).json()
+
+    result_id = analysis_client.post(ANALYSIS_URL, json=ORIGINAL).headers["X-Analysis-Result-Id"]
+    response = analysis_client.post(ANALYSIS_URL, params={"previous": result_id}, json=EDITED)
+    assert response.status_code == 200
+    _assert_close(response.json(), expected)
+
+
+def test_incremental_analysis_extracts_only_edited_regions(analysis_client, db_session, monkeypatch):
+    _with_histogram_edges(db_session)
+    result_id = analysis_client.post(ANALYSIS_URL, json=ORIGINAL).headers["X-Analysis-Result-Id"]
+
+    extracted = []
+    original = services.zonal_stats._extract_pixels
+    monkeypatch.setattr(
+        services.zonal_stats,
+        "_extract_pixels",
+        lambda path, geom, *args: extracted.append((path, geom.area)) or original(path, geom, *args),
+    )
+    analysis_client.post(ANALYSIS_URL, params={"previous": result_id}, json=EDITED)
+
+    full_area = box(-84.5, 56.6, -83.3, 57.5).area
+    areas = {layer_id: [] for layer_id in ("peat_cog", "carbon_cog", "ecosystem_classification_cog")}
+    for path, area in extracted:
+        for layer_id in areas:
+            if path.endswith(f"/{layer_id}.tif"):
+                areas[layer_id].append(area)
+    # carbon (sum/mean/fixed-edge histogram) only reads the added and removed strips...
+    assert sorted(areas["carbon_cog"]) == pytest.approx([0.1, 0.18])
+    # ...while peat (max) and the ecosystem classes (majority) are re-extracted in full.
+    assert areas["peat_cog"] == pytest.approx([full_area])
+    assert areas["ecosystem_classification_cog"] == pytest.approx([full_area])
+
+
+def test_large_edit_falls_back_to_full_run(analysis_client, monkeypatch):
+    result_id = analysis_client.post(ANALYSIS_URL, json=ORIGINAL).headers["X-Analysis-Result-Id"]
+    moved = _feature(-84.2, 56.2, -83.2, 57.2)
+
+    extracted = []
+    original = services.zonal_stats._extract_pixels
+    monkeypatch.setattr(
+        services.zonal_stats,
+        "_extract_pixels",
+        lambda path, geom, *args: extracted.append(geom.area) or original(path, geom, *args),
+    )
+    expected = analysis_client.post(ANALYSIS_URL, json=moved).json()
+    full_run = len(extracted)
+    extracted.clear()
+
+    response = analysis_client.post(ANALYSIS_URL, params={"previous": result_id}, json=moved)
+    assert response.json() == expected
+    assert len(extracted) == full_run and min(extracted) == pytest.approx(1.0)
+
+
+def test_unknown_previous_runs_full_analysis(analysis_client):
+    expected = analysis_client.post(ANALYSIS_URL, json=EDITED).json()
+    response = analysis_client.post(ANALYSIS_URL, params={"previous": str(uuid4())}, json=EDITED)
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_invalid_previous_returns_422(analysis_client):
+    response = analysis_client.post(ANALYSIS_URL, params={"previous": "not-a-uuid"}, json=EDITED)
+    assert response.status_code == 422
+
+
+def test_expired_results_are_ignored_and_deleted(db_session):
+    stale = AnalysisResult(
+        geometry=shapely.to_wkb(box(0, 0, 1, 1)),
+        area_km2=1.0,
+        analysis={},
+        components={},
+        created_at=datetime.now(timezone.utc) - timedelta(hours=ANALYSIS_RESULT_TTL_HOURS + 1),
+    )
+    fresh = AnalysisResult(geometry=shapely.to_wkb(box(0, 0, 1, 1)), area_km2=1.0, analysis={}, components={})
+    db_session.add_all([stale, fresh])
+    db_session.flush()
+    db_session.refresh(fresh)
+
+    assert load_previous(db_session, stale.id) is None
+    assert load_previous(db_session, fresh.id).geometry.equals(box(0, 0, 1, 1))
+    assert delete_expired_results(db_session) == 1
@@ -0,0 +1,123 @@
+"""Tests for POST /analysis/v2/batch (services.batch_analysis)."""
+
+import json
+
+import rasterio.errors
+
+import services.batch_analysis
+import services.zonal_stats
+
+BATCH_URL = "/analysis/v2/batch"
+
+
+def _square(minx: float, miny: float, size: float = 0.3, **properties) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[
+                [minx, miny], [minx + size, miny], [minx + size, miny + size], [minx, miny + size], [minx, miny],
+            ]],
+        },
+        "properties": properties,
+    }
+
+
+def _collection(*features) -> dict:
+    return {"type": "FeatureCollection", "features": list(features)}
+
+
+def _lines(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_streams_one_ndjson_line_per_feature(analysis_client):
+    body = _collection(_square(-84.9, 56.1), _square(-83.5, 57.5), _square(-84.2, 56.8))
+    response = analysis_client.post(BATCH_URL, json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = _lines(response)
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert all(line["status"] == "ok" for line in lines)
+
+
+def test_batch_results_match_single_analysis(analysis_client):
+    feature = _square(-84.9, 56.1)
+    line = _lines(analysis_client.post(BATCH_URL, json=_collection(feature)))[0]
+    assert line["analysis"] == analysis_client.post("/analysis/v2", json=feature).json()
+
+
+def test_batch_reports_validation_errors_inline(analysis_client):
+    too_small = _square(-84.0, 57.0, size=0.001)
+    outside = _square(-10.0, 10.0)
+    body = _collection(_square(-84.9, 56.1), too_small, outside, _square(-83.5, 57.5))
+    lines = _lines(analysis_client.post(BATCH_URL, json=body))
+
+    errors = {line["index"]: line for line in lines if line["status"] == "error"}
+    assert set(errors) == {1, 2}
+    assert errors[1]["status_code"] == 422 and "below the minimum" in errors[1]["detail"]
+    assert "Hudson Bay Lowlands" in errors[2]["detail"]
+    # Errors are reported first, then results in input order.
+    assert [line["index"] for line in lines] == [1, 2, 0, 3]
+
+
+def test_batch_keys_lines_by_id_property(analysis_client):
+    body = _collection(_square(-84.9, 56.1, name="claim-a"), _square(-83.5, 57.5))
+    lines = _lines(analysis_client.post(BATCH_URL, params={"id_property": "name"}, json=body))
+    assert lines[0] == {
+        "index": 1, "id": "1", "status": "error", "status_code": 422, "detail": "Feature has no 'name' property",
+    }
+    assert lines[1]["id"] == "claim-a" and lines[1]["status"] == "ok"
+
+
+def test_batch_runs_one_raster_pass_per_chunk(analysis_client, monkeypatch):
+    monkeypatch.setattr(services.batch_analysis, "BATCH_CHUNK_SIZE", 2)
+    calls = []
+    original = services.batch_analysis.compute_zonal_stats_many
+    monkeypatch.setattr(
+        services.batch_analysis,
+        "compute_zonal_stats_many",
+        lambda geoms, *args: calls.append(len(geoms)) or original(geoms, *args),
+    )
+    body = _collection(*(_square(-84.9 + 0.3 * i, 56.1) for i in range(5)))
+    lines = _lines(analysis_client.post(BATCH_URL, json=body))
+    assert calls == [2, 2, 1]
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+
+
+def test_batch_raster_failure_fails_only_its_chunk(analysis_client, monkeypatch):
+    monkeypatch.setattr(services.batch_analysis, "BATCH_CHUNK_SIZE", 1)
+    original = services.zonal_stats._run_exact_extract_many
+    calls = {"n": 0}
+
+    def flaky(*args):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise rasterio.errors.RasterioIOError("boom")
+        return original(*args)
+
+    monkeypatch.setattr(services.zonal_stats, "_run_exact_extract_many", flaky)
+    lines = _lines(analysis_client.post(BATCH_URL, json=_collection(_square(-84.9, 56.1), _square(-83.5, 57.5))))
+    assert lines[0] == {"index": 0, "id": "0", "status": "error", "status_code": 500, "detail": "Analysis is unavailable"}
+    assert lines[1]["status"] == "ok"
+
+
+def test_batch_invalid_result_fails_only_its_item(analysis_client, monkeypatch):
+    original = services.batch_analysis.compute_zonal_stats_many
+
+    def corrupt_second(*args):
+        results = original(*args)
+        results[1] = {**results[1], next(iter(results[1])): "not a widget"}
+        return results
+
+    monkeypatch.setattr(services.batch_analysis, "compute_zonal_stats_many", corrupt_second)
+    lines = _lines(analysis_client.post(BATCH_URL, json=_collection(_square(-84.9, 56.1), _square(-83.5, 57.5))))
+    assert lines[0]["status"] == "ok"
+    assert lines[1] == {"index": 1, "id": "1", "status": "error", "status_code": 500, "detail": "Analysis is unavailable"}
+
+
+def test_batch_rejects_too_many_features(client, monkeypatch):
+    monkeypatch.setattr(services.batch_analysis, "MAX_BATCH_FEATURES", 2)
+    response = client.post(BATCH_URL, json=_collection(*(_square(-84.9, 56.1) for _ in range(3))))
+    assert response.status_code == 422
+    assert "at most 2" in response.json()["detail"]
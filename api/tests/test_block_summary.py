@@ -0,0 +1,210 @@
+"""Tests for block-summary sidecars (services.block_summary) and their use by the zonal-stats pipeline."""
+
+import math
+
+import numpy as np
+import pytest
+import rasterio
+from shapely.geometry import Point, box
+
+import services.zonal_stats
+from models import Layer
+from services.block_summary import (
+    build_block_summary,
+    clear_summary_cache,
+    interior_summary,
+    layer_summary_options,
+    summary_uri,
+)
+
+ANALYSIS_URL = "/analysis/v2"
+
+SQUARE_FEATURE = {
+    "type": "Feature",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [[[-84.5, 56.5], [-83.5, 56.5], [-83.5, 57.5], [-84.5, 57.5], [-84.5, 56.5]]],
+    },
+    "properties": {},
+}
+
+# Irregular AOI: an ellipse off the pixel grid, so boundary cells have partial coverage.
+ELLIPSE_FEATURE = {
+    "type": "Feature",
+    "geometry": Point(-84.03, 56.97).buffer(0.61, quad_segs=32).__geo_interface__,
+    "properties": {},
+}
+
+HISTOGRAM_EDGES = [float(e) for e in np.linspace(0, 400, 11)]
+
+
+def _with_histogram_edges(db_session) -> None:
+    for layer_id in ("peat_cog", "carbon_cog"):
+        layer = db_session.get(Layer, layer_id)
+        layer.stats = {"histogram": {"edges": HISTOGRAM_EDGES, "counts": [0] * 10}}
+    db_session.flush()
+
+
+def _build_all(db_session) -> None:
+    for layer in db_session.query(Layer).filter(Layer.format_ == "raster"):
+        build_block_summary(layer.path, **layer_summary_options(layer))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_summary_cache():
+    clear_summary_cache()
+    yield
+    clear_summary_cache()
+
+
+def test_summary_uri_names_each_level():
+    assert summary_uri("s3://b/peat_cog.tif", None) == "s3://b/peat_cog.summary-native.tif"
+    assert summary_uri("s3://b/peat_cog.tif", 2) == "s3://b/peat_cog.summary-ovr2.tif"
+
+
+def test_build_writes_cell_aggregates(analysis_client, db_session):
+    layer = db_session.get(Layer, "ecosystem_classification_cog")
+    (path,) = build_block_summary(layer.path, **layer_summary_options(layer))
+
+    with rasterio.open(layer.path) as src, rasterio.open(path) as summary:
+        assert summary.width == math.ceil(src.width / 32)
+        assert summary.descriptions[:3] == ("count", "sum", "max")
+        data = summary.read()
+        assert data[0].sum() == src.width * src.height
+        pixels = src.read(1)
+        class_values = sorted(np.unique(pixels).tolist())
+        for i, value in enumerate(class_values):
+            assert data[3 + i].sum() == (pixels == value).sum()
+
+
+def test_interior_summary_requires_matching_histogram_edges(analysis_client, db_session):
+    layer = db_session.get(Layer, "peat_cog")
+    build_block_summary(layer.path, edges=HISTOGRAM_EDGES)
+    square = box(-84.5, 56.5, -83.5, 57.5)
+
+    assert interior_summary(layer.path, None, square, ["mean", "values", "coverage"], HISTOGRAM_EDGES) is not None
+    assert interior_summary(layer.path, None, square, ["mean", "values", "coverage"], None) is None
+    assert interior_summary(layer.path, None, square, ["mean", "values", "coverage"], HISTOGRAM_EDGES[:-1]) is None
+    assert interior_summary(layer.path, None, square, ["mean", "median"], HISTOGRAM_EDGES) is None
+
+
+def test_interior_summary_without_sidecar_is_none(analysis_client, db_session):
+    layer = db_session.get(Layer, "peat_cog")
+    assert interior_summary(layer.path, None, box(-84.5, 56.5, -83.5, 57.5), ["mean"]) is None
+
+
+def _write_raster(path: str, value: int) -> None:
+    from rasterio.transform import from_origin
+
+    profile = {
+        "driver": "GTiff", "dtype": "uint8", "width": 512, "height": 512, "count": 1, "crs": "EPSG:4326",
+        "transform": from_origin(-85.0, 58.0, 0.001, 0.001), "tiled": True, "blockxsize": 256, "blockysize": 256,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(np.full((1, 512, 512), value, dtype="uint8"))
+        dst.build_overviews([2])
+
+
+def test_interior_summary_ignores_sidecars_of_a_replaced_cog(tmp_path):
+    path = str(tmp_path / "layer.tif")
+    square = box(-84.95, 57.55, -84.55, 57.95)
+    _write_raster(path, 1)
+    build_block_summary(path)
+    assert interior_summary(path, None, square, ["sum"])[1]["sum"] > 0
+
+    # Same size and georeferencing, other pixels; the sidecars are stale.
+    _write_raster(path, 2)
+    clear_summary_cache()
+    assert interior_summary(path, None, square, ["sum"]) is None
+    assert interior_summary(path, 0, square, ["sum"]) is None
+
+
+def test_interior_summary_does_not_cache_read_failures(tmp_path, monkeypatch):
+    import services.block_summary
+
+    path = str(tmp_path / "layer.tif")
+    square = box(-84.95, 57.55, -84.55, 57.95)
+    _write_raster(path, 1)
+    build_block_summary(path)
+
+    original = services.block_summary._open_summary
+
+    def failing_open(*args):
+        monkeypatch.setattr(services.block_summary, "_open_summary", original)
+        raise rasterio.errors.RasterioIOError("HTTP response code: 503")
+
+    monkeypatch.setattr(services.block_summary, "_open_summary", failing_open)
+    assert interior_summary(path, None, square, ["sum"]) is None
+    assert interior_summary(path, None, square, ["sum"]) is not None
+
+
+def test_interior_summary_rechecks_missing_sidecars(tmp_path, monkeypatch):
+    import services.block_summary
+
+    path = str(tmp_path / "layer.tif")
+    square = box(-84.95, 57.55, -84.55, 57.95)
+    _write_raster(path, 1)
+    (sidecar, _) = build_block_summary(path)
+    (tmp_path / "layer.summary-native.tif").rename(tmp_path / "elsewhere.tif")
+    clear_summary_cache()
+    assert interior_summary(path, None, square, ["sum"]) is None
+
+    # Uploaded after the first lookup: picked up once the cached absence expires.
+    (tmp_path / "elsewhere.tif").rename(sidecar)
+    assert interior_summary(path, None, square, ["sum"]) is None
+    monkeypatch.setattr(services.block_summary, "SUMMARY_CACHE_SECONDS", 0)
+    assert interior_summary(path, None, square, ["sum"]) is not None
+
+
+@pytest.mark.parametrize("feature", [SQUARE_FEATURE, ELLIPSE_FEATURE], ids=["square", "ellipse"])
+def test_analysis_with_block_summaries_matches_pixel_extraction(analysis_client, db_session, feature):
+    _with_histogram_edges(db_session)
+    expected = analysis_client.post(ANALYSIS_URL, json=feature).json()
+
+    _build_all(db_session)
+    actual = analysis_client.post(ANALYSIS_URL, json=feature).json()
+    assert actual == expected
+
+
+def test_block_summaries_limit_pixel_extraction_to_the_boundary(analysis_client, db_session, monkeypatch):
+    _with_histogram_edges(db_session)
+    _build_all(db_session)
+
+    extracted = []
+    original = services.zonal_stats._extract_pixels
+    monkeypatch.setattr(
+        services.zonal_stats,
+        "_extract_pixels",
+        lambda path, geom, *args: extracted.append(geom.area) or original(path, geom, *args),
+    )
+    response = analysis_client.post(ANALYSIS_URL, json=ELLIPSE_FEATURE)
+    assert response.status_code == 200
+
+    aoi_area = Point(0, 0).buffer(0.61, quad_segs=32).area
+    # Every layer has a sidecar: exactextract only sees the strip between the interior cells and the edge.
+    assert extracted and max(extracted) < 0.5 * aoi_area
+
+
+def test_feature_analysis_uses_block_summaries(analysis_client, db_session, monkeypatch):
+    from shapely.geometry import shape
+
+    _with_histogram_edges(db_session)
+    collection = {"type": "FeatureCollection", "features": [SQUARE_FEATURE, ELLIPSE_FEATURE]}
+    expected = analysis_client.post(f"{ANALYSIS_URL}/features", json=collection).json()
+
+    _build_all(db_session)
+    extracted = []
+    original = services.zonal_stats.exact_extract
+
+    def recording_exact_extract(src, features, ops):
+        # A list from the per-feature pass, one feature from the union's single-AOI pass.
+        batch = features if isinstance(features, list) else [features]
+        extracted.extend(shape(feature["geometry"]).area for feature in batch)
+        return original(src, features, ops)
+
+    monkeypatch.setattr(services.zonal_stats, "exact_extract", recording_exact_extract)
+    actual = analysis_client.post(f"{ANALYSIS_URL}/features", json=collection).json()
+    assert actual == expected
+
+    aoi_area = Point(0, 0).buffer(0.61, quad_segs=32).area
+    assert extracted and max(extracted) < 0.5 * aoi_area
@@ -0,0 +1,174 @@
+"""Tests for the database engines: pool settings and statistics, and the async handler path."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, delete, exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import main
+import routers.categories
+import services.shared_analysis
+from config import Settings, get_settings
+from db.database import DbRunner, InstrumentedQueuePool, engine_options, get_db_runner, pool_status
+from db.migrations import init_schema
+from main import app
+from models import Category, SharedAnalysis
+from tests.conftest import test_engine
+
+TEST_URL = get_settings().database_url.replace("postgresql://", "postgresql+psycopg://")
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "2500")
+    options = engine_options(Settings())
+
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_recycle"] == 600
+    assert options["connect_args"] == {"options": "-c statement_timeout=2500"}
+    assert "connect_args" not in engine_options(get_settings())
+
+
+def test_statement_timeout_cancels_long_queries():
+    timed = create_engine(TEST_URL, connect_args={"options": "-c statement_timeout=50"}, poolclass=NullPool)
+    with timed.connect() as conn, pytest.raises(exc.OperationalError, match="statement timeout"):
+        conn.execute(text("SELECT pg_sleep(1)"))
+
+
+def test_pool_counts_checkouts_and_timeouts():
+    instrumented = create_engine(TEST_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with instrumented.connect():
+        assert pool_status(instrumented.pool)["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            instrumented.connect()
+    with instrumented.connect():
+        pass
+
+    status = pool_status(instrumented.pool)
+    assert status["checkouts"] == 2 and status["timeouts"] == 1 and status["checked_out"] == 0
+    assert status["wait_ms_max"] >= status["wait_ms_mean"] > 0
+    instrumented.dispose()
+
+
+def test_init_schema_is_safe_for_concurrent_workers():
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: init_schema(test_engine), range(4)))
+
+
+def test_prepare_database_runs_once_per_process_tree(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "_database_ready", False)
+    monkeypatch.setattr(main, "init_schema", lambda bind: calls.append("schema"))
+    monkeypatch.setattr(main, "ensure_partitions", lambda db: calls.append("partitions"))
+
+    main.prepare_database()
+    main.prepare_database()  # e.g. a worker forked from the gunicorn master
+    assert calls == ["schema", "partitions"]
+
+
+def test_db_pool_endpoint(client):
+    response = client.get("/health/db-pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["async_enabled"] is False
+    assert {"size", "checked_out", "overflow", "checkouts", "timeouts", "wait_ms_mean", "wait_ms_max"} <= set(data["sync"])
+    assert data["async"]["size"] == get_settings().db_pool_size
+
+
+def test_db_runner_runs_sync_code_on_both_paths(db_session):
+    def count(db) -> int:
+        return db.execute(text("SELECT 1")).scalar()
+
+    async def run_both():
+        async_engine = create_async_engine(TEST_URL, poolclass=NullPool)
+        async with AsyncSession(async_engine) as session:
+            async_result = await DbRunner(session).run(count)
+        await async_engine.dispose()
+        return await DbRunner(db_session).run(count), async_result
+
+    assert asyncio.run(run_both()) == (1, 1)
+
+
+@pytest.fixture
+def async_catalog_client(client):
+    """The test client with catalog/share reads on the async engine (committed data only)."""
+    async_engine = create_async_engine(TEST_URL, poolclass=NullPool)
+
+    async def async_runner():
+        async with AsyncSession(async_engine) as session:
+            yield DbRunner(session)
+
+    app.dependency_overrides[get_db_runner] = async_runner
+    with test_engine.begin() as conn:
+        conn.execute(Category.__table__.insert().values(id=4801, metadata={"title": {"en": "Async", "fr": "Async"}}))
+    yield client
+    with test_engine.begin() as conn:
+        conn.execute(delete(Category).where(Category.id == 4801))
+    asyncio.run(async_engine.dispose())
+
+
+def test_catalog_endpoints_on_async_path(async_catalog_client):
+    response = async_catalog_client.get("/categories/4801", params={"include_datasets": True, "include_layers": True})
+    assert response.status_code == 200
+    assert response.json()["metadata"]["title"]["en"] == "Async"
+    assert response.json()["datasets"] == []
+
+    assert async_catalog_client.get("/categories/4802").status_code == 404
+    assert async_catalog_client.get("/layers/missing").status_code == 404
+
+
+def test_async_catalog_read_builds_the_response_off_the_event_loop(async_catalog_client, monkeypatch):
+    threads = {}
+    query, build = routers.categories._get_category, routers.categories._category_schema
+
+    def get_category(db, *args):
+        threads["query"] = threading.current_thread().name
+        return query(db, *args)
+
+    def category_schema(category, **flags):
+        threads["build"] = threading.current_thread().name
+        return build(category, **flags)
+
+    monkeypatch.setattr(routers.categories, "_get_category", get_category)
+    monkeypatch.setattr(routers.categories, "_category_schema", category_schema)
+    response = async_catalog_client.get("/categories/4801", params={"include_datasets": True})
+    assert response.status_code == 200
+    assert response.json() == {"id": 4801, "metadata": {"title": {"en": "Async", "fr": "Async"}}, "datasets": []}
+    assert not threads["query"].startswith("catalog_")
+    assert threads["build"].startswith("catalog_")
+
+
+def test_async_share_read_builds_the_response_off_the_event_loop(async_catalog_client, monkeypatch):
+    threads = {}
+    load, read = services.shared_analysis._load_shared, services.shared_analysis._read_shared
+
+    def load_shared(db, share_id):
+        threads["load"] = threading.current_thread().name
+        return load(db, share_id)
+
+    def read_shared(stored):
+        threads["read"] = threading.current_thread().name
+        return read(stored)
+
+    monkeypatch.setattr(services.shared_analysis, "_load_shared", load_shared)
+    monkeypatch.setattr(services.shared_analysis, "_read_shared", read_shared)
+    with test_engine.begin() as conn:
+        share_id = conn.execute(
+            SharedAnalysis.__table__.insert().values(analysis={"foo": "bar"}).returning(SharedAnalysis.id)
+        ).scalar_one()
+    try:
+        # A legacy row that no longer validates: the 410 comes from the executor-side step.
+        assert async_catalog_client.get(f"/analysis/v2/share/{share_id}").status_code == 410
+    finally:
+        with test_engine.begin() as conn:
+            conn.execute(delete(SharedAnalysis).where(SharedAnalysis.id == share_id))
+
+    assert not threads["load"].startswith("catalog_")
+    assert threads["read"].startswith("catalog_")
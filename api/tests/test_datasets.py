@@ -152,3 +152,87 @@ def test_get_dataset_include_layers(client, layer_with_dataset, dataset):
     data = response.json()
     assert "layers" in data
     assert len(data["layers"]) == 1
+
+
+# =============================================================================
+# Time-Series Tile Stack Tests
+# =============================================================================
+
+# WebMercatorQuad tile at z=7 containing (-84, 57), inside the analysis fixture rasters.
+STACK_TILE = "7/34/39"
+
+
+def _unpack_tile_stack(content: bytes) -> tuple[dict, list[bytes]]:
+    import json
+    import struct
+
+    (index_length,) = struct.unpack(">I", content[:4])
+    index = json.loads(content[4 : 4 + index_length])
+    data = content[4 + index_length :]
+    return index, [data[s["offset"] : s["offset"] + s["length"]] for s in index["slices"]]
+
+
+def test_tile_stack_returns_all_time_steps_in_order(analysis_client):
+    response = analysis_client.get(f"/datasets/4/tiles/{STACK_TILE}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+
+    index, images = _unpack_tile_stack(response.content)
+    assert index["tilesize"] == 256
+    assert [s["series"] for s in index["slices"]] == ["endL_winter"] * 6 + ["lengthT_winter"] * 6
+    assert [s["x"] for s in index["slices"][6:]] == [2018, 2019, 2020, 2021, 2022, 2023]
+    assert all(image.startswith(b"\x89PNG") for image in images)
+
+
+def test_tile_stack_series_filter(analysis_client):
+    from tests.conftest import SNOW_LENGTHT_VALUES
+
+    response = analysis_client.get(f"/datasets/4/tiles/{STACK_TILE}?series=lengthT_winter&rescale=0,255")
+    assert response.status_code == 200
+    index, images = _unpack_tile_stack(response.content)
+    assert [s["layer_id"] for s in index["slices"]] == [f"lengthT_winter_{k}_cog" for k in SNOW_LENGTHT_VALUES]
+
+    import numpy as np
+    from rasterio.io import MemoryFile
+
+    with MemoryFile(images[0]) as memfile, memfile.open() as src:
+        band = src.read(1)
+    # Uniform 100 rescaled from [0, 255] keeps its value.
+    assert np.all(band[band > 0] == 100)
+
+
+def test_tile_stack_outside_raster_has_empty_slices(analysis_client):
+    response = analysis_client.get("/datasets/4/tiles/7/60/60?series=lengthT_winter")
+    assert response.status_code == 200
+    index, _ = _unpack_tile_stack(response.content)
+    assert [s["length"] for s in index["slices"]] == [0] * 6
+
+
+def test_tile_stack_unknown_series_returns_422(analysis_client):
+    response = analysis_client.get(f"/datasets/4/tiles/{STACK_TILE}?series=nope")
+    assert response.status_code == 422
+    assert "lengthT_winter" in response.json()["detail"]
+
+
+def test_tile_stack_dataset_without_time_series_returns_422(analysis_client):
+    response = analysis_client.get(f"/datasets/1/tiles/{STACK_TILE}")
+    assert response.status_code == 422
+
+
+def test_tile_stack_unknown_dataset_returns_404(client):
+    response = client.get(f"/datasets/999/tiles/{STACK_TILE}")
+    assert response.status_code == 404
+
+
+def test_tile_stack_invalid_tile_or_rescale_returns_422(analysis_client):
+    assert analysis_client.get("/datasets/4/tiles/1/2/0").status_code == 422
+    assert analysis_client.get(f"/datasets/4/tiles/{STACK_TILE}?rescale=abc").status_code == 422
+
+
+def test_tile_stack_without_bucket_returns_500(analysis_client, monkeypatch):
+    from config import get_settings
+
+    monkeypatch.setattr(get_settings(), "s3_bucket_name", "")
+    response = analysis_client.get(f"/datasets/4/tiles/{STACK_TILE}")
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Tile stack is unavailable"
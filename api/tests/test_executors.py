@@ -0,0 +1,192 @@
+"""Tests for the per-workload executors (executors.py) and their binding to routes."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+import routers.analysis
+import routers.categories
+import routers.hbl_area
+from executors import ANALYSIS, EXECUTORS, TILE_READS, WorkloadExecutor
+
+FEATURE = {
+    "type": "Feature",
+    "geometry": {"type": "Polygon", "coordinates": [[[-84, 54], [-83.9, 54], [-83.9, 54.1], [-84, 54.1], [-84, 54]]]},
+    "properties": {},
+}
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_executor_bounds_its_queue_and_records_stats():
+    executor = WorkloadExecutor("test", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: threading.current_thread().name))
+        await asyncio.to_thread(_wait_for, lambda: executor.status()["active"] == 1)
+        assert executor.status()["queued"] == 1 and executor.status()["saturated"]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(lambda: None)
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "1"}
+
+        release.set()
+        return await running, await queued
+
+    assert asyncio.run(scenario()) == (True, "test_0")
+    status = executor.status()
+    assert (status["active"], status["queued"], status["completed"], status["rejected"]) == (0, 0, 2, 1)
+    assert status["wait_ms_max"] > 0
+    executor.shutdown()
+
+
+def test_cancelled_request_drops_its_queued_task():
+    executor = WorkloadExecutor("test", workers=1, max_queue=1)
+    release = threading.Event()
+    calls = []
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(calls.append, 1))
+        await asyncio.to_thread(_wait_for, lambda: executor.status()["active"] == 1)
+        queued.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await running
+
+    asyncio.run(scenario())
+    assert calls == []
+    assert executor.status()["cancelled"] == 1 and executor.status()["queued"] == 0
+    executor.shutdown()
+
+
+def test_iterate_advances_the_iterator_on_the_executor():
+    executor = WorkloadExecutor("test", workers=1, max_queue=0)
+    threads = []
+
+    def chunks():
+        for chunk in (b"a", b"b"):
+            threads.append(threading.current_thread().name)
+            yield chunk
+
+    async def collect():
+        return [chunk async for chunk in executor.iterate(chunks())]
+
+    assert asyncio.run(collect()) == [b"a", b"b"]
+    assert threads == ["test_0", "test_0"]
+    executor.shutdown()
+
+
+def test_map_fans_out_on_the_executor_in_order():
+    executor = WorkloadExecutor("test", workers=2, max_queue=0)
+    threads = set()
+
+    def square(n):
+        threads.add(threading.current_thread().name)
+        return n * n
+
+    # Never rejected, although the tasks exceed workers + max_queue.
+    assert executor.map(square, list(range(5))) == [0, 1, 4, 9, 16]
+    assert threads <= {"test_0", "test_1"}
+    assert executor.status()["completed"] == 5
+    executor.shutdown()
+
+
+def test_executor_runs_again_after_shutdown():
+    executor = WorkloadExecutor("test", workers=1, max_queue=0)
+    assert asyncio.run(executor.run(lambda: 1)) == 1
+    executor.shutdown()
+    assert asyncio.run(executor.run(lambda: 2)) == 2
+    executor.shutdown()
+
+
+def test_bound_routes_work_after_a_lifespan_shutdown(client, monkeypatch):
+    monkeypatch.setattr(routers.hbl_area, "_hbl_area_tile", lambda z, x, y: b"")
+    for _ in range(2):
+        assert client.get("/hbl-area/tiles/3/2/2").status_code == 204
+        assert TILE_READS.map(abs, [-1, 2]) == [1, 2]
+        # What the app lifespan does on exit; the next lifespan in this process reuses the executors.
+        for executor in EXECUTORS:
+            executor.shutdown()
+
+
+def test_routes_run_on_their_workload_executor(client, monkeypatch):
+    threads = {}
+
+    def validate(body):
+        threads["analysis"] = threading.current_thread().name
+        raise HTTPException(status_code=422, detail="stop")
+
+    def tile(z, x, y):
+        threads["tiles"] = threading.current_thread().name
+        return b""
+
+    def list_categories(db, *args):
+        threads["catalog"] = threading.current_thread().name
+        return original_list_categories(db, *args)
+
+    original_list_categories = routers.categories._list_categories
+    monkeypatch.setattr(routers.analysis, "validate_geometry_v2", validate)
+    monkeypatch.setattr(routers.hbl_area, "_hbl_area_tile", tile)
+    monkeypatch.setattr(routers.categories, "_list_categories", list_categories)
+
+    assert client.post("/analysis/v2", json=FEATURE).status_code == 422
+    assert client.get("/hbl-area/tiles/3/2/2").status_code == 204
+    assert client.get("/categories").status_code == 200
+    assert {workload: name.rsplit("_", 1)[0] for workload, name in threads.items()} == {
+        "analysis": "analysis",
+        "tiles": "tiles",
+        "catalog": "catalog",
+    }
+
+
+def test_saturated_analysis_does_not_block_other_workloads(client, monkeypatch):
+    release = threading.Event()
+
+    def slow_validate(body):
+        release.wait(10)
+        raise HTTPException(status_code=422, detail="stop")
+
+    monkeypatch.setattr(routers.analysis, "validate_geometry_v2", slow_validate)
+    monkeypatch.setattr(ANALYSIS, "max_queue", 0)
+
+    with ThreadPoolExecutor(ANALYSIS.workers) as pool:
+        pending = [pool.submit(client.post, "/analysis/v2", json=FEATURE) for _ in range(ANALYSIS.workers)]
+        try:
+            _wait_for(lambda: ANALYSIS.status()["active"] == ANALYSIS.workers)
+
+            rejected = client.post("/analysis/v2", json=FEATURE)
+            assert rejected.status_code == 503
+            assert rejected.headers["retry-after"] == "1"
+
+            start = time.perf_counter()
+            assert client.get("/categories").status_code == 200
+            assert client.get("/hbl-area/tiles/0/0/0").status_code == 200
+            assert client.get("/health/executors").json()["analysis"]["saturated"] is True
+            assert time.perf_counter() - start < 5
+        finally:
+            release.set()
+        assert [future.result().status_code for future in pending] == [422] * ANALYSIS.workers
+
+
+def test_executors_endpoint(client):
+    response = client.get("/health/executors")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"analysis", "tiles", "catalog", "tile_reads", "default"}
+    assert {"workers", "max_queue", "active", "queued", "saturated", "completed", "rejected", "wait_ms_mean"} <= set(
+        data["analysis"]
+    )
+    assert data["default"]["workers"] == 40
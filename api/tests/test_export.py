@@ -0,0 +1,172 @@
+"""Tests for POST /analysis/v2/export (services.export)."""
+
+import io
+import json
+import zipfile
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.io import MemoryFile
+
+import services.export
+from models import Layer
+
+EXPORT_URL = "/analysis/v2/export"
+
+SQUARE_FEATURE = {
+    "type": "Feature",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [[[-84.5, 56.5], [-83.5, 56.5], [-83.5, 57.5], [-84.5, 57.5], [-84.5, 56.5]]],
+    },
+    "properties": {},
+}
+
+# Right triangle over the same square: roughly half the clip window lies outside the AOI.
+TRIANGLE_FEATURE = {
+    "type": "Feature",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [[[-84.5, 56.5], [-83.5, 56.5], [-84.5, 57.5], [-84.5, 56.5]]],
+    },
+    "properties": {},
+}
+
+SNOW_LENGTHT_LAYERS = [f"lengthT_winter_{s}_cog" for s in ("1819", "1920", "2021", "2122", "2223", "2324")]
+
+
+def _read_tif(data: bytes):
+    with MemoryFile(data) as memfile, memfile.open() as src:
+        return src.read(masked=True), src.profile, src.descriptions
+
+
+# =============================================================================
+# Zip export
+# =============================================================================
+
+
+def test_export_zip_contains_one_tif_per_layer(analysis_client):
+    response = analysis_client.post(
+        EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": ["peat_cog", "carbon_cog"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert "hbl_export.zip" in response.headers["content-disposition"]
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["peat_cog.tif", "carbon_cog.tif", "manifest.json"]
+
+    peat, profile, _ = _read_tif(archive.read("peat_cog.tif"))
+    assert profile["count"] == 1
+    assert profile["crs"].to_string() == "EPSG:4326"
+    # Fixture grid is 128 px per degree; the 1°×1° AOI is 128×128 px.
+    assert peat.shape == (1, 128, 128)
+    assert np.all(peat == 200.0)
+
+    carbon, _, _ = _read_tif(archive.read("carbon_cog.tif"))
+    assert np.all(carbon == 80.0)
+
+
+def test_export_zip_manifest(analysis_client):
+    response = analysis_client.post(EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": ["peat_cog"]})
+    manifest = json.loads(zipfile.ZipFile(io.BytesIO(response.content)).read("manifest.json"))
+    entry = manifest["layers"][0]
+    assert entry["id"] == "peat_cog"
+    assert entry["file"] == "peat_cog.tif"
+    assert entry["overview_level"] is None
+    assert (entry["width"], entry["height"]) == (128, 128)
+
+
+def test_export_masks_pixels_outside_aoi(analysis_client):
+    response = analysis_client.post(EXPORT_URL, json={"geojson": TRIANGLE_FEATURE, "layers": ["peat_cog"]})
+    assert response.status_code == 200
+    peat, _, _ = _read_tif(zipfile.ZipFile(io.BytesIO(response.content)).read("peat_cog.tif"))
+
+    valid = ~np.ma.getmaskarray(peat)
+    assert 0.4 < valid.mean() < 0.6
+    assert np.all(peat.compressed() == 200.0)
+    # Bottom-left corner is inside the triangle, top-right corner is outside.
+    assert valid[0, -1, 0]
+    assert not valid[0, 0, -1]
+
+
+# =============================================================================
+# Multi-band GeoTIFF export
+# =============================================================================
+
+
+def test_export_multiband_tif_for_coregistered_layers(analysis_client):
+    response = analysis_client.post(
+        EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": SNOW_LENGTHT_LAYERS, "format": "tif"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/tiff"
+
+    data, profile, descriptions = _read_tif(response.content)
+    assert profile["count"] == 6
+    assert list(descriptions) == SNOW_LENGTHT_LAYERS
+    assert [int(band.max()) for band in data] == [100, 110, 120, 130, 140, 150]
+
+
+def test_export_multiband_tif_rejects_mixed_dtypes(analysis_client):
+    response = analysis_client.post(
+        EXPORT_URL,
+        json={"geojson": SQUARE_FEATURE, "layers": ["peat_cog", "inundation_frequency_cog"], "format": "tif"},
+    )
+    assert response.status_code == 422
+    assert "zip" in response.json()["detail"]
+
+
+# =============================================================================
+# Size cap and overviews
+# =============================================================================
+
+
+def test_export_uses_overview_when_over_pixel_cap(analysis_client, db_session, monkeypatch):
+    peat_path = db_session.get(Layer, "peat_cog").path
+    with rasterio.open(peat_path, "r+") as dst:
+        dst.build_overviews([2, 4], Resampling.nearest)
+    monkeypatch.setattr(services.export, "MAX_EXPORT_PIXELS", 64 * 64)
+
+    response = analysis_client.post(EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": ["peat_cog"]})
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert json.loads(archive.read("manifest.json"))["layers"][0]["overview_level"] == 0
+    peat, _, _ = _read_tif(archive.read("peat_cog.tif"))
+    assert peat.shape == (1, 64, 64)
+
+
+def test_export_rejects_aoi_too_large_without_overviews(analysis_client, monkeypatch):
+    monkeypatch.setattr(services.export, "MAX_EXPORT_PIXELS", 64 * 64)
+    response = analysis_client.post(EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": ["carbon_cog"]})
+    assert response.status_code == 422
+    assert "too large" in response.json()["detail"]
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+
+
+def test_export_unknown_layer_returns_404(analysis_client):
+    response = analysis_client.post(EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": ["nope_cog"]})
+    assert response.status_code == 404
+
+
+def test_export_requires_layers(analysis_client):
+    response = analysis_client.post(EXPORT_URL, json={"geojson": SQUARE_FEATURE, "layers": []})
+    assert response.status_code == 422
+
+
+def test_export_rejects_geometry_outside_hbl(analysis_client):
+    outside = {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[-10.5, 56.5], [-9.5, 56.5], [-9.5, 57.5], [-10.5, 57.5], [-10.5, 56.5]]],
+        },
+        "properties": {},
+    }
+    response = analysis_client.post(EXPORT_URL, json={"geojson": outside, "layers": ["peat_cog"]})
+    assert response.status_code == 422
@@ -48,3 +48,130 @@ def test_hbl_area_matches_test_fixture_bounds(client):
     assert max(lons) == approx(-51.0)
     assert min(lats) == approx(45.0)
     assert max(lats) == approx(69.0)
+
+
+# =============================================================================
+# GET /hbl-area/tiles/{z}/{x}/{y}
+# =============================================================================
+
+
+def _decode(content: bytes) -> dict:
+    import mapbox_vector_tile
+
+    return mapbox_vector_tile.decode(content)
+
+
+def test_hbl_area_tile_returns_mvt(client):
+    """Zoom 0 covers the whole fixture footprint in a single small tile."""
+    response = client.get("/hbl-area/tiles/0/0/0")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    layer = _decode(response.content)["hbl_area"]
+    assert layer["extent"] == 4096
+    assert len(layer["features"]) == 1
+    assert layer["features"][0]["geometry"]["type"] == "Polygon"
+
+
+def test_hbl_area_tile_outside_footprint_returns_204(client):
+    # z2 tile 3/3 covers the south-east Pacific quadrant, far from the fixture bbox.
+    response = client.get("/hbl-area/tiles/2/3/3")
+    assert response.status_code == 204
+    assert response.content == b""
+
+
+def test_hbl_area_tile_interior_is_clipped_to_tile(client):
+    """A tile fully inside the footprint holds just the (buffered) tile square."""
+    response = client.get("/hbl-area/tiles/8/56/74")
+    assert response.status_code == 200
+    ring = _decode(response.content)["hbl_area"]["features"][0]["geometry"]["coordinates"][0]
+    assert len(ring) == 5
+    xs = [pt[0] for pt in ring]
+    assert min(xs) < 0 and max(xs) > 4096
+
+
+def test_hbl_area_tile_rejects_coordinates_outside_matrix(client):
+    assert client.get("/hbl-area/tiles/1/2/0").status_code == 422
+    assert client.get("/hbl-area/tiles/23/0/0").status_code == 422
+
+
+def test_zoom_pyramid_simplifies_low_zooms():
+    from shapely.geometry import Point
+
+    from services.vector_tiles import ZoomPyramid
+
+    circle = Point(-84.0, 57.0).buffer(1.0, quad_segs=256)
+    pyramid = ZoomPyramid(circle).precompute()
+    counts = [len(pyramid.at(z).exterior.coords) for z in (0, 6, 12, 16)]
+    assert counts[0] < counts[1] < counts[2] <= counts[3]
+    assert pyramid.at(16) is pyramid.geometry
+
+
+# =============================================================================
+# GET /hbl-area?zoom=|tolerance=
+# =============================================================================
+
+
+def test_hbl_area_default_is_full_detail_with_headers(client):
+    response = client.get("/hbl-area")
+    assert response.headers["x-simplify-tolerance"] == "0.0"
+    assert response.headers["x-vertex-count"] == "5"
+    assert int(response.headers["x-uncompressed-length"]) == len(response.content)
+
+
+def test_custom_headers_are_exposed_to_cross_origin_clients(client):
+    response = client.get("/hbl-area", headers={"Origin": "https://example.com"})
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert {"x-vertex-count", "x-simplify-tolerance", "x-uncompressed-length"} <= exposed
+
+
+def test_hbl_area_is_gzipped_when_accepted(client):
+    gzipped = client.get("/hbl-area", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json()["type"] == "Feature"  # httpx decodes transparently
+
+    plain = client.get("/hbl-area", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == gzipped.content
+
+
+def test_hbl_area_zoom_selects_coarsest_fitting_variant(client):
+    # One pixel at zoom 3 is 360 / 2048 ≈ 0.176° → the 0.05° variant.
+    assert client.get("/hbl-area?zoom=3").headers["x-simplify-tolerance"] == "0.05"
+    # One pixel at zoom 14 is ~0.0000858° → only full detail fits.
+    assert client.get("/hbl-area?zoom=14").headers["x-simplify-tolerance"] == "0.0"
+    assert client.get("/hbl-area?tolerance=0.003").headers["x-simplify-tolerance"] == "0.002"
+
+
+def test_hbl_area_rejects_zoom_and_tolerance_together(client):
+    response = client.get("/hbl-area?zoom=3&tolerance=0.01")
+    assert response.status_code == 422
+
+
+def test_hbl_area_variants_reduce_vertices():
+    from shapely.geometry import Point, mapping
+
+    from routers.hbl_area import _build_variants
+    from schemas.hbl_area import HBLAreaResponse
+
+    circle = Point(-84.0, 57.0).buffer(1.0, quad_segs=256)
+    feature = HBLAreaResponse.model_validate({"type": "Feature", "geometry": mapping(circle), "properties": None})
+    variants = _build_variants(feature)
+    counts = [v.vertex_count for v in variants]
+    assert counts == sorted(counts, reverse=True)
+    assert counts[-1] < counts[0]
+    assert len(variants[-1].gzipped) < len(variants[0].gzipped)
+
+
+def test_hbl_area_caches_are_built_once():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from routers.hbl_area import hbl_area_pyramid, hbl_area_variants, warm_up
+
+    with ThreadPoolExecutor(4) as pool:
+        variants = list(pool.map(lambda _: hbl_area_variants(), range(4)))
+    assert all(v is variants[0] for v in variants)
+
+    warm_up()
+    pyramid = hbl_area_pyramid()
+    assert pyramid is hbl_area_pyramid()
+    assert sorted(pyramid._levels) == list(range(pyramid.max_zoom + 1))
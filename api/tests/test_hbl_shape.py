@@ -0,0 +1,98 @@
+"""Tests for the shared HBL footprint loader and its grid-mask containment check."""
+
+import json
+import random
+
+import pytest
+from shapely.geometry import Point, Polygon, box
+
+from services.hbl_shape import BOUNDARY, HBL_FOOTPRINT, INSIDE, OUTSIDE, ContainmentGrid, load_hbl_footprint
+
+# A "U" shape: the notch between the arms is outside, so bounding boxes alone are not enough.
+U_SHAPE = Polygon([(0, 0), (10, 0), (10, 10), (7, 10), (7, 3), (3, 3), (3, 10), (0, 10), (0, 0)])
+
+
+# =============================================================================
+# ContainmentGrid
+# =============================================================================
+
+
+def test_grid_classifies_cells():
+    grid = ContainmentGrid(Polygon(U_SHAPE.exterior), cells=20)
+    assert grid.classes[2, 2] == INSIDE       # (1.0..1.5, 1.0..1.5), inside the base
+    assert grid.classes[15, 10] == OUTSIDE    # (5.0..5.5, 7.5..8.0), in the notch
+    assert grid.classes[0, 0] == BOUNDARY     # touches the outer edge
+    assert grid.classes[6, 10] == BOUNDARY    # row 6 starts at y=3.0, the notch floor
+
+
+def test_grid_matches_exact_covers():
+    grid = ContainmentGrid(Polygon(U_SHAPE.exterior), cells=20)
+    rng = random.Random(42)
+    for _ in range(500):
+        x, y, r = rng.uniform(-1, 11), rng.uniform(-1, 11), rng.uniform(0.05, 3)
+        aoi = Point(x, y).buffer(r, quad_segs=8) if rng.random() < 0.5 else box(x, y, x + r, y + r)
+        assert grid.covers(aoi) == U_SHAPE.covers(aoi), aoi.wkt
+
+
+def test_grid_accepts_aoi_touching_the_boundary():
+    grid = ContainmentGrid(Polygon(U_SHAPE.exterior), cells=20)
+    assert grid.covers(box(0, 0, 3, 3))
+    assert grid.covers(box(0, 0, 10, 3))
+    assert not grid.covers(box(2, 2, 4, 4))
+
+
+def test_footprint_covers_matches_fixture():
+    """The test fixture footprint is the bbox -117..-51, 45..69."""
+    assert HBL_FOOTPRINT.covers(box(-84.5, 56.5, -83.5, 57.5))
+    assert HBL_FOOTPRINT.covers(box(-117, 45, -116, 46))
+    assert not HBL_FOOTPRINT.covers(box(-118, 50, -116, 51))
+    assert HBL_FOOTPRINT.feature.geometry.type == "Polygon"
+
+
+# =============================================================================
+# load_hbl_footprint
+# =============================================================================
+
+
+def test_load_missing_file_raises(tmp_path):
+    with pytest.raises(RuntimeError, match="not found"):
+        load_hbl_footprint(tmp_path / "missing.geojson")
+
+
+def test_load_feature_collection_unions_features(tmp_path):
+    path = tmp_path / "fc.geojson"
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "properties": {"name": "HBL"},
+        "features": [
+            {"type": "Feature", "geometry": box(0, 0, 1, 1).__geo_interface__, "properties": {"part": 1}},
+            {"type": "Feature", "geometry": box(1, 0, 2, 1).__geo_interface__, "properties": {"part": 2}},
+        ],
+    }))
+    footprint = load_hbl_footprint(path)
+    assert footprint.geometry.area == pytest.approx(2.0)
+    assert footprint.feature.properties == {"name": "HBL"}
+    assert footprint.covers(box(0.5, 0.25, 1.5, 0.75))
+
+
+def test_load_bare_geometry(tmp_path):
+    path = tmp_path / "geom.geojson"
+    path.write_text(json.dumps(box(0, 0, 1, 1).__geo_interface__))
+    footprint = load_hbl_footprint(path)
+    assert footprint.feature.properties is None
+    assert footprint.feature.geometry.type == "Polygon"
+
+
+def test_load_rejects_non_polygon(tmp_path):
+    path = tmp_path / "line.geojson"
+    path.write_text(json.dumps({"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[0, 0], [1, 1]]}}))
+    with pytest.raises(RuntimeError, match="Polygon or MultiPolygon"):
+        load_hbl_footprint(path)
+
+
+def test_load_rejects_invalid_geometry(tmp_path):
+    path = tmp_path / "bowtie.geojson"
+    bowtie = {"type": "Polygon", "coordinates": [[[0, 0], [1, 1], [1, 0], [0, 1], [0, 0]]]}
+    path.write_text(json.dumps(bowtie))
+    with pytest.raises(RuntimeError, match="not a valid geometry"):
+        load_hbl_footprint(path)
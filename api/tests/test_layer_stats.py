@@ -0,0 +1,259 @@
+"""Tests for precomputed layer statistics (services.layer_stats) and their consumers."""
+
+import os
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import from_bounds
+from starlette.requests import Request
+from titiler.core.dependencies import ImageRenderingParams
+
+import services.layer_stats
+from models import Layer
+from routers.cog import render_params_dependency
+from services.layer_stats import compute_layer_stats, compute_raster_stats, default_rescale, invalidate_rescale_cache
+from services.zonal_stats import _histogram
+
+VALID_POLYGON_FEATURE = {
+    "type": "Feature",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [[[-84.5, 56.5], [-83.5, 56.5], [-83.5, 57.5], [-84.5, 57.5], [-84.5, 56.5]]],
+    },
+    "properties": {},
+}
+
+
+@pytest.fixture(autouse=True)
+def _reset_rescale_cache():
+    """The rescale lookup is process-wide; keep tests independent of each other."""
+    invalidate_rescale_cache()
+    yield
+    invalidate_rescale_cache()
+
+
+@pytest.fixture
+def ramp_cog(tmp_path):
+    """512×512 float32 raster with values 0..99 repeating along each row, plus overviews."""
+    path = str(tmp_path / "ramp.tif")
+    data = np.tile(np.arange(512, dtype="float32") % 100, (512, 1))[np.newaxis, ...]
+    data[0, :8, :8] = -9999  # nodata corner
+    profile = {
+        "driver": "GTiff",
+        "dtype": "float32",
+        "width": 512,
+        "height": 512,
+        "count": 1,
+        "crs": "EPSG:4326",
+        "transform": from_bounds(-85.0, 56.0, -83.0, 58.0, 512, 512),
+        "nodata": -9999,
+        "tiled": True,
+        "blockxsize": 256,
+        "blockysize": 256,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+        dst.build_overviews([2, 4], Resampling.nearest)
+    return path
+
+
+# =============================================================================
+# compute_raster_stats
+# =============================================================================
+
+
+def test_compute_raster_stats_values(ramp_cog):
+    stats = compute_raster_stats(ramp_cog)
+
+    assert stats["min"] == 0.0
+    assert stats["max"] == 99.0
+    assert stats["mean"] == pytest.approx(48.5, abs=0.5)
+    assert stats["valid_pixels"] == 512 * 512 - 64
+    assert stats["overview_level"] is None  # raster is smaller than MIN_STATS_PIXELS
+    assert set(stats["percentiles"]) == {"p2", "p5", "p50", "p95", "p98"}
+    assert stats["percentiles"]["p2"] < stats["percentiles"]["p50"] < stats["percentiles"]["p98"]
+
+
+def test_compute_raster_stats_histogram_spans_range(ramp_cog):
+    histogram = compute_raster_stats(ramp_cog)["histogram"]
+    assert len(histogram["edges"]) == len(histogram["counts"]) + 1 == 11
+    assert histogram["edges"][0] == 0.0
+    assert histogram["edges"][-1] == 99.0
+    assert sum(histogram["counts"]) == 512 * 512 - 64
+
+
+def test_compute_raster_stats_uses_coarsest_usable_overview(ramp_cog, monkeypatch):
+    # 512/4 = 128 → 16384 pixels; threshold set just below so the coarsest overview qualifies.
+    monkeypatch.setattr(services.layer_stats, "MIN_STATS_PIXELS", 128 * 128)
+    stats = compute_raster_stats(ramp_cog)
+    assert stats["overview_level"] == 1
+    assert stats["valid_pixels"] < 512 * 512 / 8
+
+    monkeypatch.setattr(services.layer_stats, "MIN_STATS_PIXELS", 128 * 128 + 1)
+    assert compute_raster_stats(ramp_cog)["overview_level"] == 0
+
+
+def test_compute_raster_stats_all_nodata_returns_none(tmp_path):
+    path = str(tmp_path / "empty.tif")
+    profile = {
+        "driver": "GTiff", "dtype": "uint8", "width": 16, "height": 16, "count": 1,
+        "crs": "EPSG:4326", "transform": from_bounds(0, 0, 1, 1, 16, 16), "nodata": 0,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(np.zeros((1, 16, 16), dtype="uint8"))
+    assert compute_raster_stats(path) is None
+
+
+# =============================================================================
+# compute_layer_stats + GET /layers/{id}/statistics
+# =============================================================================
+
+
+def test_compute_layer_stats_stores_on_layer(analysis_client, db_session):
+    counts = compute_layer_stats(db_session, "test-bucket", layer_ids=["peat_cog", "carbon_cog"])
+    assert counts == {"computed": 2, "skipped": 0, "failed": 0}
+    assert db_session.get(Layer, "peat_cog").stats["min"] == 200.0
+
+
+def test_compute_layer_stats_skips_categorical(analysis_client, db_session):
+    db_session.get(Layer, "ecosystem_classification_cog").type_ = "categorical"
+    db_session.flush()
+    counts = compute_layer_stats(db_session, "test-bucket", layer_ids=["ecosystem_classification_cog"])
+    assert counts == {"computed": 0, "skipped": 1, "failed": 0}
+    assert db_session.get(Layer, "ecosystem_classification_cog").stats is None
+
+
+def test_compute_layer_stats_records_failures(analysis_client, db_session):
+    db_session.get(Layer, "peat_cog").path = "/does/not/exist.tif"
+    db_session.flush()
+    counts = compute_layer_stats(db_session, "test-bucket", layer_ids=["peat_cog"])
+    assert counts == {"computed": 0, "skipped": 0, "failed": 1}
+
+
+def test_compute_layer_stats_skips_rasters_without_valid_pixels(analysis_client, db_session, monkeypatch):
+    monkeypatch.setattr(services.layer_stats, "compute_raster_stats", lambda uri: None)
+    counts = compute_layer_stats(db_session, "test-bucket", layer_ids=["peat_cog"])
+    assert counts == {"computed": 0, "skipped": 1, "failed": 0}
+    assert db_session.get(Layer, "peat_cog").stats is None
+
+
+def test_get_layer_statistics(analysis_client, db_session):
+    compute_layer_stats(db_session, "test-bucket", layer_ids=["carbon_cog"])
+
+    response = analysis_client.get("/layers/carbon_cog/statistics")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["layer_id"] == "carbon_cog"
+    assert data["min"] == data["max"] == 80.0
+    assert len(data["histogram"]["edges"]) == 11
+
+
+def test_get_layer_statistics_not_computed_returns_404(analysis_client):
+    response = analysis_client.get("/layers/peat_cog/statistics")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Statistics not available for this layer"
+
+
+def test_get_layer_statistics_unknown_layer_returns_404(client):
+    response = client.get("/layers/nonexistent/statistics")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Layer not found"
+
+
+def test_seed_endpoint_compute_stats(client, monkeypatch):
+    """compute_stats=true adds stats counts; unreadable rasters are counted, not fatal."""
+    from tests.test_seed import MINIMAL_METADATA
+
+    monkeypatch.setattr(services.layer_stats, "s3_uri", lambda db_path, bucket: "/does/not/exist.tif")
+    response = client.post(
+        "/seed?compute_stats=true", json=MINIMAL_METADATA, headers={"X-Seed-Secret": os.environ["SEED_SECRET"]}
+    )
+    assert response.status_code == 200
+    stats_counts = response.json()["counts"]["stats"]
+    assert stats_counts["failed"] >= 1
+    assert stats_counts["computed"] == 0
+
+
+# =============================================================================
+# Consumers: analysis histogram and tile rescale
+# =============================================================================
+
+
+def test_histogram_with_fixed_edges():
+    points = _histogram([5.0, 15.0, 15.0, 150.0], [1.0, 1.0, 1.0, 1.0], edges=[0.0, 10.0, 20.0, 30.0])
+    assert [p["x"] for p in points] == [5.0, 15.0, 25.0]
+    # 150 lies above the global range and is clamped into the last bin.
+    assert [p["y"] for p in points] == [1.0, 2.0, 1.0]
+
+
+def test_analysis_histogram_uses_stored_edges(analysis_client, db_session):
+    db_session.get(Layer, "peat_cog").stats = {
+        "histogram": {"edges": [0.0, 100.0, 200.0, 300.0, 400.0], "counts": [0, 0, 0, 0]},
+    }
+    db_session.flush()
+
+    response = analysis_client.post("/analysis/", json=VALID_POLYGON_FEATURE)
+    histogram = response.json()["peat_carbon"]["chart"]["peat_cog"]
+    assert [p["x"] for p in histogram] == [50.0, 150.0, 250.0, 350.0]
+    assert histogram[2]["y"] > 0  # 200.0 falls in [200, 300)
+
+
+def _request(query_string: str) -> Request:
+    return Request({"type": "http", "query_string": query_string.encode(), "headers": []})
+
+
+def test_render_params_default_rescale_from_stats(analysis_client, db_session):
+    layer = db_session.get(Layer, "peat_cog")
+    layer.path = "/data/processed/peat_cog.tif"
+    layer.stats = {"percentiles": {"p2": 10.0, "p98": 300.0}}
+    db_session.flush()
+
+    params = render_params_dependency(_request("url=data/processed/peat_cog.tif"), ImageRenderingParams(), db_session)
+    assert params.rescale == [(10.0, 300.0)]
+
+
+def test_render_params_keep_explicit_rescale_and_colormap(analysis_client, db_session):
+    layer = db_session.get(Layer, "peat_cog")
+    layer.path = "data/processed/peat_cog.tif"
+    layer.stats = {"percentiles": {"p2": 10.0, "p98": 300.0}}
+    db_session.flush()
+
+    explicit = render_params_dependency(
+        _request("url=data/processed/peat_cog.tif&rescale=0,1"), ImageRenderingParams(rescale=["0,1"]), db_session
+    )
+    assert explicit.rescale == [(0.0, 1.0)]
+
+    with_colormap = render_params_dependency(
+        _request("url=data/processed/peat_cog.tif&colormap=%7B%7D"), ImageRenderingParams(), db_session
+    )
+    assert with_colormap.rescale is None
+
+
+def test_default_rescale_reloads_after_cache_expiry(analysis_client, db_session, monkeypatch):
+    layer = db_session.get(Layer, "peat_cog")
+    layer.path = "data/processed/peat_cog.tif"
+    layer.stats = {"percentiles": {"p2": 10.0, "p98": 300.0}}
+    db_session.flush()
+    assert default_rescale(db_session, layer.path) == (10.0, 300.0)
+
+    # Another worker's seed changes the stats without invalidating this process's cache.
+    layer.stats = {"percentiles": {"p2": 20.0, "p98": 400.0}}
+    db_session.flush()
+    assert default_rescale(db_session, layer.path) == (10.0, 300.0)
+
+    monkeypatch.setattr(services.layer_stats, "_rescale_loaded_at", services.layer_stats._rescale_loaded_at - 61)
+    assert default_rescale(db_session, layer.path) == (20.0, 400.0)
+
+
+def test_default_rescale_unknown_path(client, db_session):
+    assert default_rescale(db_session, "unknown.tif") is None
+
+
+def test_apply_migrations_is_idempotent():
+    from db.migrations import apply_migrations
+    from tests.conftest import test_engine
+
+    apply_migrations(test_engine)
+    apply_migrations(test_engine)
@@ -369,3 +369,98 @@ def test_layer_config_null_by_default(client, layer):
     response = client.get(f"/layers/{layer.id}")
     data = response.json()
     assert data["config"] is None
+
+
+# =============================================================================
+# Point Query Tests
+# =============================================================================
+
+ECOSYSTEM_CATEGORIES = [
+    {"value": 2, "label": {"en": "Treed", "fr": "Arboré"}},
+    {"value": 8, "label": {"en": "Bog", "fr": "Tourbière ombrotrophe"}},
+    {"value": 12, "label": {"en": "Water", "fr": "Eau"}},
+]
+
+
+def test_point_query_returns_values(analysis_client):
+    response = analysis_client.get("/layers/point?lon=-84&lat=57&layers=peat_cog,carbon_cog")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["lon"] == -84
+    assert data["lat"] == 57
+    assert data["series"] == []
+    assert [v["layer_id"] for v in data["values"]] == ["peat_cog", "carbon_cog"]
+    assert data["values"][0]["value"] == 200.0
+    assert data["values"][0]["unit"] == "cm"
+    assert data["values"][0]["label"] is None
+    assert data["values"][1]["value"] == 80.0
+
+
+def test_point_query_categorical_label(analysis_client, db_session):
+    from models import Layer
+
+    db_session.get(Layer, "ecosystem_classification_cog").categories = ECOSYSTEM_CATEGORIES
+    db_session.flush()
+
+    # Top-right quadrant of the fixture raster is class 8, bottom-right is class 12.
+    response = analysis_client.get("/layers/point?lon=-83.5&lat=57.5&layers=ecosystem_classification_cog")
+    assert response.status_code == 200
+    value = response.json()["values"][0]
+    assert value["value"] == 8
+    assert value["label"] == {"en": "Bog", "fr": "Tourbière ombrotrophe"}
+
+    response = analysis_client.get("/layers/point?lon=-83.5&lat=56.5&layers=ecosystem_classification_cog")
+    assert response.json()["values"][0]["label"]["en"] == "Water"
+
+
+def test_point_query_groups_time_series(analysis_client):
+    from tests.conftest import SNOW_LENGTHT_VALUES
+
+    # Request winters in reverse order; the series must come back chronologically.
+    layer_ids = [f"lengthT_winter_{suffix}_cog" for suffix in reversed(SNOW_LENGTHT_VALUES)]
+    response = analysis_client.get(f"/layers/point?lon=-84&lat=57&layers=peat_cog,{','.join(layer_ids)}")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [v["layer_id"] for v in data["values"]] == ["peat_cog"]
+    assert len(data["series"]) == 1
+    series = data["series"][0]
+    assert series["key"] == "lengthT_winter"
+    assert series["unit"] == "days"
+    assert [s["step"] for s in series["steps"]] == list(SNOW_LENGTHT_VALUES)
+    assert [s["x"] for s in series["steps"]] == [2018, 2019, 2020, 2021, 2022, 2023]
+    assert [s["value"] for s in series["steps"]] == list(SNOW_LENGTHT_VALUES.values())
+
+
+def test_point_query_outside_raster_returns_null(analysis_client):
+    response = analysis_client.get("/layers/point?lon=-100&lat=57&layers=peat_cog")
+    assert response.status_code == 200
+    assert response.json()["values"][0]["value"] is None
+
+
+def test_point_query_unknown_layer_returns_404(analysis_client):
+    response = analysis_client.get("/layers/point?lon=-84&lat=57&layers=peat_cog,missing_cog")
+    assert response.status_code == 404
+    assert "missing_cog" in response.json()["detail"]
+
+
+def test_point_query_vector_layer_returns_422(client, multiple_layers):
+    response = client.get("/layers/point?lon=-84&lat=57&layers=layer_01")
+    assert response.status_code == 422
+    assert "layer_01" in response.json()["detail"]
+
+
+def test_point_query_validation(client):
+    assert client.get("/layers/point?lon=-84&lat=57&layers=,").status_code == 422
+    assert client.get("/layers/point?lon=-181&lat=57&layers=a").status_code == 422
+    assert client.get("/layers/point?lon=-84&lat=91&layers=a").status_code == 422
+    assert client.get("/layers/point?lon=-84&lat=57").status_code == 422
+    too_many = ",".join(f"layer_{i}" for i in range(51))
+    assert client.get(f"/layers/point?lon=-84&lat=57&layers={too_many}").status_code == 422
+
+
+def test_parse_time_step():
+    from services.time_series import parse_time_step
+
+    assert parse_time_step("endL_winter_2021_cog") == ("endL_winter", "2021", 2020)
+    assert parse_time_step("peat_cog") is None
@@ -0,0 +1,148 @@
+"""Tests for precomputed reporting-unit analyses (services.reporting_units, GET /analysis/v2/units)."""
+
+import json
+
+import pytest
+from sqlalchemy import select
+
+import services.reporting_units
+from models import Dataset, ReportingUnitStats
+from services.reporting_units import compute_reporting_unit_stats, load_reporting_units
+
+LAYER_ID = "ecc-design.7h4njtot"
+
+
+def _unit(minx: float, miny: float, unit_id, name: str) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[minx, miny], [minx + 0.5, miny], [minx + 0.5, miny + 0.5], [minx, miny + 0.5], [minx, miny]]],
+        },
+        "properties": {"ECODISTRIC": unit_id, "NAME": name},
+    }
+
+
+@pytest.fixture
+def units_path(tmp_path):
+    path = tmp_path / "ecodistricts.geojson"
+    features = [
+        _unit(-84.8, 56.2, 1001, "North"),
+        _unit(-83.8, 57.2, 1002, "South"),
+        _unit(-84.3, 56.2, 1001, "North"),  # second part of unit 1001
+    ]
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    return path
+
+
+def _rows(db_session) -> dict[str, ReportingUnitStats]:
+    return {row.feature_id: row for row in db_session.scalars(select(ReportingUnitStats))}
+
+
+def test_load_reporting_units_unions_parts_by_id(units_path):
+    units = {unit.feature_id: unit for unit in load_reporting_units(units_path, "ECODISTRIC")}
+    assert set(units) == {"1001", "1002"}
+    assert units["1001"].geometry.area == pytest.approx(0.5)
+    assert units["1001"].properties["NAME"] == "North"
+
+
+def test_load_reporting_units_reprojects_legacy_crs(tmp_path):
+    path = tmp_path / "units.geojson"
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "crs": {"type": "name", "properties": {"name": "urn:ogc:def:crs:EPSG::3857"}},
+        "features": [{
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [[[0, 0], [100000, 0], [100000, 100000], [0, 0]]]},
+            "properties": {"id": "a"},
+        }],
+    }))
+    (unit,) = load_reporting_units(path, "id")
+    assert unit.geometry.bounds[2] == pytest.approx(0.898, abs=1e-3)
+
+
+def test_load_reporting_units_requires_id_property(units_path):
+    with pytest.raises(ValueError, match="no 'ZONE'"):
+        load_reporting_units(units_path, "ZONE")
+
+
+def test_compute_stores_full_analysis_per_unit(analysis_client, db_session, units_path):
+    units = load_reporting_units(units_path, "ECODISTRIC")
+    counts = compute_reporting_unit_stats(db_session, LAYER_ID, units, "test-bucket")
+    assert counts == {"computed": 2, "skipped": 0, "deleted": 0, "failed": 0}
+
+    response = analysis_client.get(f"/analysis/v2/units/{LAYER_ID}/1001")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["properties"]["NAME"] == "North"
+    assert data["analysis"]["peat_carbon"]["stats"]["peat_depth_avg"] == pytest.approx(200.0)
+
+    # Same numbers as a live analysis of the unit.
+    live = analysis_client.post(
+        "/analysis/v2", json={"type": "Feature", "geometry": units[0].geometry.__geo_interface__, "properties": {}}
+    ).json()
+    assert data["analysis"] == live
+
+
+def test_rerun_skips_unchanged_units(analysis_client, db_session, units_path, monkeypatch):
+    units = load_reporting_units(units_path, "ECODISTRIC")
+    compute_reporting_unit_stats(db_session, LAYER_ID, units, "test-bucket")
+
+    calls = []
+    original = services.reporting_units.compute_zonal_stats_many
+    monkeypatch.setattr(
+        services.reporting_units,
+        "compute_zonal_stats_many",
+        lambda geoms, *args: calls.append(len(geoms)) or original(geoms, *args),
+    )
+    counts = compute_reporting_unit_stats(db_session, LAYER_ID, units, "test-bucket")
+    assert counts["skipped"] == 2 and calls == []
+
+    assert compute_reporting_unit_stats(db_session, LAYER_ID, units, "test-bucket", force=True)["computed"] == 2
+
+
+def test_rerun_recomputes_when_inputs_change(analysis_client, db_session, units_path):
+    units = load_reporting_units(units_path, "ECODISTRIC")
+    compute_reporting_unit_stats(db_session, LAYER_ID, units, "test-bucket")
+
+    dataset = db_session.get(Dataset, 1)
+    dataset.metadata_ = {**dataset.metadata_, "title": {"en": "Peat (v2)", "fr": "Tourbe (v2)"}}
+    db_session.flush()
+
+    counts = compute_reporting_unit_stats(db_session, LAYER_ID, units, "test-bucket")
+    assert counts["computed"] == 2
+    assert _rows(db_session)["1002"].analysis["peat_carbon"]["dataset"]["metadata"]["title"]["en"] == "Peat (v2)"
+
+
+def test_rerun_recomputes_changed_geometry_and_deletes_removed_units(
+    analysis_client, db_session, units_path, tmp_path
+):
+    compute_reporting_unit_stats(db_session, LAYER_ID, load_reporting_units(units_path, "ECODISTRIC"), "test-bucket")
+    before = _rows(db_session)["1001"].area_km2
+
+    path = tmp_path / "ecodistricts_v2.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [_unit(-84.8, 56.2, 1001, "North")]}))
+    counts = compute_reporting_unit_stats(db_session, LAYER_ID, load_reporting_units(path, "ECODISTRIC"), "test-bucket")
+
+    assert counts == {"computed": 1, "skipped": 0, "deleted": 1, "failed": 0}
+    rows = _rows(db_session)
+    assert set(rows) == {"1001"}
+    assert rows["1001"].area_km2 == pytest.approx(before / 2, rel=1e-3)
+
+
+def test_unknown_unit_returns_404(client):
+    response = client.get(f"/analysis/v2/units/{LAYER_ID}/9999")
+    assert response.status_code == 404
+
+
+def test_drifted_unit_analysis_returns_404(client, db_session):
+    db_session.add(ReportingUnitStats(
+        layer_id=LAYER_ID,
+        feature_id="1001",
+        area_km2=1.0,
+        analysis={"aoi_size": 1.0},
+        geometry_hash="0" * 64,
+        inputs_hash="0" * 64,
+    ))
+    db_session.flush()
+    assert client.get(f"/analysis/v2/units/{LAYER_ID}/1001").status_code == 404
@@ -0,0 +1,120 @@
+"""Tests for the leader-elected job scheduler (services.scheduler)."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+import services.scheduler
+from models import JobRun
+from services.scheduler import JOBS, Job, next_run, run_job, run_scheduler, scheduled_job
+from tests.conftest import test_engine
+
+SLOT = datetime(2026, 1, 1, 3, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def job_runs():
+    """Read ``job_runs`` rows committed by ``run_job``, removing them after the test."""
+
+    def read(name: str) -> JobRun | None:
+        with Session(test_engine) as db:
+            return db.scalars(select(JobRun).where(JobRun.name == name)).first()
+
+    yield read
+    with test_engine.begin() as conn:
+        conn.execute(delete(JobRun).where(JobRun.name.like("test_%")))
+
+
+def _job(name: str, func=lambda db: None) -> Job:
+    return Job(name, "0 3 * * *", func)
+
+
+def test_cleanup_job_is_registered():
+    assert JOBS["cleanup_shared_analyses"].cron == "0 3 * * *"
+
+
+def test_scheduled_job_rejects_invalid_cron():
+    with pytest.raises(ValueError):
+        scheduled_job("every night")
+
+
+def test_next_run_follows_cron():
+    assert next_run("0 3 * * *", SLOT) == SLOT + timedelta(days=1)
+    assert next_run("0 3 * * *", SLOT - timedelta(minutes=1)) == SLOT
+
+
+def test_run_job_records_run(job_runs):
+    calls = []
+    assert run_job(_job("test_records", lambda db: calls.append(db.execute(text("SELECT 1")).scalar())), SLOT, test_engine)
+
+    assert calls == [1]
+    row = job_runs("test_records")
+    assert row.status == "succeeded"
+    assert row.scheduled_for == SLOT
+    assert row.duration_seconds >= 0 and row.finished_at >= row.started_at
+    assert row.run_count == 1 and row.error is None
+
+
+def test_run_job_runs_each_slot_once(job_runs):
+    calls = []
+    job = _job("test_once", lambda db: calls.append(1))
+
+    assert run_job(job, SLOT, test_engine)
+    assert not run_job(job, SLOT, test_engine)
+    assert run_job(job, SLOT + timedelta(days=1), test_engine)
+    assert len(calls) == 2
+    assert job_runs("test_once").run_count == 2
+
+
+def test_run_job_skips_while_another_worker_holds_the_lock(job_runs):
+    calls = []
+    job = _job("test_locked", lambda db: calls.append(1))
+    with test_engine.connect() as other_worker:
+        other_worker.execute(text("SELECT pg_advisory_lock(:key)"), {"key": job.lock_key})
+        assert not run_job(job, SLOT, test_engine)
+        other_worker.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+
+    assert calls == []
+    assert job_runs("test_locked") is None
+
+
+def test_concurrent_workers_run_the_job_once(job_runs):
+    calls = []
+    job = _job("test_concurrent", lambda db: calls.append(1) or time.sleep(0.2))
+
+    with ThreadPoolExecutor(4) as pool:
+        ran = list(pool.map(lambda _: run_job(job, SLOT, test_engine), range(4)))
+
+    assert sorted(ran) == [False, False, False, True]
+    assert calls == [1]
+
+
+def test_failed_job_is_recorded(job_runs):
+    def fail(db):
+        raise RuntimeError("boom")
+
+    assert run_job(_job("test_failed", fail), SLOT, test_engine)
+
+    row = job_runs("test_failed")
+    assert row.status == "failed"
+    assert "RuntimeError: boom" in row.error
+
+
+def test_scheduler_runs_due_jobs(monkeypatch):
+    job = _job("test_loop")
+    slots = []
+    soon = lambda cron, after: datetime.now(timezone.utc) + timedelta(seconds=0.01)  # noqa: E731
+    monkeypatch.setattr(services.scheduler, "next_run", soon)
+    monkeypatch.setattr(services.scheduler, "run_job", lambda job, slot: slots.append(slot))
+
+    async def run_briefly():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(run_scheduler([job]), 0.2)
+
+    asyncio.run(run_briefly())
+    assert len(slots) >= 2 and slots == sorted(slots)
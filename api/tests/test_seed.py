@@ -4,9 +4,11 @@ import json
 import tempfile
 from pathlib import Path
 
-from sqlalchemy import func, select
+import pytest
+from sqlalchemy import event, func, select
 
-from models import Category, Dataset, Layer
+from models import CatalogVersion, Category, Dataset, Layer
+from services.layer_stats import default_rescale, invalidate_rescale_cache
 from services.seed import seed_database
 
 MINIMAL_METADATA = {
@@ -154,11 +156,13 @@ def test_seed_idempotent(db_session):
 
     counts2 = seed_database(db_session, metadata_path)
     db_session.flush()
-    assert counts2["categories"]["updated"] == 1
+    assert counts2["categories"]["unchanged"] == 1
+    assert counts2["categories"]["updated"] == 0
     assert counts2["categories"]["created"] == 0
-    assert counts2["datasets"]["updated"] == 1
-    assert counts2["datasets"]["created"] == 0
-    assert counts2["layers"]["updated"] == 3
+    assert counts2["datasets"]["unchanged"] == 1
+    assert counts2["datasets"]["updated"] == 0
+    assert counts2["layers"]["unchanged"] == 3
+    assert counts2["layers"]["updated"] == 0
     assert counts2["layers"]["created"] == 0
 
     assert db_session.execute(select(func.count(Category.id))).scalar() == 1
@@ -616,3 +620,188 @@ def test_seed_endpoint_delete_first_query_param(client, db_session):
     assert db_session.execute(select(Category).where(Category.id == 999)).scalar_one_or_none() is None
     assert db_session.execute(select(Dataset).where(Dataset.id == 999)).scalar_one_or_none() is None
     assert db_session.execute(select(Layer).where(Layer.id == "stray_layer")).scalar_one_or_none() is None
+
+
+# =============================================================================
+# Bulk upsert
+# =============================================================================
+
+
+@pytest.fixture
+def synthetic_metadata():
+    """A catalog of 10 categories x 10 datasets x 50 layers (5,000 layers)."""
+
+    def title(text: str) -> dict:
+        return {"title": {"en": text, "fr": text}}
+
+    return {
+        "categories": [
+            {
+                "id": c,
+                "metadata": title(f"Category {c}"),
+                "datasets": [
+                    {
+                        "id": c * 100 + d,
+                        "metadata": title(f"Dataset {c}.{d}"),
+                        "layers": [
+                            {
+                                "id": f"layer_{c}_{d}_{i}",
+                                "format": "raster",
+                                "type": "continuous",
+                                "path": f"/data/{c}/{d}/{i}.tif",
+                                "unit": "",
+                                "metadata": title(f"Layer {c}.{d}.{i}"),
+                            }
+                            for i in range(50)
+                        ],
+                    }
+                    for d in range(10)
+                ],
+            }
+            for c in range(10)
+        ]
+    }
+
+
+def _record_statements(db_session) -> list[str]:
+    statements = []
+    event.listen(db_session.connection(), "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    return statements
+
+
+def test_seed_upserts_in_bulk(db_session, synthetic_metadata):
+    """Thousands of layers are written in a handful of batched statements, not one round-trip per row."""
+    statements = _record_statements(db_session)
+
+    counts = seed_database(db_session, payload=synthetic_metadata)
+    assert counts["categories"] == {"created": 10, "updated": 0, "unchanged": 0, "deleted": 0}
+    assert counts["datasets"] == {"created": 100, "updated": 0, "unchanged": 0, "deleted": 0}
+    assert counts["layers"] == {"created": 5000, "updated": 0, "unchanged": 0, "deleted": 0}
+    # 3 diff SELECTs, then one executemany per table and the catalog version bump.
+    assert len(statements) == 7
+
+
+def test_seed_writes_only_changed_rows(db_session, synthetic_metadata):
+    seed_database(db_session, payload=synthetic_metadata)
+    statements = _record_statements(db_session)
+
+    counts = seed_database(db_session, payload=synthetic_metadata)
+    assert counts["layers"] == {"created": 0, "updated": 0, "unchanged": 5000, "deleted": 0}
+    assert all(sql.startswith("SELECT") for sql in statements)
+
+    layers = synthetic_metadata["categories"][0]["datasets"][0]["layers"]
+    layers[0]["path"] = "/data/moved.tif"
+    layers[1]["metadata"] = {"title": {"fr": "Couche", "en": "Layer"}}
+    layers.append({**layers[2], "id": "layer_new"})
+    statements.clear()
+
+    counts = seed_database(db_session, payload=synthetic_metadata)
+    assert counts["diff"]["layers"] == {"added": ["layer_new"], "changed": ["layer_0_0_0", "layer_0_0_1"], "removed": []}
+    assert counts["diff"]["datasets"] == {"added": [], "changed": [], "removed": []}
+    assert counts["layers"] == {"created": 1, "updated": 2, "unchanged": 4998, "deleted": 0}
+    writes = [sql for sql in statements if not sql.startswith("SELECT")]
+    assert len(writes) == 2 and writes[0].startswith("INSERT INTO layers")
+    assert writes[1].startswith("INSERT INTO catalog_version")
+    assert db_session.get(Layer, "layer_0_0_0").path == "data/moved.tif"
+    assert db_session.get(Layer, "layer_new").dataset_id == 0
+
+
+def test_seed_dry_run_reports_diff_without_writing(db_session):
+    _seed_stray_rows(db_session)
+    statements = _record_statements(db_session)
+
+    counts = seed_database(db_session, payload=MINIMAL_METADATA, delete_first=True, dry_run=True)
+    assert counts["dry_run"] is True
+    assert counts["diff"]["categories"] == {"added": [1], "changed": [], "removed": [999]}
+    assert counts["diff"]["layers"]["removed"] == ["stray_layer"]
+    assert counts["layers"]["deleted"] == 1
+    assert all(sql.startswith("SELECT") for sql in statements)
+    assert db_session.get(Layer, "stray_layer") is not None
+    assert db_session.execute(select(func.count(Layer.id))).scalar() == 1
+
+
+def test_seed_bumps_catalog_version_only_when_writing(db_session):
+    def version():
+        return db_session.scalar(select(CatalogVersion.version))
+
+    assert version() is None
+    seed_database(db_session, payload=MINIMAL_METADATA)
+    assert version() == 1
+    seed_database(db_session, payload=MINIMAL_METADATA)
+    seed_database(db_session, payload=MINIMAL_METADATA, dry_run=True)
+    assert version() == 1
+
+    changed = json.loads(json.dumps(MINIMAL_METADATA))
+    changed["categories"][0]["metadata"]["title"]["en"] = "Renamed"
+    seed_database(db_session, payload=changed)
+    assert version() == 2
+
+
+def test_seed_update_keeps_layer_stats(db_session):
+    seed_database(db_session, payload=MINIMAL_METADATA)
+    layer = db_session.execute(select(Layer)).scalars().first()
+    layer.stats = {"min": 0}
+    db_session.flush()
+
+    counts = seed_database(db_session, payload=MINIMAL_METADATA)
+    assert counts["layers"]["unchanged"] == 3
+    assert db_session.get(Layer, layer.id).stats == {"min": 0}
+
+
+def test_seed_reloads_only_the_rescale_ranges_of_touched_layers(db_session):
+    seed_database(db_session, payload=MINIMAL_METADATA)
+    layer_a, layer_c = db_session.get(Layer, "layer_a"), db_session.get(Layer, "layer_c")
+    layer_a.stats = {"percentiles": {"p2": 1.0, "p98": 10.0}}
+    layer_c.stats = {"percentiles": {"p2": 2.0, "p98": 20.0}}
+    db_session.flush()
+    invalidate_rescale_cache()
+    assert default_rescale(db_session, "data/test/layer_a.tif") == (1.0, 10.0)
+
+    # Stats written behind the cache's back stay hidden until a layer is invalidated.
+    layer_a.stats = {"percentiles": {"p2": 3.0, "p98": 30.0}}
+    layer_c.stats = {"percentiles": {"p2": 4.0, "p98": 40.0}}
+    db_session.flush()
+    changed = json.loads(json.dumps(MINIMAL_METADATA))
+    changed["categories"][0]["datasets"][0]["layers"][0]["path"] = "/data/test/moved_a.tif"
+    counts = seed_database(db_session, payload=changed)
+    assert counts["diff"]["layers"]["changed"] == ["layer_a"]
+
+    assert default_rescale(db_session, "data/test/layer_a.tif") is None
+    assert default_rescale(db_session, "data/test/moved_a.tif") == (3.0, 30.0)
+    assert default_rescale(db_session, "data/test/layer_c.tif") == (2.0, 20.0)
+    invalidate_rescale_cache()
+
+
+def test_seed_delete_first_deletes_only_removed_rows(db_session):
+    seed_database(db_session, payload=MINIMAL_METADATA)
+    _seed_stray_rows(db_session)
+    statements = _record_statements(db_session)
+
+    counts = seed_database(db_session, payload=MINIMAL_METADATA, delete_first=True)
+    assert counts["layers"] == {"created": 0, "updated": 0, "unchanged": 3, "deleted": 1}
+    assert [sql.split(" WHERE")[0].split(" (")[0] for sql in statements if not sql.startswith("SELECT")] == [
+        "DELETE FROM layers",
+        "DELETE FROM datasets",
+        "DELETE FROM categories",
+        "INSERT INTO catalog_version",
+    ]
+
+
+def test_seed_endpoint_dry_run(client, db_session):
+    import os
+
+    response = client.post(
+        "/seed?dry_run=true",
+        json=MINIMAL_METADATA,
+        headers={"X-Seed-Secret": os.environ["SEED_SECRET"]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["counts"]["dry_run"] is True
+    assert data["counts"]["layers"]["created"] == 3
+    assert sorted(data["diff"]["layers"]["added"]) == sorted(layer["id"] for layer in _all_layers(MINIMAL_METADATA))
+    assert db_session.execute(select(func.count(Layer.id))).scalar() == 0
+
+
+def _all_layers(metadata: dict) -> list[dict]:
+    return [layer for cat in metadata["categories"] for ds in cat["datasets"] for layer in ds["layers"]]
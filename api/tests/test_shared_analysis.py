@@ -1,12 +1,35 @@
 """Tests for the shared-analysis endpoints (POST/GET /analysis/v2/share) and cleanup."""
 
+import json
+import math
+import time
+import zlib
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
 
 import pytest
+from shapely.geometry import Point, shape
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
 
+import services.shared_analysis
+from models.dataset import Dataset
 from models.shared_analysis import SharedAnalysis
-from services.shared_analysis import SHARED_ANALYSIS_TTL_DAYS, delete_expired
+from services.cleanup import cleanup_shared_analyses
+from services.seed import bump_catalog_version
+from services.share_codec import decode_geometry, decode_payload, encode_geometry
+from services.shared_analysis import (
+    SHARED_ANALYSIS_TTL_DAYS,
+    SHARED_EXPIRY_BATCH_SIZE,
+    SHARED_PARTITION_DAYS_AHEAD,
+    _daily_partitions,
+    clear_shared_responses,
+    compact_legacy_shares,
+    delete_expired,
+    ensure_partitions,
+)
+from tests.conftest import test_engine
 
 # Bound on the clock skew between the test process and the DB ``server_default=func.now()``
 # call. Tests using this assert ``created_at`` is "recent" without flaking on slow CI.
@@ -49,6 +72,13 @@ OUT_OF_BOUNDS_POLYGON_FEATURE = {
 }
 
 
+@pytest.fixture(autouse=True)
+def _fresh_response_cache():
+    clear_shared_responses()
+    yield
+    clear_shared_responses()
+
+
 @pytest.fixture
 def shared_analysis_create_body(analysis_client):
     """Run POST /analysis/v2 with a valid polygon and return a payload ready to share.
@@ -82,8 +112,11 @@ def test_share_persists_row(analysis_client, db_session, shared_analysis_create_
     share_id = UUID(response.json()["id"])
     row = db_session.get(SharedAnalysis, share_id)
     assert row is not None
-    assert row.analysis == shared_analysis_create_body["analysis"]
-    assert row.geojson == shared_analysis_create_body["geojson"]
+    assert row.analysis is None and row.geojson is None
+    stored = decode_payload(row.payload)
+    assert "dataset" not in stored["peat_carbon"] and stored["peat_carbon"]["dataset_id"] == 1
+    assert stored["peat_carbon"]["stats"] == shared_analysis_create_body["analysis"]["peat_carbon"]["stats"]
+    assert decode_geometry(row.geometry).equals(shape(VALID_POLYGON_FEATURE["geometry"]))
 
 
 def test_share_rejects_missing_geojson(analysis_client, shared_analysis_create_body):
@@ -108,6 +141,77 @@ def test_share_rejects_geojson_outside_hbl(analysis_client, shared_analysis_crea
     assert response.status_code == 422
 
 
+# ───────────────────────────── share by reference / result token ───────────
+
+
+def _no_revalidation(monkeypatch):
+    def fail(geojson):
+        raise AssertionError("geometry re-validated")
+
+    monkeypatch.setattr(services.shared_analysis, "validate_geometry_v2", fail)
+
+
+def test_share_by_result_id(analysis_client, monkeypatch):
+    """A stored v2 result is promoted to a share without upload or re-validation."""
+    analysis_response = analysis_client.post("/analysis/v2", json=VALID_POLYGON_FEATURE)
+    _no_revalidation(monkeypatch)
+
+    response = analysis_client.post(
+        "/analysis/v2/share", json={"result_id": analysis_response.headers["X-Analysis-Result-Id"]}
+    )
+    assert response.status_code == 201, response.text
+
+    body = analysis_client.get(f"/analysis/v2/share/{response.json()['id']}").json()
+    assert body["analysis"] == analysis_response.json()
+    assert shape(body["geojson"]["geometry"]).equals(shape(VALID_POLYGON_FEATURE["geometry"]))
+
+
+def test_share_by_unknown_result_id_returns_404(client):
+    response = client.post("/analysis/v2/share", json={"result_id": str(uuid4())})
+    assert response.status_code == 404
+
+
+def test_share_rejects_result_id_with_snapshot(analysis_client, shared_analysis_create_body):
+    body = {**shared_analysis_create_body, "result_id": str(uuid4())}
+    assert analysis_client.post("/analysis/v2/share", json=body).status_code == 422
+
+
+@pytest.mark.parametrize("as_collection", [False, True], ids=["feature", "feature_collection"])
+def test_share_with_result_token_skips_revalidation(analysis_client, monkeypatch, as_collection):
+    geojson = (
+        {"type": "FeatureCollection", "features": [VALID_POLYGON_FEATURE]} if as_collection else VALID_POLYGON_FEATURE
+    )
+    analysis_response = analysis_client.post("/analysis/v2", json=geojson)
+    _no_revalidation(monkeypatch)
+
+    response = analysis_client.post("/analysis/v2/share", json={
+        "analysis": analysis_response.json(),
+        "geojson": geojson,
+        "result_token": analysis_response.headers["X-Analysis-Result-Token"],
+    })
+    assert response.status_code == 201, response.text
+
+
+def test_result_token_is_exposed_to_cross_origin_clients(analysis_client):
+    response = analysis_client.post("/analysis/v2", json=VALID_POLYGON_FEATURE, headers={"Origin": "https://example.com"})
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert "x-analysis-result-token" in exposed
+
+
+def test_share_rejects_result_token_for_other_payload(analysis_client):
+    analysis_response = analysis_client.post("/analysis/v2", json=VALID_POLYGON_FEATURE)
+    analysis = analysis_response.json()
+    analysis["aoi_size"] += 1
+
+    response = analysis_client.post("/analysis/v2/share", json={
+        "analysis": analysis,
+        "geojson": VALID_POLYGON_FEATURE,
+        "result_token": analysis_response.headers["X-Analysis-Result-Token"],
+    })
+    assert response.status_code == 422
+    assert "token" in response.json()["detail"]
+
+
 # ───────────────────────────── GET /analysis/v2/share/{id} ──────────────────
 
 
@@ -207,6 +311,155 @@ def test_get_share_stale_schema_returns_410(client, db_session):
     assert "expired" in response.json()["detail"].lower()
 
 
+# ───────────────────────────── cached reads ─────────────────────────────────
+
+
+def _count_validations(monkeypatch) -> list:
+    calls = []
+    original = services.shared_analysis._read_shared
+    monkeypatch.setattr(
+        services.shared_analysis, "_read_shared", lambda stored: calls.append(stored.id) or original(stored)
+    )
+    return calls
+
+
+def test_get_share_sets_cache_headers(analysis_client, shared_analysis_create_body):
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+
+    response = analysis_client.get(f"/analysis/v2/share/{share_id}")
+    assert response.headers["cache-control"] == "public, max-age=3600, immutable"
+    etag = response.headers["etag"]
+
+    not_modified = analysis_client.get(f"/analysis/v2/share/{share_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_get_share_etag_is_exposed_to_cross_origin_clients(analysis_client, shared_analysis_create_body):
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+
+    response = analysis_client.get(f"/analysis/v2/share/{share_id}", headers={"Origin": "https://example.com"})
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert "etag" in exposed
+
+
+def test_get_share_validates_once_per_schema_version(analysis_client, shared_analysis_create_body, monkeypatch):
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+    calls = _count_validations(monkeypatch)
+
+    first = analysis_client.get(f"/analysis/v2/share/{share_id}")
+    second = analysis_client.get(f"/analysis/v2/share/{share_id}")
+    assert second.content == first.content
+    assert len(calls) == 1
+
+    monkeypatch.setattr(services.shared_analysis, "SHARED_SCHEMA_VERSION", "next")
+    third = analysis_client.get(f"/analysis/v2/share/{share_id}")
+    assert third.json() == first.json()
+    assert len(calls) == 2
+
+
+def test_get_share_catalog_change_moves_etag(analysis_client, db_session, shared_analysis_create_body):
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+    etag = analysis_client.get(f"/analysis/v2/share/{share_id}").headers["etag"]
+
+    dataset = db_session.get(Dataset, 1)
+    dataset.metadata_ = {**dataset.metadata_, "title": {"en": "Peat (v2)", "fr": "Tourbe (v2)"}}
+    db_session.flush()
+    # Catalog rows only change through the seed, which bumps the version with them.
+    bump_catalog_version(db_session)
+
+    response = analysis_client.get(f"/analysis/v2/share/{share_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_get_share_cached_past_ttl_returns_410(analysis_client, shared_analysis_create_body):
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+    analysis_client.get(f"/analysis/v2/share/{share_id}")
+
+    cache = services.shared_analysis._shared_responses
+    for key, entry in cache.items():
+        cache[key] = replace(entry, expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    assert analysis_client.get(f"/analysis/v2/share/{share_id}").status_code == 410
+
+
+def test_get_share_failures_are_not_cached(client, db_session, monkeypatch):
+    row = SharedAnalysis(analysis={"foo": "bar"}, geojson=VALID_POLYGON_FEATURE)
+    db_session.add(row)
+    db_session.flush()
+    calls = _count_validations(monkeypatch)
+
+    assert client.get(f"/analysis/v2/share/{row.id}").status_code == 410
+    assert client.get(f"/analysis/v2/share/{row.id}").status_code == 410
+    assert len(calls) == 2
+
+
+# ───────────────────────────── compact storage ──────────────────────────────
+
+
+def test_get_share_rehydrates_current_catalog(analysis_client, db_session, shared_analysis_create_body):
+    """Stored snapshots reference datasets by id; reads embed the catalog as it is now."""
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+
+    dataset = db_session.get(Dataset, 1)
+    dataset.metadata_ = {**dataset.metadata_, "title": {"en": "Peat (v2)", "fr": "Tourbe (v2)"}}
+    db_session.flush()
+
+    body = analysis_client.get(f"/analysis/v2/share/{share_id}").json()
+    assert body["analysis"]["peat_carbon"]["dataset"]["metadata"]["title"]["en"] == "Peat (v2)"
+    assert body["analysis"]["peat_carbon"]["stats"] == shared_analysis_create_body["analysis"]["peat_carbon"]["stats"]
+
+
+def test_get_share_with_removed_dataset_returns_410(analysis_client, db_session, shared_analysis_create_body):
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+    row = db_session.get(SharedAnalysis, UUID(share_id))
+    stored = decode_payload(row.payload)
+    stored["peat_carbon"]["dataset_id"] = 999
+    row.payload = zlib.compress(json.dumps(stored).encode())
+    db_session.flush()
+
+    assert analysis_client.get(f"/analysis/v2/share/{share_id}").status_code == 410
+
+
+def test_geometry_encoding_is_exact_to_the_quantum():
+    geom = Point(-84.123456789, 56.987654321).buffer(0.3, quad_segs=64)
+    decoded = decode_geometry(encode_geometry(geom))
+    assert decoded.geom_type == "Polygon"
+    # Each coordinate moves by at most half a quantum per axis.
+    assert decoded.hausdorff_distance(geom) <= 0.5e-7 * math.sqrt(2) * 1.01
+    # Coordinates on the grid round-trip exactly.
+    assert decode_geometry(encode_geometry(shape(VALID_POLYGON_FEATURE["geometry"]))) == shape(
+        VALID_POLYGON_FEATURE["geometry"]
+    )
+
+
+def test_compact_legacy_shares_converts_json_rows(analysis_client, db_session, shared_analysis_create_body):
+    row = SharedAnalysis(analysis=shared_analysis_create_body["analysis"], geojson=VALID_POLYGON_FEATURE)
+    db_session.add(row)
+    db_session.flush()
+    before = analysis_client.get(f"/analysis/v2/share/{row.id}").json()
+
+    assert compact_legacy_shares(db_session) == 1
+    assert row.analysis is None and row.payload is not None
+    assert compact_legacy_shares(db_session) == 0
+
+    after = analysis_client.get(f"/analysis/v2/share/{row.id}").json()
+    assert after == before
+
+
+
+def test_compact_legacy_shares_checkpoints_each_batch(db_session, shared_analysis_create_body):
+    for _ in range(3):
+        db_session.add(SharedAnalysis(analysis=shared_analysis_create_body["analysis"], geojson=VALID_POLYGON_FEATURE))
+    db_session.flush()
+    checkpoints = []
+
+    assert compact_legacy_shares(db_session, batch_size=2, checkpoint=lambda: checkpoints.append(1)) == 3
+    assert len(checkpoints) == 2
+
+
 # ───────────────────────────── delete_expired (cleanup) ─────────────────────
 
 
@@ -263,3 +516,155 @@ def test_delete_expired_honors_custom_ttl(db_session):
     assert count == 1
     db_session.expire_all()
     assert db_session.get(SharedAnalysis, row_5d_old.id) is None
+
+
+BACKLOG_ROWS = 20_000
+BACKLOG_DAYS = 5
+
+
+def _insert_backlog(db_session) -> None:
+    """Insert ``BACKLOG_ROWS`` expired shares spread over ``BACKLOG_DAYS`` days, plus one fresh share."""
+    db_session.execute(
+        text(
+            "INSERT INTO shared_analyses (id, created_at, payload, geometry)"
+            " SELECT gen_random_uuid(), :newest - (i % :days) * interval '1 day', '\\x00', '\\x00'"
+            " FROM generate_series(1, :rows) i"
+        ),
+        {
+            "newest": datetime.now(timezone.utc) - timedelta(days=SHARED_ANALYSIS_TTL_DAYS + 1),
+            "days": BACKLOG_DAYS,
+            "rows": BACKLOG_ROWS,
+        },
+    )
+    db_session.add(SharedAnalysis(analysis={"a": 1}, geojson={"b": 2}))
+    db_session.flush()
+
+
+def test_table_is_partitioned_by_day(db_session):
+    today = datetime.now(timezone.utc).date()
+    assert ensure_partitions(db_session) == SHARED_PARTITION_DAYS_AHEAD + 1
+    assert ensure_partitions(db_session) == 0
+
+    row = SharedAnalysis(analysis={"a": 1}, geojson={"b": 2})
+    db_session.add(row)
+    db_session.flush()
+    partition = db_session.scalar(
+        text("SELECT tableoid::regclass::text FROM shared_analyses WHERE id = :id"), {"id": row.id}
+    )
+    assert partition == f"shared_analyses_p{today:%Y%m%d}"
+
+
+def test_delete_expired_drops_partitions_of_large_backlog(db_session):
+    oldest = (datetime.now(timezone.utc) - timedelta(days=SHARED_ANALYSIS_TTL_DAYS + BACKLOG_DAYS)).date()
+    assert ensure_partitions(db_session, start=oldest, days=BACKLOG_DAYS) > 0
+    _insert_backlog(db_session)
+    checkpoints = []
+
+    started = time.perf_counter()
+    assert delete_expired(db_session, checkpoint=lambda: checkpoints.append(time.perf_counter())) == BACKLOG_ROWS
+    assert time.perf_counter() - started < 10
+
+    # Whole days go with one detach + drop each; nothing is deleted row by row.
+    assert not any(day <= oldest + timedelta(days=BACKLOG_DAYS - 1) for day in _daily_partitions(db_session))
+    assert len(checkpoints) == BACKLOG_DAYS + 1
+    assert db_session.scalar(text("SELECT count(*) FROM shared_analyses")) == 1
+
+
+def test_delete_expired_batches_unpartitioned_backlog(db_session, monkeypatch):
+    monkeypatch.setattr(services.shared_analysis, "_is_partitioned", lambda db: False)
+    _insert_backlog(db_session)
+    checkpoints = []
+
+    assert delete_expired(db_session, batch_size=1000, checkpoint=lambda: checkpoints.append(1)) == BACKLOG_ROWS
+    # A checkpoint after every batch of at most 1000 rows.
+    assert len(checkpoints) == BACKLOG_ROWS // 1000 + 1
+    assert db_session.scalar(text("SELECT count(*) FROM shared_analyses")) == 1
+
+
+@pytest.fixture
+def committing_session():
+    """A session whose commits are real, unlike ``db_session``; removes what it committed afterwards."""
+    session = Session(test_engine)
+    yield session
+    session.rollback()
+    for name in _daily_partitions(session).values():
+        session.execute(text(f"DROP TABLE {name}"))
+    session.execute(text("DELETE FROM shared_analyses"))
+    session.commit()
+    session.close()
+
+
+def test_delete_expired_keeps_the_callers_transaction_on_lock_timeout(committing_session, monkeypatch):
+    monkeypatch.setattr(services.shared_analysis, "_PARTITION_LOCK_TIMEOUT", "10ms")
+    db = committing_session
+    oldest = (datetime.now(timezone.utc) - timedelta(days=SHARED_ANALYSIS_TTL_DAYS + BACKLOG_DAYS)).date()
+    ensure_partitions(db, start=oldest, days=BACKLOG_DAYS)
+    _insert_backlog(db)
+    db.commit()
+    pending = SharedAnalysis(analysis={"a": 1}, geojson={"b": 2})
+    db.add(pending)
+    db.flush()
+
+    # A concurrent reader of the parent table keeps DETACH PARTITION from getting its lock.
+    with test_engine.connect() as reader:
+        reader.execute(text("SELECT 1 FROM shared_analyses LIMIT 1"))
+        assert delete_expired(db) == BACKLOG_ROWS
+        reader.rollback()
+
+    # No partition was dropped; their rows went batch by batch, and the caller's uncommitted work survived.
+    assert oldest in _daily_partitions(db)
+    assert db.get(SharedAnalysis, pending.id) is not None
+    assert db.scalar(text("SELECT count(*) FROM shared_analyses")) == 2
+
+
+def test_cleanup_job_commits_each_partition_and_batch(committing_session):
+    """Real transactions of the nightly job: each one drops a partition or deletes one batch, and is short."""
+    db = committing_session
+    # Partitions for the three oldest backlog days; the two newest land in the default partition.
+    oldest = (datetime.now(timezone.utc) - timedelta(days=SHARED_ANALYSIS_TTL_DAYS + BACKLOG_DAYS)).date()
+    ensure_partitions(db, start=oldest, days=2)
+    _insert_backlog(db)
+    db.commit()
+
+    transactions = []
+
+    @event.listens_for(db, "after_transaction_create")
+    def begin(session, transaction):
+        if transaction.parent is None:
+            transactions.append(time.perf_counter())
+
+    @event.listens_for(db, "after_transaction_end")
+    def end(session, transaction):
+        if transaction.parent is None:
+            committed.append(time.perf_counter() - transactions[-1])
+
+    committed = []
+    cleanup_shared_analyses(db)
+
+    assert db.scalar(text("SELECT count(*) FROM shared_analyses")) == 1
+    in_default_partition = BACKLOG_ROWS * 2 // BACKLOG_DAYS
+    # ensure_partitions, 3 partitions, the batches (plus the final short one), analysis results.
+    assert len(committed) == 1 + 3 + in_default_partition // SHARED_EXPIRY_BATCH_SIZE + 1 + 1
+    assert max(committed) < 2
+
+
+# ───────────────────────────── GET /analysis/v2/share/{id}/tiles ────────────
+
+
+def test_get_share_tile_returns_aoi(analysis_client, shared_analysis_create_body):
+    import mapbox_vector_tile
+
+    share_id = analysis_client.post("/analysis/v2/share", json=shared_analysis_create_body).json()["id"]
+
+    response = analysis_client.get(f"/analysis/v2/share/{share_id}/tiles/4/4/4")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    features = mapbox_vector_tile.decode(response.content)["aoi"]["features"]
+    assert len(features) == 1
+
+    assert analysis_client.get(f"/analysis/v2/share/{share_id}/tiles/4/0/0").status_code == 204
+
+
+def test_get_share_tile_unknown_id_returns_410(analysis_client):
+    response = analysis_client.get(f"/analysis/v2/share/{uuid4()}/tiles/0/0/0")
+    assert response.status_code == 410